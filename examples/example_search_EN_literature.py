@@ -64,20 +64,29 @@ if __name__ in ('__main__', 'example_search_EN_literature'):
             output_filename = os.sep.join((working_directory, label))
             output_filename = '.'.join((output_filename, HOLMES_EXTENSION))
             with open(output_filename, "wb") as file:
-                file.write(parsed_chapter.to_bytes())
+                file.write(holmes_manager.to_compact_bytes(parsed_chapter))
 
     def load_documents_from_working_directory():
+        corpus_store_directory = os.sep.join((working_directory, 'corpus_store'))
+        if os.path.isdir(corpus_store_directory):
+            print('Loading corpus store ...')
+            holmes_manager.load_corpus_store(corpus_store_directory)
+        registered_labels = set(holmes_manager.list_document_labels())
         serialized_documents = {}
         for file in os.listdir(working_directory):
             if file.endswith(HOLMES_EXTENSION):
-                print('Loading', file)
                 label = file[:-4]
+                if label in registered_labels:
+                    continue
+                print('Loading', file)
                 long_filename = os.sep.join((working_directory, file))
                 with open(long_filename, "rb") as file:
                     contents = file.read()
                 serialized_documents[label] = contents
-        print('Indexing documents (this may take some time) ...')
-        holmes_manager.register_serialized_documents(serialized_documents)
+        if len(serialized_documents) > 0:
+            print('Indexing documents (this may take some time) ...')
+            holmes_manager.register_serialized_documents(serialized_documents)
+            holmes_manager.save_corpus_store(corpus_store_directory)
 
     if os.path.exists(working_directory):
         if not os.path.isdir(working_directory):
@@ -1,5 +1,6 @@
 from .about import __version__
 from .manager import Manager
 from .ontology import Ontology
+from .parsing import ParseProfile
 import os
 os.environ["TOKENIZERS_PARALLELISM"] = "True"
@@ -1,13 +1,16 @@
-from typing import List, Tuple, Dict, Callable, Optional, cast, Any, Set
+from typing import List, Tuple, Dict, Callable, Optional, cast, Any, Set, Iterable
 from collections import OrderedDict
 import uuid
 import statistics
 import pickle
+from copy import copy
 from holmes_extractor.word_matching.ontology import OntologyWordMatchingStrategy
+from holmes_extractor.word_matching.general import WordMatchingStrategy
 from tqdm import tqdm
 from spacy.tokens import Doc
 from thinc.api import Model
 from thinc.backends import get_current_ops, Ops
+from thinc.initializers import glorot_uniform_init
 from thinc.loss import SequenceCategoricalCrossentropy
 from thinc.layers import chain, Relu, Softmax
 from thinc.optimizers import Adam
@@ -30,16 +33,70 @@ from .parsing import (
 )
 from .parsing import PhraseletInfo
 
+# A summary of a structural match retaining what is needed to count phraselet and combined label
+# occurrences: the document label, the index and the subword index for sorting within the
+# document, the phraselet label, whether the phraselet is a single-word phraselet and the
+# document indexes of the word matches as (token index, subword index) pairs.
+MatchSummary = Tuple[str, int, int, str, bool, Tuple[Tuple[int, Optional[int]], ...]]
+
 
 class SupervisedTopicTrainingUtils:
     def __init__(self, overlap_memory_size, one_hot):
         self.overlap_memory_size = overlap_memory_size
         self.one_hot = one_hot
 
+    @staticmethod
+    def get_match_summaries(matches: Iterable[Match]) -> List[MatchSummary]:
+        """Returns summaries of the structural matches that are counted when building
+        frequency and occurrence dictionaries. The summaries retain only the information the
+        counting requires, so that they can be kept for the lifetime of a training basis and
+        returned from worker processes without the documents they refer to.
+
+        Parameters:
+
+        matches -- the structural matches to summarize.
+        """
+
+        def relation_match_involves_whole_word_containing_subwords(match):
+            # Where there are subwords, we suppress relation matches with the
+            # entire word. The same rule is not applied to single-word matches because
+            # it still makes sense to track words with more than three subwords.
+            return (
+                len(match.word_matches) > 1
+                and len(
+                    [
+                        word_match
+                        for word_match in match.word_matches
+                        if len(word_match.document_token._.holmes.subwords) > 0
+                        and word_match.document_subword is None
+                    ]
+                )
+                > 0
+            )
+
+        return [
+            (
+                match.document_label,
+                match.index_within_document,
+                match.get_subword_index_for_sorting(),
+                match.search_phrase_label,
+                match.from_single_word_phraselet,
+                tuple(
+                    (document_index.token_index, document_index.subword_index)
+                    for document_index in (
+                        word_match.get_document_index()
+                        for word_match in match.word_matches
+                    )
+                ),
+            )
+            for match in matches
+            if not relation_match_involves_whole_word_containing_subwords(match)
+        ]
+
     def get_labels_to_classification_frequencies_dict(
         self,
         *,
-        matches: List[Match],
+        match_summaries: List[MatchSummary],
         labels_to_classifications_dict: Optional[Dict[str, str]]
     ) -> Dict[str, Any]:
         """Builds a dictionary from search phrase (phraselet) labels to classification
@@ -49,7 +106,8 @@ class SupervisedTopicTrainingUtils:
 
         Parameters:
 
-        matches -- the structural matches from which to build the dictionary
+        match_summaries -- summaries of the structural matches from which to build the
+            dictionary as returned by *get_match_summaries()*.
         labels_to_classifications_dict -- a dictionary from document labels to document
             classifications, or 'None' if the target dictionary should contain raw frequencies.
         """
@@ -76,56 +134,32 @@ class SupervisedTopicTrainingUtils:
                 else:
                     labels_to_frequencies_dict[search_phrase_label] += 1
 
-        def relation_match_involves_whole_word_containing_subwords(match):
-            # Where there are subwords, we suppress relation matches with the
-            # entire word. The same rule is not applied to single-word matches because
-            # it still makes sense to track words with more than three subwords.
-            return (
-                len(match.word_matches) > 1
-                and len(
-                    [
-                        word_match
-                        for word_match in match.word_matches
-                        if len(word_match.document_token._.holmes.subwords) > 0
-                        and word_match.document_subword is None
-                    ]
-                )
-                > 0
-            )
-
         labels_to_frequencies_dict: Dict[str, Any] = {}
-        matches = [
-            match
-            for match in matches
-            if not relation_match_involves_whole_word_containing_subwords(match)
-        ]
-        matches = sorted(
-            matches,
-            key=lambda match: (
-                match.document_label,
-                match.index_within_document,
-                match.get_subword_index_for_sorting(),
-            ),
+        match_summaries = sorted(
+            match_summaries,
+            key=lambda match_summary: match_summary[:3],
         )
-        for index, match in enumerate(matches):
+        for index, (
+            document_label,
+            _,
+            _,
+            search_phrase_label,
+            from_single_word_phraselet,
+            document_indexes,
+        ) in enumerate(match_summaries):
             this_document_label: Optional[str]
             if self.one_hot:
                 if (
                     "this_document_label" not in locals()
-                ) or this_document_label != match.document_label:
-                    this_document_label = match.document_label
+                ) or this_document_label != document_label:
+                    this_document_label = document_label
                     search_phrases_added_for_this_document = set()
-                if (
-                    match.search_phrase_label
-                    not in search_phrases_added_for_this_document
-                ):
-                    increment(match.search_phrase_label, match.document_label)
-                    search_phrases_added_for_this_document.add(
-                        match.search_phrase_label
-                    )
+                if search_phrase_label not in search_phrases_added_for_this_document:
+                    increment(search_phrase_label, document_label)
+                    search_phrases_added_for_this_document.add(search_phrase_label)
             else:
-                increment(match.search_phrase_label, match.document_label)
-            if not match.from_single_word_phraselet:
+                increment(search_phrase_label, document_label)
+            if not from_single_word_phraselet:
                 previous_match_index = index
                 number_of_analyzed_matches_counter = 0
                 while (
@@ -133,31 +167,28 @@ class SupervisedTopicTrainingUtils:
                     and number_of_analyzed_matches_counter <= self.overlap_memory_size
                 ):
                     previous_match_index -= 1
-                    previous_match = matches[previous_match_index]
-                    if previous_match.document_label != match.document_label:
+                    (
+                        previous_document_label,
+                        _,
+                        _,
+                        previous_search_phrase_label,
+                        previous_from_single_word_phraselet,
+                        previous_document_indexes,
+                    ) = match_summaries[previous_match_index]
+                    if previous_document_label != document_label:
                         break
-                    if previous_match.from_single_word_phraselet:
+                    if previous_from_single_word_phraselet:
                         continue
-                    if previous_match.search_phrase_label == match.search_phrase_label:
+                    if previous_search_phrase_label == search_phrase_label:
                         continue  # otherwise coreference resolution leads to phrases being
                         # combined with themselves
                     number_of_analyzed_matches_counter += 1
-                    previous_word_match_doc_indexes = [
-                        word_match.get_document_index()
-                        for word_match in previous_match.word_matches
-                    ]
-                    for word_match in match.word_matches:
-                        if (
-                            word_match.get_document_index()
-                            in previous_word_match_doc_indexes
-                        ):
+                    for document_index in document_indexes:
+                        if document_index in previous_document_indexes:
                             # the same word is involved in both matches, so combine them
                             # into a new label
                             label_parts = sorted(
-                                (
-                                    previous_match.search_phrase_label,
-                                    match.search_phrase_label,
-                                )
+                                (previous_search_phrase_label, search_phrase_label)
                             )
                             combined_label = "/".join((label_parts[0], label_parts[1]))
                             if self.one_hot:
@@ -165,12 +196,12 @@ class SupervisedTopicTrainingUtils:
                                     combined_label
                                     not in search_phrases_added_for_this_document
                                 ):
-                                    increment(combined_label, match.document_label)
+                                    increment(combined_label, document_label)
                                     search_phrases_added_for_this_document.add(
                                         combined_label
                                     )
                             else:
-                                increment(combined_label, match.document_label)
+                                increment(combined_label, document_label)
         return labels_to_frequencies_dict
 
     def get_occurrence_dicts(
@@ -181,10 +212,13 @@ class SupervisedTopicTrainingUtils:
         structural_matcher: StructuralMatcher,
         sorted_label_dict: Dict[str, int],
         overall_similarity_threshold: float,
-        training_document_labels_to_documents: Dict[str, Doc]
+        training_document_labels_to_documents: Dict[str, Doc],
+        reverse_dict: Optional[Dict[str, List[CorpusWordPosition]]] = None,
+        word_matching_strategies: Optional[List[WordMatchingStrategy]] = None
     ) -> List[Dict[int, int]]:
         """Matches documents against the currently stored phraselets and records the matches
-        in a custom sparse format.
+        in a custom sparse format. Returns one dictionary for each document in the order of
+        the sorted document labels.
 
         Parameters:
 
@@ -195,35 +229,73 @@ class SupervisedTopicTrainingUtils:
         sorted_label_dict -- a dictionary from search phrase (phraselet) labels to their own
             alphabetic sorting indexes.
         overall_similarity_threshold -- the threshold for embedding-based matching.
-        training_document_labels_to_documents -- a dictionary.
+        training_document_labels_to_documents -- a dictionary from document labels to the
+            documents to match.
+        reverse_dict -- a reverse dictionary indexing exactly the documents in
+            *training_document_labels_to_documents*, or *None* if one should be built.
+        word_matching_strategies -- the word matching strategies to use, or *None* if the
+            strategies of *semantic_matching_helper* should be used.
+        """
+        if word_matching_strategies is None:
+            word_matching_strategies = (
+                semantic_matching_helper.main_word_matching_strategies
+                + semantic_matching_helper.ontology_word_matching_strategies
+                + semantic_matching_helper.embedding_word_matching_strategies
+            )
+        if reverse_dict is None:
+            reverse_dict = {}
+            for doc_label, doc in training_document_labels_to_documents.items():
+                semantic_matching_helper.add_to_reverse_dict(
+                    reverse_dict, doc, doc_label
+                )
+        matches = structural_matcher.match(
+            word_matching_strategies=word_matching_strategies,
+            document_labels_to_documents=training_document_labels_to_documents,
+            reverse_dict=reverse_dict,
+            search_phrases=phraselet_labels_to_search_phrases.values(),
+            match_depending_on_single_words=None,
+            compare_embeddings_on_root_words=False,
+            compare_embeddings_on_non_root_words=True,
+            reverse_matching_cwps=None,
+            embedding_reverse_matching_cwps=None,
+            process_initial_question_words=False,
+            overall_similarity_threshold=overall_similarity_threshold,
+            initial_question_word_overall_similarity_threshold=1.0,
+        )
+        document_labels_to_match_summaries: Dict[str, List[MatchSummary]] = {
+            doc_label: [] for doc_label in training_document_labels_to_documents
+        }
+        for match_summary in self.get_match_summaries(matches):
+            document_labels_to_match_summaries[match_summary[0]].append(match_summary)
+        return self.get_occurrence_dicts_from_match_summaries(
+            document_labels_to_match_summaries=document_labels_to_match_summaries,
+            sorted_label_dict=sorted_label_dict,
+        )
+
+    def get_occurrence_dicts_from_match_summaries(
+        self,
+        *,
+        document_labels_to_match_summaries: Dict[str, List[MatchSummary]],
+        sorted_label_dict: Dict[str, int]
+    ) -> List[Dict[int, int]]:
+        """Records phraselet matches that have already been found in a custom sparse format.
+        Returns one dictionary for each document in the order of the sorted document labels.
+
+        Parameters:
+
+        document_labels_to_match_summaries -- a dictionary from document labels to summaries
+            of the matches of phraselets within each document.
+        sorted_label_dict -- a dictionary from search phrase (phraselet) labels to their own
+            alphabetic sorting indexes.
         """
         return_dicts: List[Dict[int, int]] = []
-        for doc_label in sorted(training_document_labels_to_documents.keys()):
+        for doc_label in sorted(document_labels_to_match_summaries.keys()):
             this_document_dict: Dict[int, int] = {}
-            doc = training_document_labels_to_documents[doc_label]
-            document_labels_to_documents = {doc_label: doc}
-            reverse_dict: Dict[str, List[CorpusWordPosition]] = {}
-            semantic_matching_helper.add_to_reverse_dict(reverse_dict, doc, doc_label)
             for (
                 label,
                 occurrences,
             ) in self.get_labels_to_classification_frequencies_dict(
-                matches=structural_matcher.match(
-                    word_matching_strategies=semantic_matching_helper.main_word_matching_strategies
-                    + semantic_matching_helper.ontology_word_matching_strategies
-                    + semantic_matching_helper.embedding_word_matching_strategies,
-                    document_labels_to_documents=document_labels_to_documents,
-                    reverse_dict=reverse_dict,
-                    search_phrases=phraselet_labels_to_search_phrases.values(),
-                    match_depending_on_single_words=None,
-                    compare_embeddings_on_root_words=False,
-                    compare_embeddings_on_non_root_words=True,
-                    reverse_matching_cwps=None,
-                    embedding_reverse_matching_cwps=None,
-                    process_initial_question_words=False,
-                    overall_similarity_threshold=overall_similarity_threshold,
-                    initial_question_word_overall_similarity_threshold=1.0,
-                ),
+                match_summaries=document_labels_to_match_summaries[doc_label],
                 labels_to_classifications_dict=None,
             ).items():
                 if self.one_hot:
@@ -236,8 +308,53 @@ class SupervisedTopicTrainingUtils:
             return_dicts.append(this_document_dict)
         return return_dicts
 
+    def get_classification_dicts(
+        self,
+        *,
+        thinc_model: Model[List[Dict[int, int]], Floats2d],
+        occurrence_dicts: List[Dict[int, int]],
+        classifications: List[str]
+    ) -> List[Optional[OrderedDict]]:
+        """Runs the neural network once for all documents that matched any phraselets and
+        returns, for each document, a dictionary from classification labels to probabilities
+        ordered starting with the most probable, or *None* if the document did not match
+        any phraselets.
+
+        Parameters:
+
+        thinc_model -- the trained neural network.
+        occurrence_dicts -- the occurrence dictionaries of the documents.
+        classifications -- the classification labels corresponding to the network outputs.
+        """
+        recognised_occurrence_dicts = [
+            occurrence_dict
+            for occurrence_dict in occurrence_dicts
+            if len(occurrence_dict) > 0
+        ]
+        if len(recognised_occurrence_dicts) == 0:
+            return [None] * len(occurrence_dicts)
+        predictions_matrix = thinc_model.predict(recognised_occurrence_dicts)
+        results: List[Optional[OrderedDict]] = []
+        predictions_index = 0
+        for occurrence_dict in occurrence_dicts:
+            if len(occurrence_dict) == 0:
+                results.append(None)
+                continue
+            return_dict = OrderedDict()
+            predictions = predictions_matrix[predictions_index]
+            predictions_index += 1
+            for i in (-predictions).argsort():  # type:ignore[attr-defined]
+                return_dict[classifications[i.item()]] = predictions[i].item()
+            results.append(return_dict)
+        return results
+
     def get_thinc_model(
-        self, *, hidden_layer_sizes: List[int], input_width: int, output_width: int
+        self,
+        *,
+        hidden_layer_sizes: List[int],
+        input_width: int,
+        output_width: int,
+        sparse_input: bool = True
     ) -> Model[List[Dict[int, int]], Floats2d]:
         """Generates the structure — without weights — of the Thinc neural network.
 
@@ -246,8 +363,79 @@ class SupervisedTopicTrainingUtils:
         hidden_layer_sizes -- a list containing the number of neurons in each hidden layer.
         input_width -- the input neuron width, which corresponds to the number of phraselets.
         output_width -- the output neuron width, which corresponds to the number of classifications.
+        sparse_input -- *True* if the first hidden layer should read the occurrence
+            dictionaries directly, *False* if the occurrence dictionaries should first be
+            converted to a dense input matrix as in models with version *1.0*.
         """
 
+        def get_sparse_relu(
+            output_len: int, input_len: int
+        ) -> Model[List[Dict[int, int]], Floats2d]:
+            return Model(
+                "sparse_relu",
+                sparse_relu_forward,
+                init=sparse_relu_init,
+                dims={"nO": output_len, "nI": input_len},
+                params={"W": None, "b": None},
+            )
+
+        def sparse_relu_init(
+            model: Model[List[Dict[int, int]], Floats2d],
+            X: Optional[List[Dict[int, int]]] = None,
+            Y: Optional[Floats2d] = None,
+        ) -> None:
+            output_len = model.get_dim("nO")
+            model.set_param(
+                "W",
+                glorot_uniform_init(model.ops, (output_len, model.get_dim("nI"))),
+            )
+            model.set_param("b", model.ops.alloc1f(output_len))
+
+        def sparse_relu_forward(
+            model: Model[List[Dict[int, int]], Floats2d],
+            occurrence_dicts: List[Dict[int, int]],
+            is_train: bool,
+        ) -> Tuple[Floats2d, Callable]:
+            # Equivalent to a dense layer followed by a rectifier, but only the weights of the
+            # phraselets that occur in each document are read and updated
+            W = model.get_param("W")
+            rows = model.ops.xp.asarray(
+                [
+                    index
+                    for index, occurrence_dict in enumerate(occurrence_dicts)
+                    for _ in occurrence_dict
+                ],
+                dtype="i",
+            )
+            columns = model.ops.xp.asarray(
+                [
+                    key
+                    for occurrence_dict in occurrence_dicts
+                    for key in occurrence_dict
+                ],
+                dtype="i",
+            )
+            values = model.ops.asarray1f(
+                [
+                    value
+                    for occurrence_dict in occurrence_dicts
+                    for value in occurrence_dict.values()
+                ]
+            )
+            Y = model.ops.alloc2f(len(occurrence_dicts), model.get_dim("nO"))
+            model.ops.xp.add.at(Y, rows, W.T[columns] * values[:, None])
+            Y = model.ops.relu(Y + model.get_param("b"))
+
+            def backprop(dY: Floats2d) -> List[Dict[int, int]]:
+                dY = model.ops.backprop_relu(dY, Y)
+                dW = model.ops.alloc2f(*W.shape)
+                model.ops.xp.add.at(dW.T, columns, dY[rows] * values[:, None])
+                model.inc_grad("W", dW)
+                model.inc_grad("b", dY.sum(axis=0))
+                return []
+
+            return Y, backprop
+
         def get_doc_infos(
             input_len,
         ) -> Model[List[Dict[int, int]], Floats2d]:
@@ -274,12 +462,20 @@ class SupervisedTopicTrainingUtils:
 
             return return_matrix, backprop
 
+        model: Model[List[Dict[int, int]], Floats2d]
+        if sparse_input:
+            model = chain(
+                get_sparse_relu(hidden_layer_sizes[0], input_width),
+                *(Relu(size) for size in hidden_layer_sizes[1:]),
+                Softmax(output_width),
+            )
+            return model
         hidden_layers: Model[Floats2d, Floats2d]
         if len(hidden_layer_sizes) == 1:
             hidden_layers = Relu(hidden_layer_sizes[0])
         else:
             hidden_layers = chain(*(Relu(size) for size in hidden_layer_sizes))
-        model: Model[List[Dict[int, int]], Floats2d] = chain(
+        model = chain(
             get_doc_infos(input_width),
             hidden_layers,
             Softmax(output_width),
@@ -302,7 +498,10 @@ class SupervisedTopicTrainingBasis:
         one_hot: bool,
         match_all_words: bool,
         overall_similarity_threshold: float,
-        verbose: bool
+        verbose: bool,
+        worker_match_summaries_getter: Optional[
+            Callable[..., Dict[str, List[MatchSummary]]]
+        ] = None
     ):
         """Parameters:
 
@@ -319,6 +518,10 @@ class SupervisedTopicTrainingBasis:
         overall_similarity_threshold -- the overall similarity threshold for embedding-based
             matching. Defaults to *1.0*, which deactivates embedding-based matching.
         verbose -- if 'True', information about training progress is outputted to the console.
+        worker_match_summaries_getter -- a function that distributes the matching of the training
+            documents against the phraselets across worker processes and returns a dictionary
+            from document labels to match summaries, or *None* if the training documents should
+            be matched in the current process.
         """
         self.linguistic_object_factory = linguistic_object_factory
         self.structural_matcher = structural_matcher
@@ -331,6 +534,7 @@ class SupervisedTopicTrainingBasis:
         self.utils = SupervisedTopicTrainingUtils(overlap_memory_size, one_hot)
         self.match_all_words = match_all_words
         self.verbose = verbose
+        self.worker_match_summaries_getter = worker_match_summaries_getter
 
         self.training_document_labels_to_documents: Dict[str, Doc] = {}
         self.reverse_dict: Dict[str, List[CorpusWordPosition]] = {}
@@ -338,6 +542,11 @@ class SupervisedTopicTrainingBasis:
         self.additional_classification_labels: Set[str] = set()
         self.classification_implication_dict: Dict[str, List[str]] = {}
         self.labels_to_classification_frequencies: Optional[Dict[str, Any]] = None
+        # Summaries of the matches found by prepare(), which are reused for each model that is
+        # trained
+        self.training_document_labels_to_match_summaries: Dict[
+            str, List[MatchSummary]
+        ] = {}
         self.phraselet_labels_to_phraselet_infos: Dict[str, PhraseletInfo] = {}
         self.classifications: Optional[List[str]] = None
 
@@ -426,30 +635,51 @@ class SupervisedTopicTrainingBasis:
             raise RuntimeError("prepare() may only be called once")
         if self.verbose:
             print("Matching documents against all phraselets")
-        search_phrases = (
+        phraselet_labels_to_search_phrases = (
             self.linguistic_object_factory.create_search_phrases_from_phraselet_infos(
                 list(self.phraselet_labels_to_phraselet_infos.values())
-            ).values()
+            )
         )
+        if self.worker_match_summaries_getter is not None:
+            self.training_document_labels_to_match_summaries = self.worker_match_summaries_getter(
+                phraselet_labels_to_search_phrases=phraselet_labels_to_search_phrases,
+                overall_similarity_threshold=self.overall_similarity_threshold,
+                training_document_labels_to_documents=self.training_document_labels_to_documents,
+                reverse_dict=self.reverse_dict,
+            )
+        else:
+            matches = self.structural_matcher.match(
+                word_matching_strategies=self.semantic_matching_helper.main_word_matching_strategies
+                + self.semantic_matching_helper.ontology_word_matching_strategies
+                + self.semantic_matching_helper.embedding_word_matching_strategies,
+                document_labels_to_documents=self.training_document_labels_to_documents,
+                reverse_dict=self.reverse_dict,
+                search_phrases=phraselet_labels_to_search_phrases.values(),
+                match_depending_on_single_words=None,
+                compare_embeddings_on_root_words=False,
+                compare_embeddings_on_non_root_words=True,
+                reverse_matching_cwps=None,
+                embedding_reverse_matching_cwps=None,
+                process_initial_question_words=False,
+                overall_similarity_threshold=self.overall_similarity_threshold,
+                initial_question_word_overall_similarity_threshold=1.0,
+            )
+            self.training_document_labels_to_match_summaries = {
+                label: [] for label in self.training_document_labels_to_documents
+            }
+            for match_summary in self.utils.get_match_summaries(matches):
+                self.training_document_labels_to_match_summaries[
+                    match_summary[0]
+                ].append(match_summary)
+            del matches
         self.labels_to_classification_frequencies = cast(
             Dict[str, Dict[str, int]],
             self.utils.get_labels_to_classification_frequencies_dict(
-                matches=self.structural_matcher.match(
-                    word_matching_strategies=self.semantic_matching_helper.main_word_matching_strategies
-                    + self.semantic_matching_helper.ontology_word_matching_strategies
-                    + self.semantic_matching_helper.embedding_word_matching_strategies,
-                    document_labels_to_documents=self.training_document_labels_to_documents,
-                    reverse_dict=self.reverse_dict,
-                    search_phrases=search_phrases,
-                    match_depending_on_single_words=None,
-                    compare_embeddings_on_root_words=False,
-                    compare_embeddings_on_non_root_words=True,
-                    reverse_matching_cwps=None,
-                    embedding_reverse_matching_cwps=None,
-                    process_initial_question_words=False,
-                    overall_similarity_threshold=self.overall_similarity_threshold,
-                    initial_question_word_overall_similarity_threshold=1.0,
-                ),
+                match_summaries=[
+                    match_summary
+                    for match_summaries in self.training_document_labels_to_match_summaries.values()
+                    for match_summary in match_summaries
+                ],
                 labels_to_classifications_dict=self.training_documents_labels_to_classifications_dict,
             ),
         )
@@ -584,25 +814,31 @@ class SupervisedTopicModelTrainer:
                 )
             )
 
-        phraselet_labels_to_search_phrases = (
-            self.linguistic_object_factory.create_search_phrases_from_phraselet_infos(
-                self.phraselet_infos
-            )
-        )
         self.sorted_label_dict = {}
         for index, label in enumerate(
             sorted(self.labels_to_classification_frequencies.keys())
         ):
             self.sorted_label_dict[label] = index
         if self.training_basis.verbose:
-            print("Matching documents against filtered phraselets")
-        self.occurrence_dicts = self.utils.get_occurrence_dicts(
-            phraselet_labels_to_search_phrases=phraselet_labels_to_search_phrases,
-            semantic_matching_helper=self.semantic_matching_helper,
-            structural_matcher=self.structural_matcher,
+            print("Recording matches of filtered phraselets")
+        # Phraselets are matched independently of one another, so the matches of the filtered
+        # phraselets are exactly those that matching against them alone would find
+        filtered_phraselet_labels = {
+            phraselet_info.label for phraselet_info in self.phraselet_infos
+        }
+        self.occurrence_dicts = self.utils.get_occurrence_dicts_from_match_summaries(
+            document_labels_to_match_summaries={
+                document_label: [
+                    match_summary
+                    for match_summary in match_summaries
+                    if match_summary[3] in filtered_phraselet_labels
+                ]
+                for (
+                    document_label,
+                    match_summaries,
+                ) in self.training_basis.training_document_labels_to_match_summaries.items()
+            },
             sorted_label_dict=self.sorted_label_dict,
-            overall_similarity_threshold=self.training_basis.overall_similarity_threshold,
-            training_document_labels_to_documents=self.training_basis.training_document_labels_to_documents,
         )
         self.output_matrix = self.record_classifications_for_training()
 
@@ -785,10 +1021,18 @@ class SupervisedTopicModelTrainer:
         """Returns a supervised topic classifier which contains no explicit references to the
         training data and that can be serialized.
         """
+        phraselet_labels_to_search_phrases = (
+            self.linguistic_object_factory.create_search_phrases_from_phraselet_infos(
+                self.phraselet_infos
+            )
+        )
+        for search_phrase in phraselet_labels_to_search_phrases.values():
+            search_phrase.pack()
         model = SupervisedTopicClassifierModel(
             semantic_analyzer_model=self.semantic_analyzer.model,
             structural_matching_ontology=self.linguistic_object_factory.ontology,
             phraselet_infos=self.phraselet_infos,
+            packed_phraselet_labels_to_search_phrases=phraselet_labels_to_search_phrases,
             sorted_label_dict=self.sorted_label_dict,
             classifications=self.training_basis.classifications,
             overlap_memory_size=self.utils.overlap_memory_size,
@@ -815,6 +1059,10 @@ class SupervisedTopicClassifierModel:
     structural_matching_ontology -- the ontology used for matching documents against this model
             (not the classification ontology!)
     phraselet_infos -- the phraselets used for structural matching
+    packed_phraselet_labels_to_search_phrases -- a dictionary from phraselet labels to the
+        search phrases created from *phraselet_infos* in packed form, which saves recreating
+        the search phrases when the model is deserialized. Not present in models with
+        versions before *1.2*.
     sorted_label_dict -- a dictionary from search phrase (phraselet) labels to their own
         alphabetic sorting indexes.
     classifications -- an ordered list of classification labels corresponding to the
@@ -836,6 +1084,7 @@ class SupervisedTopicClassifierModel:
         semantic_analyzer_model: str,
         structural_matching_ontology: Ontology,
         phraselet_infos: List[PhraseletInfo],
+        packed_phraselet_labels_to_search_phrases: Dict[str, SearchPhrase],
         sorted_label_dict: Dict[str, int],
         classifications: List[str],
         overlap_memory_size: int,
@@ -847,6 +1096,9 @@ class SupervisedTopicClassifierModel:
         self.semantic_analyzer_model = semantic_analyzer_model
         self.structural_matching_ontology = structural_matching_ontology
         self.phraselet_infos = phraselet_infos
+        self.packed_phraselet_labels_to_search_phrases = (
+            packed_phraselet_labels_to_search_phrases
+        )
         self.sorted_label_dict = sorted_label_dict
         self.classifications = classifications
         self.overlap_memory_size = overlap_memory_size
@@ -854,7 +1106,7 @@ class SupervisedTopicClassifierModel:
         self.analyze_derivational_morphology = analyze_derivational_morphology
         self.hidden_layer_sizes = hidden_layer_sizes
         self.serialized_thinc_model = serialized_thinc_model
-        self.version = "1.0"
+        self.version = "1.2"
 
 
 class SupervisedTopicClassifier:
@@ -914,16 +1166,27 @@ class SupervisedTopicClassifier:
                     ontology_reverse_derivational_dict=self.linguistic_object_factory.ontology_reverse_derivational_dict,
                 )
             ]
-        self.phraselet_labels_to_search_phrases = (
-            self.linguistic_object_factory.create_search_phrases_from_phraselet_infos(
+        if model.version in ("1.0", "1.1"):
+            self.phraselet_labels_to_search_phrases = self.linguistic_object_factory.create_search_phrases_from_phraselet_infos(
                 model.phraselet_infos
             )
-        )
+        else:
+            self.phraselet_labels_to_search_phrases = {}
+            for (
+                label,
+                packed_search_phrase,
+            ) in model.packed_phraselet_labels_to_search_phrases.items():
+                # The model retains the packed search phrases so that it can be serialized again
+                search_phrase = copy(packed_search_phrase)
+                search_phrase.unpack(self.semantic_analyzer.nlp.vocab)
+                self.phraselet_labels_to_search_phrases[label] = search_phrase
 
         self.thinc_model = self.utils.get_thinc_model(
             hidden_layer_sizes=model.hidden_layer_sizes,
             input_width=len(model.sorted_label_dict),
             output_width=len(model.classifications),
+            # Models serialized before sparse input was introduced expect a dense input matrix
+            sparse_input=model.version != "1.0",
         )
         self.thinc_model.from_dict(model.serialized_thinc_model)
 
@@ -938,6 +1201,29 @@ class SupervisedTopicClassifier:
         """
         return self.classify(self.semantic_analyzer.parse(text))
 
+    def parse_and_classify_batch(
+        self, texts: Iterable[str], batch_size: int = 100, n_process: int = 1
+    ) -> List[Optional[OrderedDict]]:
+        """Returns a list containing, for each text, a dictionary from classification labels
+        to probabilities ordered starting with the most probable, or *None* if the text did
+        not contain any words recognised by the model.
+
+        Parameters:
+
+        texts -- the texts to parse and classify.
+        batch_size -- the number of texts that are parsed and classified together.
+        n_process -- the number of processes spaCy should use to parse the texts.
+        """
+        results: List[Optional[OrderedDict]] = []
+        batch: List[Doc] = []
+        for doc in self.semantic_analyzer.parse_batch(texts, batch_size, n_process):
+            batch.append(doc)
+            if len(batch) == batch_size:
+                results.extend(self.classify_batch(batch))
+                batch = []
+        results.extend(self.classify_batch(batch))
+        return results
+
     def classify(self, doc: Doc) -> Optional[OrderedDict]:
         """Returns a dictionary from classification labels to probabilities
         ordered starting with the most probable, or *None* if the text did
@@ -947,28 +1233,41 @@ class SupervisedTopicClassifier:
 
         doc -- the pre-parsed document to classify.
         """
+        return self.classify_batch([doc])[0]
+
+    def classify_batch(self, docs: List[Doc]) -> List[Optional[OrderedDict]]:
+        """Returns a list containing, for each document, a dictionary from classification
+        labels to probabilities ordered starting with the most probable, or *None* if the
+        document did not contain any words recognised by the model. The documents are matched
+        against the model phraselets together and the neural network is run once for all of
+        them.
+
+        Parameter:
+
+        docs -- the pre-parsed documents to classify.
+        """
 
         if self.thinc_model is None:
             raise RuntimeError("No model defined")
+        if len(docs) == 0:
+            return []
+        # Zero-padded so that the alphabetical order of the labels is the order of the documents
+        label_width = len(str(len(docs) - 1))
         occurrence_dicts = self.utils.get_occurrence_dicts(
             semantic_matching_helper=self.semantic_matching_helper,
             structural_matcher=self.structural_matcher,
             phraselet_labels_to_search_phrases=self.phraselet_labels_to_search_phrases,
             sorted_label_dict=self.model.sorted_label_dict,
             overall_similarity_threshold=self.overall_similarity_threshold,
-            training_document_labels_to_documents={"": doc},
+            training_document_labels_to_documents={
+                str(index).zfill(label_width): doc for index, doc in enumerate(docs)
+            },
+        )
+        return self.utils.get_classification_dicts(
+            thinc_model=self.thinc_model,
+            occurrence_dicts=occurrence_dicts,
+            classifications=self.model.classifications,
         )
-        if len(occurrence_dicts[0]) == 0:
-            return None
-        else:
-            return_dict = OrderedDict()
-            predictions = self.thinc_model.predict(occurrence_dicts)[0]
-            for i in (-predictions).argsort():  # type:ignore[attr-defined]
-                return_dict[self.model.classifications[i.item()]] = predictions[
-                    i
-                ].item()
-
-            return return_dict
 
     def serialize_model(self) -> bytes:
         return pickle.dumps(self.model)
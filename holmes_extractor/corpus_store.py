@@ -0,0 +1,196 @@
+from typing import Dict, List, Optional, Any, Tuple, Callable, Iterator
+from collections.abc import MutableMapping
+import os
+import mmap
+import pickle
+import srsly
+from spacy.tokens import Doc
+from .parsing import CorpusWordPosition
+
+CORPUS_STORE_VERSION = "1.0"
+
+MANIFEST_FILENAME = "manifest.json"
+
+DOCUMENTS_FILE_EXTENSION = "documents"
+
+INDEX_FILE_EXTENSION = "index"
+
+
+class LazyDocumentDictionary(MutableMapping):
+    """A dictionary from document labels to documents in which documents loaded from a corpus
+    store remain in the memory-mapped store file until they are first accessed.
+
+    Parameters:
+
+    deserialize -- a function that recreates a document from its compact serialized form.
+    """
+
+    def __init__(self, deserialize: Callable[[bytes], Doc]) -> None:
+        self._documents: Dict[str, Doc] = {}
+        self._locations: Dict[str, Tuple[mmap.mmap, int, int]] = {}
+        self._deserialize = deserialize
+
+    def add_serialized(
+        self, label: str, mapped_file: mmap.mmap, offset: int, length: int
+    ) -> None:
+        """Registers a document that is stored at *offset* within *mapped_file*."""
+        self._documents.pop(label, None)
+        self._locations[label] = (mapped_file, offset, length)
+
+    def get_serialized(self, label: str) -> Optional[bytes]:
+        """Returns the compact serialized form of the document with label *label* if it has
+        not yet been deserialized, otherwise *None*."""
+        if label not in self._locations:
+            return None
+        mapped_file, offset, length = self._locations[label]
+        return mapped_file[offset : offset + length]
+
+    def __getitem__(self, label: str) -> Doc:
+        if label not in self._documents:
+            serialized_document = self.get_serialized(label)
+            if serialized_document is None:
+                raise KeyError(label)
+            self._documents[label] = self._deserialize(serialized_document)
+            del self._locations[label]
+        return self._documents[label]
+
+    def __setitem__(self, label: str, doc: Doc) -> None:
+        self._locations.pop(label, None)
+        self._documents[label] = doc
+
+    def __delitem__(self, label: str) -> None:
+        if label in self._documents:
+            del self._documents[label]
+        else:
+            del self._locations[label]
+
+    def __contains__(self, label: Any) -> bool:
+        return label in self._documents or label in self._locations
+
+    def __iter__(self) -> Iterator[str]:
+        # Work on a copy as accessing a document moves its label between the dictionaries
+        return iter(list(self._documents) + list(self._locations))
+
+    def __len__(self) -> int:
+        return len(self._documents) + len(self._locations)
+
+    def clear(self) -> None:
+        self._documents = {}
+        self._locations = {}
+
+
+class CorpusStore:
+    """Reads and writes corpus stores: directories that persist the documents registered with
+    a *Manager* together with each worker's reverse dictionary and corpus frequencies, so
+    that a *Manager* can be restarted without reparsing or reindexing its documents.
+
+    Each worker writes one shard consisting of a documents file containing the compact
+    serialized forms of its documents one after another, which is memory-mapped when the
+    store is loaded, and an index file containing the offsets of the documents within the
+    documents file, the reverse dictionary and the corpus frequencies. The manifest lists the
+    shards that make up the current snapshot and is replaced atomically once all shards have
+    been written, so that an interrupted save leaves the previous snapshot intact.
+    """
+
+    @staticmethod
+    def manifest_exists(directory: str) -> bool:
+        return os.path.isfile(os.sep.join((directory, MANIFEST_FILENAME)))
+
+    @staticmethod
+    def read_manifest(directory: str) -> Dict[str, Any]:
+        return srsly.read_json(os.sep.join((directory, MANIFEST_FILENAME)))
+
+    @staticmethod
+    def write_manifest(directory: str, manifest: Dict[str, Any]) -> None:
+        manifest_filename = os.sep.join((directory, MANIFEST_FILENAME))
+        temporary_filename = ".".join((manifest_filename, "tmp"))
+        srsly.write_json(temporary_filename, manifest)
+        os.replace(temporary_filename, manifest_filename)
+
+    @staticmethod
+    def remove_unreferenced_files(directory: str, manifest: Dict[str, Any]) -> None:
+        """Removes shard files belonging to earlier snapshots."""
+        referenced_filenames = set()
+        for shard in manifest["shards"]:
+            referenced_filenames.add(shard["documents"])
+            referenced_filenames.add(shard["index"])
+        for filename in os.listdir(directory):
+            if (
+                filename.endswith(
+                    (
+                        "".join((".", DOCUMENTS_FILE_EXTENSION)),
+                        "".join((".", INDEX_FILE_EXTENSION)),
+                    )
+                )
+                and filename not in referenced_filenames
+            ):
+                try:
+                    os.remove(os.sep.join((directory, filename)))
+                except OSError:
+                    # The file may still be mapped by a worker on some platforms
+                    pass
+
+    @staticmethod
+    def write_shard(
+        directory: str,
+        shard_name: str,
+        labels_to_serialized_documents: Iterator[Tuple[str, bytes]],
+        reverse_dict: Dict[str, List[CorpusWordPosition]],
+        words_to_corpus_frequencies: Dict[str, int],
+    ) -> Dict[str, Any]:
+        """Writes a shard and returns its manifest entry.
+
+        Parameters:
+
+        directory -- the directory of the corpus store.
+        shard_name -- a name for the shard that is unique within the store.
+        labels_to_serialized_documents -- an iterator over pairs of document labels and
+            documents in the compact serialized form.
+        reverse_dict -- the reverse dictionary indexing the documents.
+        words_to_corpus_frequencies -- the corpus frequencies of the words in the documents.
+        """
+        documents_filename = ".".join((shard_name, DOCUMENTS_FILE_EXTENSION))
+        index_filename = ".".join((shard_name, INDEX_FILE_EXTENSION))
+        labels_to_locations = {}
+        offset = 0
+        with open(os.sep.join((directory, documents_filename)), "wb") as file:
+            for label, serialized_document in labels_to_serialized_documents:
+                file.write(serialized_document)
+                labels_to_locations[label] = (offset, len(serialized_document))
+                offset += len(serialized_document)
+        with open(os.sep.join((directory, index_filename)), "wb") as file:
+            pickle.dump(
+                (labels_to_locations, reverse_dict, words_to_corpus_frequencies),
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        return {
+            "documents": documents_filename,
+            "index": index_filename,
+            "labels": list(labels_to_locations),
+        }
+
+    @staticmethod
+    def read_shard(directory: str, shard: Dict[str, Any]) -> Tuple[
+        Optional[mmap.mmap],
+        Dict[str, Tuple[int, int]],
+        Dict[str, List[CorpusWordPosition]],
+        Dict[str, int],
+    ]:
+        """Memory-maps the documents file of a shard and reads its index file. Returns the
+        mapped documents file, a dictionary from labels to document offsets and lengths,
+        the reverse dictionary and the corpus frequencies."""
+        with open(os.sep.join((directory, shard["index"])), "rb") as file:
+            labels_to_locations, reverse_dict, words_to_corpus_frequencies = (
+                pickle.load(file)
+            )
+        mapped_file = None
+        if len(labels_to_locations) > 0:
+            with open(os.sep.join((directory, shard["documents"])), "rb") as file:
+                mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return (
+            mapped_file,
+            labels_to_locations,
+            reverse_dict,
+            words_to_corpus_frequencies,
+        )
@@ -72,3 +72,7 @@ class MultiprocessingParsingNotSupportedError(HolmesError):
 
 class OntologyObjectSharedBetweenManagersError(HolmesError):
     pass
+
+
+class NoSupervisedTopicClassifierError(HolmesError):
+    pass
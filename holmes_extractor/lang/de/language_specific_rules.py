@@ -11,6 +11,7 @@ from ...parsing import (
     PhraseletTemplate,
     SemanticDependency,
     Subword,
+    SubwordCache,
 )
 
 
@@ -361,10 +362,9 @@ class LanguageSpecificSemanticAnalyzer(SemanticAnalyzer):
             and len(list(token.children)) == 0
         )
 
-    def add_subwords(
-        self, token: Token, subword_cache: Dict[str, List[Subword]]
-    ) -> None:
-        """Adds any subwords to *token._.holmes*."""
+    def add_subwords(self, token: Token, subword_cache: SubwordCache) -> None:
+        """Adds any subwords to *token._.holmes*. Results for words without hyphens are
+        retained in *subword_cache*, which is shared between documents."""
 
         class PossibleSubword:
             """A subword within a possible solution.
@@ -384,15 +384,32 @@ class LanguageSpecificSemanticAnalyzer(SemanticAnalyzer):
                 self.char_start_index = char_start_index
                 self.fugen_s_status = fugen_s_status
 
+        # The recursive scan repeatedly requests the same subwords and vocabulary lookups,
+        # so both are memoised for the duration of the call.
+        get_subword_memo: Dict[Tuple[str, int, int], Optional[str]] = {}
+        is_oov_memo: Dict[str, bool] = {}
+
+        def is_oov(word: str) -> bool:
+            if word not in is_oov_memo:
+                is_oov_memo[word] = self.is_oov(word)
+            return is_oov_memo[word]
+
         def get_subword(lemma: str, initial_index: int, length: int) -> Optional[str]:
+            key = (lemma, initial_index, length)
+            if key not in get_subword_memo:
+                get_subword_memo[key] = get_subword_without_memo(
+                    lemma, initial_index, length
+                )
+            return get_subword_memo[key]
+
+        def get_subword_without_memo(
+            lemma: str, initial_index: int, length: int
+        ) -> Optional[str]:
             # find the shortest subword longer than length.
             for end_index in range(initial_index + length, len(lemma) + 1):
                 possible_word = lemma[initial_index:end_index]
                 if (
-                    (
-                        not self.is_oov(possible_word)
-                        or possible_word in self.subword_whitelist
-                    )
+                    (not is_oov(possible_word) or possible_word in self.subword_whitelist)
                     and len(possible_word) >= 2
                     and (
                         possible_word[0] in self.vowels
@@ -556,22 +573,32 @@ class LanguageSpecificSemanticAnalyzer(SemanticAnalyzer):
             or token._.holmes.lemma in punctuation
         ):
             return
-        if token.text in subword_cache:
-            cached_subwords = subword_cache[token.text]
-            for cached_subword in cached_subwords:
+        cached_entry = subword_cache.get(token.text)
+        if cached_entry is not None:
+            for (
+                index,
+                text,
+                lemma,
+                derived_lemma,
+                char_start_index,
+                dependent_index,
+                dependency_label,
+                governor_index,
+                governing_dependency_label,
+            ) in cached_entry:
                 token._.holmes.subwords.append(
                     Subword(
                         token.i,
-                        cached_subword.index,
-                        cached_subword.text,
-                        cached_subword.lemma,
-                        cached_subword.derived_lemma,
-                        self.get_vector(cached_subword.lemma),
-                        cached_subword.char_start_index,
-                        cached_subword.dependent_index,
-                        cached_subword.dependency_label,
-                        cached_subword.governor_index,
-                        cached_subword.governing_dependency_label,
+                        index,
+                        text,
+                        lemma,
+                        derived_lemma,
+                        self.vector_source,
+                        char_start_index,
+                        dependent_index,
+                        dependency_label,
+                        governor_index,
+                        governing_dependency_label,
                     )
                 )
         else:
@@ -584,7 +611,7 @@ class LanguageSpecificSemanticAnalyzer(SemanticAnalyzer):
                 return
             if len(possible_subwords) == 1 and token._.holmes.lemma.isalpha():
                 # not ... isalpha(): hyphenation
-                subword_cache[token.text] = []
+                subword_cache.put(token.text, [])
             else:
                 index = 0
                 if token._.holmes.lemma[0] == "-":
@@ -638,7 +665,7 @@ class LanguageSpecificSemanticAnalyzer(SemanticAnalyzer):
                                         text,
                                         lemma,
                                         derived_lemma,
-                                        self.get_vector(lemma),
+                                        self.vector_source,
                                         first_sibling_possible_subword.char_start_index,
                                         None,
                                         None,
@@ -665,7 +692,7 @@ class LanguageSpecificSemanticAnalyzer(SemanticAnalyzer):
                             text.lower(),
                             lemma,
                             derived_lemma,
-                            self.get_vector(lemma),
+                            self.vector_source,
                             possible_subword.char_start_index,
                             None,
                             None,
@@ -722,7 +749,7 @@ class LanguageSpecificSemanticAnalyzer(SemanticAnalyzer):
                                             text.lower(),
                                             lemma,
                                             derived_lemma,
-                                            self.get_vector(lemma),
+                                            self.vector_source,
                                             last_sibling_possible_subword.char_start_index,
                                             None,
                                             None,
@@ -756,7 +783,7 @@ class LanguageSpecificSemanticAnalyzer(SemanticAnalyzer):
                                 working_subword.text.lower(),
                                 working_subword.lemma,
                                 working_subword.derived_lemma,
-                                self.get_vector(working_subword.lemma),
+                                self.vector_source,
                                 working_subword.char_start_index,
                                 dependent_index,
                                 dependency_label,
@@ -765,7 +792,7 @@ class LanguageSpecificSemanticAnalyzer(SemanticAnalyzer):
                             )
                         )
                 if token._.holmes.lemma.isalpha():  # caching only where no hyphenation
-                    subword_cache[token.text] = token._.holmes.subwords
+                    subword_cache.put(token.text, token._.holmes.subwords)
         if len(token._.holmes.subwords) > 1 and "nicht" in (
             subword.lemma for subword in token._.holmes.subwords
         ):
@@ -6,7 +6,7 @@ from ...parsing import (
     MatchImplication,
     PhraseletTemplate,
     SemanticDependency,
-    Subword,
+    SubwordCache,
 )
 
 
@@ -122,9 +122,7 @@ class LanguageSpecificSemanticAnalyzer(SemanticAnalyzer):
 
     whose_lemma = "whose"
 
-    def add_subwords(
-        self, token: Token, subword_cache: Dict[str, List[Subword]]
-    ) -> None:
+    def add_subwords(self, token: Token, subword_cache: SubwordCache) -> None:
         pass
         """Analyses the internal structure of the word to find atomic semantic elements. Is
         relevant for German but not implemented for English.
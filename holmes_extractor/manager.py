@@ -1,12 +1,17 @@
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union, Tuple, Set
+from collections import OrderedDict
+from copy import copy
 from multiprocessing import Process, Queue, Manager as MultiprocessingManager, cpu_count
 from threading import Lock
 from string import punctuation
 from math import sqrt
+from time import time
+from queue import Empty
 import traceback
 import sys
 import os
 import pickle
+import hashlib
 import pkg_resources
 import spacy
 import coreferee
@@ -16,7 +21,9 @@ from spacy.tokens import Doc, Token
 from wasabi import Printer  # type: ignore[import]
 from thinc.api import Config
 from .errors import *
-from .structural_matching import StructuralMatcher
+from .structural_matching import StructuralMatcher, SearchPhraseIndex, Deadline
+from .serialization import CompactDocumentSerializer
+from .corpus_store import CorpusStore, LazyDocumentDictionary, CORPUS_STORE_VERSION
 from .ontology import Ontology
 from .parsing import (
     SemanticAnalyzerFactory,
@@ -24,9 +31,19 @@ from .parsing import (
     SemanticMatchingHelperFactory,
     LinguisticObjectFactory,
     SearchPhrase,
+    ParseProfile,
+    DEFAULT_PARSE_PROFILE,
+    VectorSource,
+    CorpusWordPosition,
     SERIALIZED_DOCUMENT_VERSION,
+    UPGRADABLE_SERIALIZED_DOCUMENT_VERSIONS,
+)
+from .classification import (
+    SupervisedTopicTrainingBasis,
+    SupervisedTopicClassifier,
+    SupervisedTopicTrainingUtils,
+    MatchSummary,
 )
-from .classification import SupervisedTopicTrainingBasis, SupervisedTopicClassifier
 from .topic_matching import TopicMatcher, TopicMatchDictionaryOrderer
 from .consoles import HolmesConsoles
 from .word_matching.derivation import DerivationWordMatchingStrategy
@@ -39,6 +56,16 @@ from .word_matching.ontology import OntologyWordMatchingStrategy
 
 TIMEOUT_SECONDS = 180
 
+# How long after the deadline of a time-limited query the manager waits for workers that have
+# not yet replied before returning the results it has received
+DEADLINE_GRACE_SECONDS = 1.0
+
+# The number of training documents a worker matches against phraselets per call when a
+# supervised topic training basis is prepared, which keeps each call well within *TIMEOUT_SECONDS*
+TRAINING_MATCHING_BATCH_SIZE = 100
+
+SERIALIZED_SEARCH_PHRASES_VERSION = "1.0"
+
 absolute_config_filename = pkg_resources.resource_filename(__name__, "config.cfg")
 config = Config().from_disk(absolute_config_filename)
 vector_nlps_config_dict = config["vector_nlps"]
@@ -106,6 +133,10 @@ class Manager:
         processes should depend on the number of available cores. Defaults to *None*
     verbose -- a boolean value specifying whether multiprocessing messages should be outputted to
         the console. Defaults to *False*
+    parse_profile -- a *ParseProfile* object specifying which optional stages should be
+        performed when parsing documents, or *None* if all stages should be performed.
+        Search phrases and topic-matching query texts are always parsed with all stages.
+        Defaults to *None*.
     """
 
     def __init__(
@@ -119,9 +150,13 @@ class Manager:
         perform_coreference_resolution: bool = True,
         use_reverse_dependency_matching: bool = True,
         number_of_workers: int = None,
-        verbose: bool = False
+        verbose: bool = False,
+        parse_profile: ParseProfile = None
     ):
         self.verbose = verbose
+        self.parse_profile = (
+            parse_profile if parse_profile is not None else DEFAULT_PARSE_PROFILE
+        )
         self.nlp = get_nlp(model)
         with pipeline_components_lock:
             if not self.nlp.has_pipe("coreferee"):
@@ -213,6 +248,7 @@ class Manager:
                 )
             )
 
+        self.index_signature = self._get_index_signature(ontology)
         self.overall_similarity_threshold = overall_similarity_threshold
         self.use_reverse_dependency_matching = use_reverse_dependency_matching
         self.linguistic_object_factory = LinguisticObjectFactory(
@@ -234,11 +270,23 @@ class Manager:
         )
         self.document_labels_to_worker_queues: Dict[str, int] = {}
         self.search_phrases: List[SearchPhrase] = []
+        self.supervised_topic_classifier_registered = False
+        self.compact_document_serializer = CompactDocumentSerializer()
         for (
             phraselet_template
         ) in self.semantic_matching_helper.local_phraselet_templates:
-            phraselet_template.template_doc = self.semantic_analyzer.parse(
-                phraselet_template.template_sentence
+            # A search phrase is created from a copy of a template document for each
+            # phraselet, so the template documents are stored in the compact form without
+            # a tensor or non-Holmes extension data
+            phraselet_template.template_doc = (
+                self.compact_document_serializer.deserialize(
+                    self.compact_document_serializer.serialize(
+                        self.semantic_analyzer.parse(
+                            phraselet_template.template_sentence
+                        )
+                    ),
+                    self.nlp.vocab,
+                )
             )
             if (
                 next(phraselet_template.template_doc.sents).root.i
@@ -253,6 +301,7 @@ class Manager:
             raise ValueError("number_of_workers must be a positive integer.")
         self.number_of_workers = number_of_workers
         self.next_worker_to_use = 0
+        self.next_topic_match_query_number = 0
         self.multiprocessing_manager = MultiprocessingManager()
         self.worker = (
             Worker()
@@ -275,6 +324,7 @@ class Manager:
                     self.overall_similarity_threshold,
                     self.entity_label_to_vector_dict,
                     self.nlp.vocab,
+                    self.semantic_analyzer.vectors_nlp.vocab,
                     self.semantic_analyzer.get_model_name(),
                     SERIALIZED_DOCUMENT_VERSION,
                     input_queue,
@@ -286,6 +336,27 @@ class Manager:
             this_worker.start()
         self.lock = Lock()
 
+    def _parse_document(self, document_text: str) -> Doc:
+        return self.nlp(
+            document_text,
+            disable=[] if self.parse_profile.coreference else ["coreferee"],
+            component_cfg={"holmes": {"parse_profile": self.parse_profile}},
+        )
+
+    def _get_index_signature(self, ontology: Optional[Ontology]) -> str:
+        """Returns a string that differs between *Manager* instances whose reverse dictionaries
+        would contain different entries for the same document."""
+        signature_components = [
+            type(word_matching_strategy).__name__
+            for word_matching_strategy in self.semantic_matching_helper.main_word_matching_strategies
+            + self.semantic_matching_helper.ontology_word_matching_strategies
+        ]
+        if ontology is not None:
+            signature_components.extend(sorted(ontology.words))
+        return hashlib.sha256(
+            "\n".join(signature_components).encode("utf-8")
+        ).hexdigest()
+
     def _next_worker_queue_number(self) -> int:
         """Must be called with 'self.lock'."""
         self.next_worker_to_use += 1
@@ -294,14 +365,33 @@ class Manager:
         return self.next_worker_to_use
 
     def _handle_response(
-        self, reply_queue, number_of_messages: int, method_name: str
+        self,
+        reply_queue,
+        number_of_messages: int,
+        method_name: str,
+        deadline: Optional[float] = None,
     ) -> List[Any]:
+        """Returns the values returned by the workers. If *deadline* is not *None*, workers that
+        have not replied within *DEADLINE_GRACE_SECONDS* of it are not waited for, so that fewer
+        than *number_of_messages* values may be returned."""
         return_values = []
         exception_worker_label = None
         for _ in range(number_of_messages):
-            worker_label, return_value, return_info = reply_queue.get(
-                timeout=TIMEOUT_SECONDS
-            )
+            if deadline is None:
+                timeout = TIMEOUT_SECONDS
+            else:
+                timeout = min(
+                    TIMEOUT_SECONDS,
+                    max(deadline - time(), 0.0) + DEADLINE_GRACE_SECONDS,
+                )
+            try:
+                worker_label, return_value, return_info = reply_queue.get(
+                    timeout=timeout
+                )
+            except Empty:
+                if deadline is None:
+                    raise
+                break
             if isinstance(
                 return_info,
                 (WrongModelDeserializationError, WrongVersionDeserializationError),
@@ -337,7 +427,11 @@ class Manager:
 
         Parameters:
 
-        document_dictionary -- a dictionary from labels to serialized documents.
+        document_dictionary -- a dictionary from labels to serialized documents. Documents
+            may have been serialized either with *Doc.to_bytes()* or in the compact Holmes
+            format returned by *to_compact_bytes()*. Documents serialized with *Doc.to_bytes()*
+            by Holmes 4.0, which stored a vector for every token, can still be registered;
+            their vectors are then looked up on demand like those of newer documents.
         """
         reply_queue = self.multiprocessing_manager.Queue()
         with self.lock:
@@ -380,8 +474,8 @@ class Manager:
             which is intended for use cases involving single documents (typically user entries).
         """
 
-        doc = self.nlp(document_text)
-        self.register_serialized_document(doc.to_bytes(), label)
+        doc = self._parse_document(document_text)
+        self.register_serialized_document(self.to_compact_bytes(doc), label)
 
     def remove_document(self, label: str) -> None:
         """Parameters:
@@ -433,7 +527,7 @@ class Manager:
             unsorted_labels = self.document_labels_to_worker_queues.keys()
         return sorted(unsorted_labels)
 
-    def serialize_document(self, label: str) -> Optional[bytes]:
+    def serialize_document(self, label: str, compact: bool = False) -> Optional[bytes]:
         """Returns a serialized representation of a Holmes document that can be persisted to
             a file. If *label* is not the label of a registered document, *None* is returned
             instead.
@@ -441,18 +535,37 @@ class Manager:
         Parameters:
 
         label -- the label of the document to be serialized.
+        compact -- *True* if the document should be serialized in the compact Holmes format
+            rather than with *Doc.to_bytes()*. Compact documents are considerably smaller and
+            faster to register, but can only be registered with a *Manager* and cannot be
+            loaded with *Doc.from_bytes()*. Defaults to *False*.
         """
         reply_queue = self.multiprocessing_manager.Queue()
         with self.lock:
             if label in self.document_labels_to_worker_queues:
                 self.input_queues[self.document_labels_to_worker_queues[label]].put(
-                    (self.worker.get_serialized_document, (label,), reply_queue),
+                    (
+                        self.worker.get_serialized_document,
+                        (label, compact),
+                        reply_queue,
+                    ),
                     timeout=TIMEOUT_SECONDS,
                 )
             else:
                 return None
         return self._handle_response(reply_queue, 1, "serialize_document")[0]
 
+    def to_compact_bytes(self, doc: Doc) -> bytes:
+        """Returns a representation of a document parsed with this *Manager*'s *nlp* object
+        in the compact Holmes format, which can be persisted to a file and passed to
+        *register_serialized_documents()*.
+
+        Parameters:
+
+        doc -- the parsed document.
+        """
+        return self.compact_document_serializer.serialize(doc)
+
     def get_document(self, label: str = "") -> Optional[Doc]:
         """Returns a Holmes document. If *label* is not the label of a registered document, *None*
             is returned instead.
@@ -477,10 +590,167 @@ class Manager:
         else:
             print("No document with label", label)
 
-    def _create_search_phrase(self, search_phrase_text: str, label: Optional[str]):
+    def save_corpus_store(self, directory: str) -> None:
+        """Saves a snapshot of the registered documents to a corpus store in *directory*,
+        which is created if it does not already exist. Each worker writes its own shard
+        containing its documents in the compact Holmes format together with its reverse
+        dictionary and corpus frequencies. A snapshot already present in *directory* is
+        replaced once the new snapshot has been completely written.
+
+        Parameters:
+
+        directory -- the directory of the corpus store.
+        """
+        os.makedirs(directory, exist_ok=True)
+        generation = (
+            CorpusStore.read_manifest(directory)["generation"] + 1
+            if CorpusStore.manifest_exists(directory)
+            else 1
+        )
+        reply_queue = self.multiprocessing_manager.Queue()
+        with self.lock:
+            for worker_index in range(self.number_of_workers):
+                self.input_queues[worker_index].put(
+                    (
+                        self.worker.save_corpus_store_shard,
+                        (
+                            directory,
+                            "-".join(("shard", str(generation), str(worker_index))),
+                        ),
+                        reply_queue,
+                    ),
+                    timeout=TIMEOUT_SECONDS,
+                )
+        shards = self._handle_response(
+            reply_queue, self.number_of_workers, "save_corpus_store"
+        )
+        if len(shards) < self.number_of_workers:
+            raise RuntimeError("Corpus store shard could not be saved.")
+        manifest = {
+            "corpus_store_version": CORPUS_STORE_VERSION,
+            "model": self.semantic_analyzer.get_model_name(),
+            "serialized_document_version": SERIALIZED_DOCUMENT_VERSION,
+            "index_signature": self.index_signature,
+            "generation": generation,
+            "shards": sorted(
+                (shard for shard in shards if len(shard["labels"]) > 0),
+                key=lambda shard: shard["documents"],
+            ),
+        }
+        CorpusStore.write_manifest(directory, manifest)
+        CorpusStore.remove_unreferenced_files(directory, manifest)
+
+    def load_corpus_store(self, directory: str) -> None:
+        """Registers the documents in a corpus store previously saved with
+        *save_corpus_store()*. The documents are memory-mapped and only deserialized when they
+        are first required, and the saved reverse dictionaries and corpus frequencies are
+        reused as long as this *Manager* indexes documents in the same way as the *Manager*
+        that saved the store. Documents added since the snapshot was saved can then be
+        registered in the normal way.
+
+        Parameters:
+
+        directory -- the directory of the corpus store.
+        """
+        manifest = CorpusStore.read_manifest(directory)
+        if manifest["model"] != self.semantic_analyzer.get_model_name():
+            raise WrongModelDeserializationError(
+                "; ".join((self.semantic_analyzer.get_model_name(), manifest["model"]))
+            )
+        if (
+            manifest["corpus_store_version"] != CORPUS_STORE_VERSION
+            or manifest["serialized_document_version"] != SERIALIZED_DOCUMENT_VERSION
+        ):
+            raise WrongVersionDeserializationError(
+                "; ".join(
+                    (
+                        SERIALIZED_DOCUMENT_VERSION,
+                        str(manifest["serialized_document_version"]),
+                    )
+                )
+            )
+        use_stored_index = manifest["index_signature"] == self.index_signature
+        reply_queue = self.multiprocessing_manager.Queue()
+        with self.lock:
+            for shard in manifest["shards"]:
+                for label in shard["labels"]:
+                    if label in self.document_labels_to_worker_queues:
+                        raise DuplicateDocumentError(label)
+            worker_queue_numbers_to_shards: Dict[int, List[Dict[str, Any]]] = {}
+            for shard in manifest["shards"]:
+                worker_queue_number = self._next_worker_queue_number()
+                if worker_queue_number not in worker_queue_numbers_to_shards:
+                    worker_queue_numbers_to_shards[worker_queue_number] = []
+                worker_queue_numbers_to_shards[worker_queue_number].append(shard)
+                for label in shard["labels"]:
+                    self.document_labels_to_worker_queues[label] = worker_queue_number
+            for worker_queue_number, shards in worker_queue_numbers_to_shards.items():
+                self.input_queues[worker_queue_number].put(
+                    (
+                        self.worker.load_corpus_store_shards,
+                        (directory, shards, use_stored_index),
+                        reply_queue,
+                    ),
+                    timeout=TIMEOUT_SECONDS,
+                )
+            self.word_dictionaries_need_rebuilding = True
+        self._handle_response(
+            reply_queue, len(worker_queue_numbers_to_shards), "load_corpus_store"
+        )
+
+    def serialize_subword_cache(self) -> bytes:
+        """Returns a serialized representation of the cache of subwords found when parsing
+        documents, which is shared by all *Manager* instances using the same model within
+        the process. The representation can be saved to disk and passed to
+        *register_serialized_subword_cache()* after a restart to avoid analysing the same
+        words again. Only relevant for German."""
+        return self.semantic_analyzer.subword_cache.to_bytes(
+            self.semantic_analyzer.model
+        )
+
+    def register_serialized_subword_cache(
+        self, serialized_subword_cache: bytes
+    ) -> None:
+        """Parameters:
+
+        serialized_subword_cache -- a subword cache previously returned by
+            *serialize_subword_cache()* for the same model.
+        """
+        self.semantic_analyzer.subword_cache.from_bytes(
+            serialized_subword_cache, self.semantic_analyzer.model
+        )
+
+    def get_subword_cache_statistics(self) -> Dict[str, Any]:
+        """Returns a dictionary containing the size, the maximum size, the number of hits and
+        misses and the hit rate of the subword cache."""
+        return self.semantic_analyzer.subword_cache.get_statistics()
+
+    def get_parse_stage_timings(self, reset: bool = False) -> Dict[str, float]:
+        """Returns a dictionary from the names of the stages that make up the Holmes parse to the
+        total number of seconds spent in each stage. Timings are only collected for documents
+        parsed while the *Manager* has a *ParseProfile* with *collect_timings=True*, and are
+        shared by all *Manager* instances using the same model within the process.
+
+        Parameters:
+
+        reset -- *True* if the timings collected so far should be discarded after they have
+            been returned.
+        """
+        stage_timings = self.semantic_analyzer.get_stage_timings()
+        if reset:
+            self.semantic_analyzer.reset_stage_timings()
+        return stage_timings
+
+    def _create_search_phrase(
+        self,
+        search_phrase_text: str,
+        label: Optional[str],
+        search_phrase_doc: Optional[Doc] = None,
+    ):
         if label is None:
             label = search_phrase_text
-        search_phrase_doc = self.nlp(search_phrase_text)
+        if search_phrase_doc is None:
+            search_phrase_doc = self.nlp(search_phrase_text)
         search_phrase = self.linguistic_object_factory.create_search_phrase(
             search_phrase_text,
             search_phrase_doc,
@@ -504,20 +774,145 @@ class Manager:
         label -- a label for the search phrase which need *not* be unique. Defaults to the raw
             search phrase text.
         """
-        search_phrase = self._create_search_phrase(search_phrase_text, label)
-        search_phrase.pack()
+        return self.register_search_phrases({search_phrase_text: label})[0]
+
+    def register_search_phrases(
+        self,
+        search_phrase_texts: Union[List[str], Dict[str, Optional[str]]],
+        batch_size: int = 100,
+    ) -> List[SearchPhrase]:
+        """Registers and returns a number of new search phrases. This is much faster than
+        calling *register_search_phrase()* for each search phrase in turn, as the search phrases
+        are parsed together and sent to each worker in a single message.
+
+        Parameters:
+
+        search_phrase_texts -- a list of raw search phrase texts, or a dictionary from raw search
+            phrase texts to labels. A label need *not* be unique; where it is *None* or
+            a list is passed, the label defaults to the raw search phrase text.
+        batch_size -- the number of search phrases spaCy should parse at a time.
+        """
+        if isinstance(search_phrase_texts, dict):
+            texts_and_labels = list(search_phrase_texts.items())
+        else:
+            texts_and_labels = [(text, None) for text in search_phrase_texts]
+        search_phrases = self._create_packed_search_phrases(
+            texts_and_labels, batch_size
+        )
+        # The search phrases are pickled once here rather than once per worker by each
+        # queue. The payload cannot usefully be placed in shared memory because each worker
+        # has to unpickle it into search phrase objects of its own in any case.
+        self._register_packed_search_phrases(search_phrases)
+        return search_phrases
+
+    def _create_packed_search_phrases(
+        self, texts_and_labels: List[Tuple[str, Optional[str]]], batch_size: int
+    ) -> List[SearchPhrase]:
+        search_phrases = [
+            self._create_search_phrase(text, label, search_phrase_doc)
+            for (text, label), search_phrase_doc in zip(
+                texts_and_labels,
+                self.nlp.pipe(
+                    (text for text, _ in texts_and_labels), batch_size=batch_size
+                ),
+            )
+        ]
+        for search_phrase in search_phrases:
+            search_phrase.pack()
+        return search_phrases
+
+    def _register_packed_search_phrases(
+        self, search_phrases: List[SearchPhrase]
+    ) -> None:
+        serialized_search_phrases = pickle.dumps(
+            search_phrases, protocol=pickle.HIGHEST_PROTOCOL
+        )
         reply_queue = self.multiprocessing_manager.Queue()
         with self.lock:
             for worker_index in range(self.number_of_workers):
                 self.input_queues[worker_index].put(
-                    (self.worker.register_search_phrase, (search_phrase,), reply_queue),
+                    (
+                        self.worker.register_search_phrases,
+                        (serialized_search_phrases,),
+                        reply_queue,
+                    ),
                     timeout=TIMEOUT_SECONDS,
                 )
-            self.search_phrases.append(search_phrase)
+            self.search_phrases.extend(search_phrases)
         self._handle_response(
-            reply_queue, self.number_of_workers, "register_search_phrase"
+            reply_queue, self.number_of_workers, "register_search_phrases"
         )
-        return search_phrase
+
+    def serialize_search_phrases(self) -> bytes:
+        """Returns a serialized representation of the registered search phrases including the
+        words matching their root tokens and their vectors. The representation can be saved to
+        disk and passed to *register_serialized_search_phrases()* after a restart to avoid
+        parsing the search phrases again."""
+        with self.lock:
+            search_phrases = list(self.search_phrases)
+        return pickle.dumps(
+            {
+                "serialized_search_phrases_version": SERIALIZED_SEARCH_PHRASES_VERSION,
+                "model": self.semantic_analyzer.get_model_name(),
+                "serialized_document_version": SERIALIZED_DOCUMENT_VERSION,
+                "index_signature": self.index_signature,
+                "search_phrases": search_phrases,
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+    def register_serialized_search_phrases(
+        self, serialized_search_phrases: bytes
+    ) -> List[SearchPhrase]:
+        """Registers and returns search phrases previously serialized with
+        *serialize_search_phrases()* by a *Manager* using the same model. The search phrases are
+        not parsed again unless this *Manager* matches words differently from the *Manager* that
+        serialized them, e.g. because it uses a different ontology. In that case the search
+        phrases are created afresh from their texts and labels.
+
+        Parameters:
+
+        serialized_search_phrases -- the search phrases returned by *serialize_search_phrases()*.
+        """
+        contents = pickle.loads(serialized_search_phrases)
+        if contents["model"] != self.semantic_analyzer.get_model_name():
+            raise WrongModelDeserializationError(
+                "; ".join((self.semantic_analyzer.get_model_name(), contents["model"]))
+            )
+        if (
+            contents["serialized_search_phrases_version"]
+            != SERIALIZED_SEARCH_PHRASES_VERSION
+        ):
+            raise WrongVersionDeserializationError(
+                "; ".join(
+                    (
+                        SERIALIZED_SEARCH_PHRASES_VERSION,
+                        str(contents["serialized_search_phrases_version"]),
+                    )
+                )
+            )
+        if contents["serialized_document_version"] != SERIALIZED_DOCUMENT_VERSION:
+            raise WrongVersionDeserializationError(
+                "; ".join(
+                    (
+                        SERIALIZED_DOCUMENT_VERSION,
+                        str(contents["serialized_document_version"]),
+                    )
+                )
+            )
+        search_phrases = contents["search_phrases"]
+        if contents["index_signature"] != self.index_signature:
+            # Ontology multiwords affect the tokens, lemmas and matchable words of search phrases
+            # as well as the words matching their root tokens, so nothing can be reused
+            search_phrases = self._create_packed_search_phrases(
+                [
+                    (search_phrase.doc_text, search_phrase.label)
+                    for search_phrase in search_phrases
+                ],
+                100,
+            )
+        self._register_packed_search_phrases(search_phrases)
+        return search_phrases
 
     def remove_all_search_phrases_with_label(self, label: str) -> None:
         reply_queue = self.multiprocessing_manager.Queue()
@@ -560,7 +955,10 @@ class Manager:
             )
 
     def match(
-        self, search_phrase_text: str = None, document_text: str = None
+        self,
+        search_phrase_text: str = None,
+        document_text: str = None,
+        time_budget: Optional[float] = None,
     ) -> List[Dict]:
         """Matches search phrases to documents and returns the result as match dictionaries.
 
@@ -570,7 +968,15 @@ class Manager:
             preloaded search phrases should be used for matching.
         document_text -- a text from which to generate a document, or *None* if the preloaded
             documents should be used for matching.
+        time_budget -- the number of seconds after which the workers should stop matching and
+            return the matches found so far, or *None* if matching should not be time-limited.
+            Workers that have not replied shortly after the time budget has been used up are
+            not waited for. Where matching was stopped or a worker's matches are missing, each
+            match dictionary contains the entry *'partial': True*. If no matches were found
+            before matching was stopped, an empty list is returned, which cannot be
+            distinguished from the result of a query without matches.
         """
+        deadline = time() + time_budget if time_budget is not None else None
 
         if search_phrase_text is not None:
             search_phrase = self._create_search_phrase(search_phrase_text, "")
@@ -581,7 +987,9 @@ class Manager:
         else:
             search_phrase = None
         if document_text is not None:
-            serialized_document = self.nlp(document_text).to_bytes()
+            serialized_document = self.to_compact_bytes(
+                self._parse_document(document_text)
+            )
             with self.lock:
                 worker_indexes = {self._next_worker_queue_number()}
         else:
@@ -595,15 +1003,27 @@ class Manager:
         reply_queue = self.multiprocessing_manager.Queue()
         for worker_index in worker_indexes:
             self.input_queues[worker_index].put(
-                (self.worker.match, (serialized_document, search_phrase), reply_queue),
+                (
+                    self.worker.match,
+                    (serialized_document, search_phrase, deadline),
+                    reply_queue,
+                ),
                 timeout=TIMEOUT_SECONDS,
             )
         worker_match_dicts_lists = self._handle_response(
-            reply_queue, len(worker_indexes), "match"
+            reply_queue, len(worker_indexes), "match", deadline
         )
         match_dicts = []
-        for worker_match_dicts in worker_match_dicts_lists:
+        partial = len(worker_match_dicts_lists) < len(worker_indexes)
+        for worker_match_dicts, worker_partial in worker_match_dicts_lists:
             match_dicts.extend(worker_match_dicts)
+            partial = partial or worker_partial
+        if partial:
+            for match_dict in match_dicts:
+                match_dict["partial"] = True
+        return self._sort_match_dicts(match_dicts)
+
+    def _sort_match_dicts(self, match_dicts: List[Dict]) -> List[Dict]:
         return sorted(
             match_dicts,
             key=lambda match_dict: (
@@ -612,6 +1032,64 @@ class Manager:
             ),
         )
 
+    def match_texts(self, texts: List[str], batch_size: int = 100) -> List[List[Dict]]:
+        """Matches the registered search phrases to each of a number of texts, e.g. user
+        entries in a chatbot, and returns a list containing a list of match dictionaries for
+        each text in the order of *texts*. This is much faster than calling *match()* for each
+        text in turn, as the texts are parsed together and distributed between the workers in
+        batches.
+
+        Parameters:
+
+        texts -- the texts to match.
+        batch_size -- the number of texts spaCy should parse at a time, which is also the
+            maximum number of texts sent to a worker in a single message.
+        """
+        if len(self.list_search_phrase_labels()) == 0:
+            raise NoSearchPhraseError(
+                "At least one search phrase is required for matching."
+            )
+        serialized_documents = [
+            self.to_compact_bytes(doc)
+            for doc in self.nlp.pipe(
+                texts,
+                batch_size=batch_size,
+                disable=[] if self.parse_profile.coreference else ["coreferee"],
+                component_cfg={"holmes": {"parse_profile": self.parse_profile}},
+            )
+        ]
+        worker_indexes_to_batches: Dict[int, List[Any]] = {}
+        with self.lock:
+            for index, serialized_document in enumerate(serialized_documents):
+                worker_index = self._next_worker_queue_number()
+                if worker_index not in worker_indexes_to_batches:
+                    worker_indexes_to_batches[worker_index] = []
+                worker_indexes_to_batches[worker_index].append(
+                    (index, serialized_document)
+                )
+        reply_queue = self.multiprocessing_manager.Queue()
+        number_of_messages = 0
+        for worker_index, worker_batch in worker_indexes_to_batches.items():
+            # Each message holds at most *batch_size* documents so that the workers can
+            # deserialize and match them while later messages are still being sent
+            for start in range(0, len(worker_batch), batch_size):
+                self.input_queues[worker_index].put(
+                    (
+                        self.worker.match_documents,
+                        (worker_batch[start : start + batch_size],),
+                        reply_queue,
+                    ),
+                    timeout=TIMEOUT_SECONDS,
+                )
+                number_of_messages += 1
+        match_dicts_lists: List[List[Dict]] = [[] for _ in texts]
+        for indexes_and_match_dicts in self._handle_response(
+            reply_queue, number_of_messages, "match_texts"
+        ):
+            for index, match_dicts in indexes_and_match_dicts:
+                match_dicts_lists[index] = self._sort_match_dicts(match_dicts)
+        return match_dicts_lists
+
     def get_corpus_frequency_information(self):
         def merge_dicts_adding_common_values(dict1, dict2):
             dict_to_return = {**dict1, **dict2}
@@ -694,11 +1172,13 @@ class Manager:
         ontology_penalty: float = 0.9,
         relation_matching_frequency_threshold: float = 0.25,
         embedding_matching_frequency_threshold: float = 0.5,
+        single_word_matching_frequency_threshold: float = 0.0,
         sideways_match_extent: int = 100,
         only_one_result_per_document: bool = False,
         number_of_results: int = 10,
         document_label_filter: str = None,
-        tied_result_quotient: float = 0.9
+        tied_result_quotient: float = 0.9,
+        time_budget: Optional[float] = None
     ) -> List[Dict]:
 
         """Returns a list of dictionaries representing the results of a topic match between an
@@ -748,6 +1228,10 @@ class Manager:
         embedding_matching_frequency_threshold -- the frequency threshold above which single
             word matches are used as the basis for attempting relation matches with
             embedding-based matching on the second word.
+        single_word_matching_frequency_threshold -- the frequency threshold below which
+            single words are only matched within *maximum_activation_distance* words of a
+            word matched by another phraselet. Raising this value reduces the work done for
+            very frequent words in large corpora.
         sideways_match_extent -- the maximum number of words that may be incorporated into a
             topic match either side of the word where the activation peaked.
         only_one_result_per_document -- if 'True', prevents multiple results from being returned
@@ -757,7 +1241,17 @@ class Manager:
             be considered for inclusion in the results.
         tied_result_quotient -- the quotient between a result and following results above which
             the results are interpreted as tied.
+        time_budget -- the number of seconds after which the workers should stop matching and
+            scoring and return the best results found so far, or *None* if topic matching should
+            not be time-limited. A worker that only starts processing the query once the time
+            budget has been used up returns no results, and workers that have not replied shortly
+            after it has been used up are not waited for. Where matching or scoring was stopped
+            or a worker's results are missing, each result dictionary contains the entry
+            *'partial': True*. If no results were found before matching was stopped, an empty
+            list is returned, which cannot be distinguished from the result of a query without
+            matches.
         """
+        deadline = time() + time_budget if time_budget is not None else None
         if word_embedding_match_threshold < 0.0 or word_embedding_match_threshold > 1.0:
             raise ValueError("word_embedding_match_threshold must be between 0 and 1")
         if (
@@ -808,6 +1302,18 @@ class Manager:
                     )
                 )
             )
+        if (
+            single_word_matching_frequency_threshold < 0.0
+            or single_word_matching_frequency_threshold > 1.0
+        ):
+            raise ValueError(
+                ": ".join(
+                    (
+                        "single_word_matching_frequency_threshold",
+                        str(single_word_matching_frequency_threshold),
+                    )
+                )
+            )
         if (
             embedding_matching_frequency_threshold
             < relation_matching_frequency_threshold
@@ -852,6 +1358,12 @@ class Manager:
         for search_phrase in phraselet_labels_to_search_phrases.values():
             search_phrase.pack()
 
+        # The highest score below which topic matches are known not to be among the overall
+        # results, which workers that complete their searches raise for the others
+        score_floor = self.multiprocessing_manager.Value("d", 0.0)
+        with self.lock:
+            query_number = self.next_topic_match_query_number
+            self.next_topic_match_query_number += 1
         worker_indexes = set(self.document_labels_to_worker_queues.values())
         for worker_index in worker_indexes:
             self.input_queues[worker_index].put(
@@ -881,22 +1393,100 @@ class Manager:
                         number_of_results,
                         document_label_filter,
                         use_frequency_factor,
+                        score_floor,
+                        query_number,
+                        worker_index,
+                        single_word_matching_frequency_threshold,
+                        deadline,
                     ),
                     reply_queue,
                 ),
                 timeout=TIMEOUT_SECONDS,
             )
+        worker_topic_match_summariess = None
+        try:
+            worker_topic_match_summariess = self._handle_response(
+                reply_queue, len(worker_indexes), "match", deadline
+            )
+        finally:
+            if worker_topic_match_summariess is None:
+                # Workers may have retained topic matchers that would otherwise never be
+                # released
+                self._release_topic_matchers(query_number, worker_indexes)
+        topic_match_summaries = []
+        replying_worker_indexes = set()
+        partial = False
+        for (
+            worker_topic_match_summaries,
+            worker_partial,
+            replying_worker_index,
+        ) in worker_topic_match_summariess:
+            topic_match_summaries.extend(worker_topic_match_summaries)
+            replying_worker_indexes.add(replying_worker_index)
+            partial = partial or worker_partial
+
+        # Only the topic matches among the overall results are rendered as dictionaries. Every
+        # worker that returned summaries is sent a message so that it can release the query.
+        # A new reply queue ensures late replies from workers that were not waited for are
+        # not mistaken for topic match dictionaries.
+        if len(replying_worker_indexes) < len(worker_indexes):
+            partial = True
+            reply_queue = self.multiprocessing_manager.Queue()
+            # Workers that failed or were not waited for may still retain topic matchers
+            self._release_topic_matchers(
+                query_number, worker_indexes - replying_worker_indexes
+            )
+        worker_indexes_to_topic_match_indexes: Dict[int, List[int]] = {
+            topic_match_summary[4]: [] for topic_match_summary in topic_match_summaries
+        }
+        for topic_match_summary in TopicMatchDictionaryOrderer().select(
+            topic_match_summaries, number_of_results
+        ):
+            worker_indexes_to_topic_match_indexes[topic_match_summary[4]].append(
+                topic_match_summary[5]
+            )
+        for (
+            worker_index,
+            topic_match_indexes,
+        ) in worker_indexes_to_topic_match_indexes.items():
+            self.input_queues[worker_index].put(
+                (
+                    self.worker.get_topic_match_dictionaries,
+                    (query_number, topic_match_indexes),
+                    reply_queue,
+                ),
+                timeout=TIMEOUT_SECONDS,
+            )
         worker_topic_match_dictss = self._handle_response(
-            reply_queue, len(worker_indexes), "match"
+            reply_queue, len(worker_indexes_to_topic_match_indexes), "match"
         )
         topic_match_dicts = []
         for worker_topic_match_dicts in worker_topic_match_dictss:
             if worker_topic_match_dicts is not None:
                 topic_match_dicts.extend(worker_topic_match_dicts)
+        if partial:
+            for topic_match_dict in topic_match_dicts:
+                topic_match_dict["partial"] = True
         return TopicMatchDictionaryOrderer().order(
             topic_match_dicts, number_of_results, tied_result_quotient
         )
 
+    def _release_topic_matchers(
+        self, query_number: int, worker_indexes: Set[int]
+    ) -> None:
+        """Asks workers to release any topic matchers they have retained for a topic matching
+        query without waiting for their replies."""
+        reply_queue = self.multiprocessing_manager.Queue()
+        for worker_index in worker_indexes:
+            self.input_queues[worker_index].put(
+                (
+                    self.worker.get_topic_match_dictionaries,
+                    (query_number, []),
+                    reply_queue,
+                ),
+                timeout=TIMEOUT_SECONDS,
+            )
+
     def get_supervised_topic_training_basis(
         self,
         *,
@@ -930,8 +1520,81 @@ class Manager:
             match_all_words=match_all_words,
             overall_similarity_threshold=self.overall_similarity_threshold,
             verbose=verbose,
+            worker_match_summaries_getter=self._get_training_match_summaries_on_workers,
         )
 
+    def _get_training_match_summaries_on_workers(
+        self,
+        *,
+        phraselet_labels_to_search_phrases: Dict[str, SearchPhrase],
+        overall_similarity_threshold: float,
+        training_document_labels_to_documents: Dict[str, Doc],
+        reverse_dict: Dict[str, List[CorpusWordPosition]]
+    ) -> Dict[str, List[MatchSummary]]:
+        """Distributes the matching of training documents against phraselets that
+        *SupervisedTopicTrainingBasis.prepare()* performs across the workers, which each receive
+        batches of documents together with the part of the training basis reverse dictionary
+        that indexes them. Only summaries of the matches are returned to the manager."""
+        sorted_document_labels = sorted(training_document_labels_to_documents.keys())
+        batches = [
+            sorted_document_labels[index : index + TRAINING_MATCHING_BATCH_SIZE]
+            for index in range(
+                0, len(sorted_document_labels), TRAINING_MATCHING_BATCH_SIZE
+            )
+        ]
+        document_labels_to_batch_indexes = {
+            document_label: batch_index
+            for batch_index, batch in enumerate(batches)
+            for document_label in batch
+        }
+        batch_reverse_dicts: List[Dict[str, List[CorpusWordPosition]]] = [
+            {} for _ in batches
+        ]
+        for word, cwps in reverse_dict.items():
+            for cwp in cwps:
+                batch_reverse_dict = batch_reverse_dicts[
+                    document_labels_to_batch_indexes[cwp.document_label]
+                ]
+                if word in batch_reverse_dict:
+                    batch_reverse_dict[word].append(cwp)
+                else:
+                    batch_reverse_dict[word] = [cwp]
+        packed_phraselet_labels_to_search_phrases = {}
+        for label, search_phrase in phraselet_labels_to_search_phrases.items():
+            packed_search_phrase = copy(search_phrase)
+            packed_search_phrase.pack()
+            packed_phraselet_labels_to_search_phrases[label] = packed_search_phrase
+        reply_queue = self.multiprocessing_manager.Queue()
+        for batch_index, batch in enumerate(batches):
+            self.input_queues[batch_index % self.number_of_workers].put(
+                (
+                    self.worker.get_training_match_summaries,
+                    (
+                        {
+                            document_label: self.to_compact_bytes(
+                                training_document_labels_to_documents[document_label]
+                            )
+                            for document_label in batch
+                        },
+                        batch_reverse_dicts[batch_index],
+                        packed_phraselet_labels_to_search_phrases,
+                        overall_similarity_threshold,
+                    ),
+                    reply_queue,
+                ),
+                timeout=TIMEOUT_SECONDS,
+            )
+        document_labels_to_match_summaries: Dict[str, List[MatchSummary]] = {}
+        for worker_match_summaries in self._handle_response(
+            reply_queue, len(batches), "get_training_match_summaries"
+        ):
+            document_labels_to_match_summaries.update(worker_match_summaries)
+        if len(document_labels_to_match_summaries) != len(sorted_document_labels):
+            raise RuntimeError(
+                "Matching training documents against phraselets failed on a worker."
+            )
+        return document_labels_to_match_summaries
+
     def deserialize_supervised_topic_classifier(
         self, serialized_model: bytes, verbose: bool = False
     ) -> SupervisedTopicClassifier:
@@ -954,6 +1617,90 @@ class Manager:
             verbose,
         )
 
+    def register_supervised_topic_classifier(
+        self, classifier: SupervisedTopicClassifier
+    ) -> None:
+        """Makes a classifier available to the worker processes so that
+        *classify_documents()* can classify the registered documents. A classifier
+        registered previously is replaced.
+
+        Parameters:
+
+        classifier -- the classifier, which must have been created by this *Manager*.
+        """
+        phraselet_labels_to_search_phrases: Optional[Dict[str, SearchPhrase]] = None
+        if classifier.model.version in ("1.0", "1.1"):
+            phraselet_labels_to_search_phrases = {}
+            for (
+                label,
+                search_phrase,
+            ) in classifier.phraselet_labels_to_search_phrases.items():
+                # The classifier continues to use its own search phrases
+                packed_search_phrase = copy(search_phrase)
+                packed_search_phrase.pack()
+                phraselet_labels_to_search_phrases[label] = packed_search_phrase
+        # otherwise the model already contains packed search phrases
+        reply_queue = self.multiprocessing_manager.Queue()
+        with self.lock:
+            for worker_index in range(self.number_of_workers):
+                self.input_queues[worker_index].put(
+                    (
+                        self.worker.register_supervised_topic_classifier,
+                        (
+                            classifier.model,
+                            phraselet_labels_to_search_phrases,
+                            classifier.linguistic_object_factory.ontology_reverse_derivational_dict,
+                            classifier.overall_similarity_threshold,
+                        ),
+                        reply_queue,
+                    ),
+                    timeout=TIMEOUT_SECONDS,
+                )
+            self.supervised_topic_classifier_registered = True
+        self._handle_response(
+            reply_queue, self.number_of_workers, "register_supervised_topic_classifier"
+        )
+
+    def classify_documents(
+        self, labels_starting: str = ""
+    ) -> Dict[str, Optional[OrderedDict]]:
+        """Classifies the registered documents with the classifier registered using
+        *register_supervised_topic_classifier()*. Each worker process classifies the
+        documents it holds. Returns a dictionary from document labels to dictionaries from
+        classification labels to probabilities ordered starting with the most probable, or to
+        *None* for documents that did not contain any words recognised by the model.
+
+        Parameters:
+
+        labels_starting -- a string starting the labels of documents to be classified,
+            or an empty string if all documents are to be classified.
+        """
+        with self.lock:
+            if not self.supervised_topic_classifier_registered:
+                raise NoSupervisedTopicClassifierError(
+                    "A classifier must be registered before documents can be classified."
+                )
+            # Each worker is told which of its documents to classify so that only registered
+            # documents are classified
+            worker_indexes_to_document_labels: Dict[int, List[str]] = {}
+            for label, worker_index in self.document_labels_to_worker_queues.items():
+                if label.startswith(labels_starting):
+                    if worker_index not in worker_indexes_to_document_labels:
+                        worker_indexes_to_document_labels[worker_index] = []
+                    worker_indexes_to_document_labels[worker_index].append(label)
+        reply_queue = self.multiprocessing_manager.Queue()
+        for worker_index, document_labels in worker_indexes_to_document_labels.items():
+            self.input_queues[worker_index].put(
+                (self.worker.classify_documents, (document_labels,), reply_queue),
+                timeout=TIMEOUT_SECONDS,
+            )
+        labels_to_classification_dicts: Dict[str, Optional[OrderedDict]] = {}
+        for worker_labels_to_classification_dicts in self._handle_response(
+            reply_queue, len(worker_indexes_to_document_labels), "classify_documents"
+        ):
+            labels_to_classification_dicts.update(worker_labels_to_classification_dicts)
+        return labels_to_classification_dicts
+
     def start_chatbot_mode_console(self):
         """Starts a chatbot mode console enabling the matching of pre-registered
         search phrases to documents (chatbot entries) ad-hoc by the user.
@@ -1008,11 +1755,14 @@ class Worker:
         overall_similarity_threshold,
         entity_label_to_vector_dict,
         vocab,
+        vectors_vocab,
         model_name,
         serialized_document_version,
         input_queue,
         worker_label,
     ):
+        VectorSource.for_model(model_name).set_vocab(vectors_vocab)
+        compact_document_serializer = CompactDocumentSerializer()
         state = {
             "structural_matcher": structural_matcher,
             "word_matching_strategies": structural_matcher.semantic_matching_helper.main_word_matching_strategies
@@ -1021,11 +1771,20 @@ class Worker:
             "overall_similarity_threshold": overall_similarity_threshold,
             "entity_label_to_vector_dict": entity_label_to_vector_dict,
             "vocab": vocab,
+            "compact_document_serializer": compact_document_serializer,
             "model_name": model_name,
             "serialized_document_version": serialized_document_version,
-            "document_labels_to_documents": {},
+            "document_labels_to_documents": LazyDocumentDictionary(
+                lambda serialized_doc: compact_document_serializer.deserialize(
+                    serialized_doc, vocab
+                )
+            ),
             "reverse_dict": {},
+            "words_to_corpus_frequencies": None,
             "search_phrases": [],
+            "search_phrase_index": None,
+            "query_numbers_to_topic_matchers": {},
+            "supervised_topic_classifier": None,
         }
         HolmesBroker.set_extensions()
         while True:
@@ -1055,11 +1814,32 @@ class Worker:
                 )
 
     def load_document(self, state, serialized_doc, document_label, reverse_dict):
-        doc = Doc(state["vocab"]).from_bytes(serialized_doc)
+        doc = self.deserialize_document(state, serialized_doc)
+        state["document_labels_to_documents"][document_label] = doc
+        state["structural_matcher"].semantic_matching_helper.add_to_reverse_dict(
+            reverse_dict, doc, document_label
+        )
+        return doc
+
+    def deserialize_document(self, state, serialized_doc):
+        if CompactDocumentSerializer.is_compact(serialized_doc):
+            doc = state["compact_document_serializer"].deserialize(
+                serialized_doc, state["vocab"]
+            )
+        else:
+            doc = Doc(state["vocab"]).from_bytes(serialized_doc)
         if doc._.holmes_document_info.model != state["model_name"]:
             raise WrongModelDeserializationError(
                 "; ".join((state["model_name"], doc._.holmes_document_info.model))
             )
+        if (
+            doc._.holmes_document_info.serialized_document_version
+            in UPGRADABLE_SERIALIZED_DOCUMENT_VERSIONS
+        ):
+            VectorSource.for_model(state["model_name"]).attach_to_document(doc)
+            doc._.holmes_document_info.serialized_document_version = state[
+                "serialized_document_version"
+            ]
         if (
             doc._.holmes_document_info.serialized_document_version
             != state["serialized_document_version"]
@@ -1072,14 +1852,11 @@ class Worker:
                     )
                 )
             )
-        state["document_labels_to_documents"][document_label] = doc
-        state["structural_matcher"].semantic_matching_helper.add_to_reverse_dict(
-            reverse_dict, doc, document_label
-        )
         return doc
 
     def register_serialized_document(self, state, serialized_doc, document_label):
         self.load_document(state, serialized_doc, document_label, state["reverse_dict"])
+        state["words_to_corpus_frequencies"] = None
         return None, " ".join(("Registered document", document_label))
 
     def remove_document(self, state, document_label):
@@ -1089,11 +1866,13 @@ class Worker:
         ].semantic_matching_helper.get_reverse_dict_removing_document(
             state["reverse_dict"], document_label
         )
+        state["words_to_corpus_frequencies"] = None
         return None, " ".join(("Removed document", document_label))
 
     def remove_all_documents(self, state, labels_starting):
+        state["words_to_corpus_frequencies"] = None
         if len(labels_starting) == 0:
-            state["document_labels_to_documents"] = {}
+            state["document_labels_to_documents"].clear()
             state["reverse_dict"] = {}
             return None, "Removed all documents"
         else:
@@ -1102,12 +1881,8 @@ class Worker:
                 for label in state["document_labels_to_documents"].keys()
                 if label.startswith(labels_starting)
             ]
-            state["document_labels_to_documents"] = {
-                key: value
-                for key, value in state["document_labels_to_documents"].items()
-                if key not in labels_to_remove
-            }
             for label_to_remove in labels_to_remove:
+                del state["document_labels_to_documents"][label_to_remove]
                 state["reverse_dict"] = state[
                     "structural_matcher"
                 ].semantic_matching_helper.get_reverse_dict_removing_document(
@@ -1117,19 +1892,87 @@ class Worker:
                 ("Removed all documents with labels beginning", labels_starting)
             )
 
-    def get_serialized_document(self, state, label):
+    def get_serialized_document(self, state, label, compact):
         if label in state["document_labels_to_documents"]:
-            return state["document_labels_to_documents"][label].to_bytes(), " ".join(
+            serialized_doc = (
+                self.get_compact_serialized_document(state, label)
+                if compact
+                else state["document_labels_to_documents"][label].to_bytes()
+            )
+            return serialized_doc, " ".join(
                 ("Returned serialized document with label", label)
             )
         else:
             return None, " ".join(("No document found with label", label))
 
-    def register_search_phrase(self, state, search_phrase):
-        search_phrase.unpack(state["vocab"])
-        state["search_phrases"].append(search_phrase)
+    def get_compact_serialized_document(self, state, label):
+        serialized_doc = state["document_labels_to_documents"].get_serialized(label)
+        if serialized_doc is None:
+            serialized_doc = state["compact_document_serializer"].serialize(
+                state["document_labels_to_documents"][label]
+            )
+        return serialized_doc
+
+    def save_corpus_store_shard(self, state, directory, shard_name):
+        words_to_corpus_frequencies, _ = self.get_words_to_corpus_frequencies(state)
+        shard = CorpusStore.write_shard(
+            directory,
+            shard_name,
+            (
+                (label, self.get_compact_serialized_document(state, label))
+                for label in state["document_labels_to_documents"]
+            ),
+            state["reverse_dict"],
+            words_to_corpus_frequencies,
+        )
+        return shard, " ".join(("Saved corpus store shard", shard_name))
+
+    def load_corpus_store_shards(self, state, directory, shards, use_stored_index):
+        documents = state["document_labels_to_documents"]
+        words_to_corpus_frequencies = (
+            {} if len(documents) == 0 and use_stored_index else None
+        )
+        for shard in shards:
+            (
+                mapped_file,
+                labels_to_locations,
+                reverse_dict,
+                shard_words_to_corpus_frequencies,
+            ) = CorpusStore.read_shard(directory, shard)
+            for label, (offset, length) in labels_to_locations.items():
+                documents.add_serialized(label, mapped_file, offset, length)
+            if use_stored_index:
+                for word, cwps in reverse_dict.items():
+                    if word in state["reverse_dict"]:
+                        state["reverse_dict"][word].extend(cwps)
+                    else:
+                        state["reverse_dict"][word] = cwps
+                if words_to_corpus_frequencies is not None:
+                    for word, frequency in shard_words_to_corpus_frequencies.items():
+                        if word in words_to_corpus_frequencies:
+                            words_to_corpus_frequencies[word] += frequency
+                        else:
+                            words_to_corpus_frequencies[word] = frequency
+            else:
+                for label in labels_to_locations:
+                    state[
+                        "structural_matcher"
+                    ].semantic_matching_helper.add_to_reverse_dict(
+                        state["reverse_dict"], documents[label], label
+                    )
+        state["words_to_corpus_frequencies"] = words_to_corpus_frequencies
         return None, " ".join(
-            ("Registered search phrase with label", search_phrase.label)
+            ("Loaded", str(len(shards)), "corpus store shard(s) from", directory)
+        )
+
+    def register_search_phrases(self, state, serialized_search_phrases):
+        search_phrases = pickle.loads(serialized_search_phrases)
+        for search_phrase in search_phrases:
+            search_phrase.unpack(state["vocab"])
+        state["search_phrases"].extend(search_phrases)
+        state["search_phrase_index"] = None
+        return None, " ".join(
+            ("Registered", str(len(search_phrases)), "search phrase(s)")
         )
 
     def remove_all_search_phrases_with_label(self, state, label):
@@ -1138,27 +1981,48 @@ class Worker:
             for search_phrase in state["search_phrases"]
             if search_phrase.label != label
         ]
+        state["search_phrase_index"] = None
         return None, " ".join(("Removed all search phrases with label '", label, "'"))
 
     def remove_all_search_phrases(self, state):
         state["search_phrases"] = []
+        state["search_phrase_index"] = None
         return None, "Removed all search phrases"
 
+    def get_search_phrase_index(self, state):
+        """Returns the index of the registered search phrases used when matching documents
+        that are not registered, building it if the search phrases have changed."""
+        if state["search_phrase_index"] is None:
+            state["search_phrase_index"] = SearchPhraseIndex(
+                state["search_phrases"],
+                state["structural_matcher"].semantic_matching_helper,
+            )
+        return state["search_phrase_index"]
+
     def get_words_to_corpus_frequencies(self, state):
-        words_to_corpus_frequencies = {}
-        for word, cwps in state["reverse_dict"].items():
-            if word in punctuation:
-                continue
-            if word in words_to_corpus_frequencies:
-                words_to_corpus_frequencies[word] += len(set(cwps))
-            else:
-                words_to_corpus_frequencies[word] = len(set(cwps))
-        return words_to_corpus_frequencies, "Retrieved words to corpus frequencies"
+        if state["words_to_corpus_frequencies"] is None:
+            words_to_corpus_frequencies = {}
+            for word, cwps in state["reverse_dict"].items():
+                if word in punctuation:
+                    continue
+                if word in words_to_corpus_frequencies:
+                    words_to_corpus_frequencies[word] += len(set(cwps))
+                else:
+                    words_to_corpus_frequencies[word] = len(set(cwps))
+            state["words_to_corpus_frequencies"] = words_to_corpus_frequencies
+        return (
+            state["words_to_corpus_frequencies"],
+            "Retrieved words to corpus frequencies",
+        )
 
-    def match(self, state, serialized_doc, search_phrase):
+    def match(self, state, serialized_doc, search_phrase, deadline):
         if serialized_doc is not None:
+            # The document is matched on its own and is not stored with the registered documents
             reverse_dict = {}
-            doc = self.load_document(state, serialized_doc, "", reverse_dict)
+            doc = self.deserialize_document(state, serialized_doc)
+            state["structural_matcher"].semantic_matching_helper.add_to_reverse_dict(
+                reverse_dict, doc, ""
+            )
             document_labels_to_documents = {"": doc}
         else:
             reverse_dict = state["reverse_dict"]
@@ -1166,7 +2030,16 @@ class Worker:
         search_phrases = (
             [search_phrase] if search_phrase is not None else state["search_phrases"]
         )
+        # Where a single unregistered document is matched against the registered search
+        # phrases, e.g. in a chatbot, only the search phrases that could match it are considered
+        search_phrase_index = (
+            self.get_search_phrase_index(state)
+            if serialized_doc is not None and search_phrase is None
+            else None
+        )
         if len(document_labels_to_documents) > 0 and len(search_phrases) > 0:
+            if deadline is not None:
+                deadline = Deadline(deadline)
             matches = state["structural_matcher"].match(
                 word_matching_strategies=state["word_matching_strategies"],
                 document_labels_to_documents=document_labels_to_documents,
@@ -1182,13 +2055,105 @@ class Worker:
                 process_initial_question_words=False,
                 overall_similarity_threshold=state["overall_similarity_threshold"],
                 initial_question_word_overall_similarity_threshold=1.0,
+                search_phrase_index=search_phrase_index,
+                deadline=deadline,
             )
             return (
-                state["structural_matcher"].build_match_dictionaries(matches),
+                (
+                    state["structural_matcher"].build_match_dictionaries(matches),
+                    deadline is not None and deadline.interrupted,
+                ),
                 "Returned matches",
             )
         else:
-            return [], "No stored objects to match against"
+            return ([], False), "No stored objects to match against"
+
+    def match_documents(self, state, indexes_and_serialized_docs):
+        structural_matcher = state["structural_matcher"]
+        search_phrase_index = self.get_search_phrase_index(state)
+        # A single scratch reverse dictionary is reused for all the documents in the batch
+        reverse_dict = {}
+        indexes_and_match_dicts = []
+        for index, serialized_doc in indexes_and_serialized_docs:
+            reverse_dict.clear()
+            doc = self.deserialize_document(state, serialized_doc)
+            structural_matcher.semantic_matching_helper.add_to_reverse_dict(
+                reverse_dict, doc, ""
+            )
+            if len(state["search_phrases"]) > 0:
+                matches = structural_matcher.match(
+                    word_matching_strategies=state["word_matching_strategies"],
+                    document_labels_to_documents={"": doc},
+                    reverse_dict=reverse_dict,
+                    search_phrases=state["search_phrases"],
+                    match_depending_on_single_words=None,
+                    compare_embeddings_on_root_words=structural_matcher.embedding_based_matching_on_root_words,
+                    compare_embeddings_on_non_root_words=True,
+                    reverse_matching_cwps=None,
+                    embedding_reverse_matching_cwps=None,
+                    process_initial_question_words=False,
+                    overall_similarity_threshold=state["overall_similarity_threshold"],
+                    initial_question_word_overall_similarity_threshold=1.0,
+                    search_phrase_index=search_phrase_index,
+                )
+                match_dicts = structural_matcher.build_match_dictionaries(matches)
+            else:
+                match_dicts = []
+            indexes_and_match_dicts.append((index, match_dicts))
+        return indexes_and_match_dicts, " ".join(
+            ("Matched", str(len(indexes_and_serialized_docs)), "document(s)")
+        )
+
+    def get_training_match_summaries(
+        self,
+        state,
+        labels_to_serialized_docs,
+        reverse_dict,
+        phraselet_labels_to_search_phrases,
+        overall_similarity_threshold,
+    ):
+        for search_phrase in phraselet_labels_to_search_phrases.values():
+            search_phrase.unpack(state["vocab"])
+        training_document_labels_to_documents = {
+            document_label: state["compact_document_serializer"].deserialize(
+                serialized_doc, state["vocab"]
+            )
+            for document_label, serialized_doc in labels_to_serialized_docs.items()
+        }
+        structural_matcher = state["structural_matcher"]
+        semantic_matching_helper = structural_matcher.semantic_matching_helper
+        matches = structural_matcher.match(
+            word_matching_strategies=semantic_matching_helper.main_word_matching_strategies
+            + semantic_matching_helper.ontology_word_matching_strategies
+            + semantic_matching_helper.embedding_word_matching_strategies,
+            document_labels_to_documents=training_document_labels_to_documents,
+            reverse_dict=reverse_dict,
+            search_phrases=phraselet_labels_to_search_phrases.values(),
+            match_depending_on_single_words=None,
+            compare_embeddings_on_root_words=False,
+            compare_embeddings_on_non_root_words=True,
+            reverse_matching_cwps=None,
+            embedding_reverse_matching_cwps=None,
+            process_initial_question_words=False,
+            overall_similarity_threshold=overall_similarity_threshold,
+            initial_question_word_overall_similarity_threshold=1.0,
+        )
+        document_labels_to_match_summaries = {
+            document_label: []
+            for document_label in training_document_labels_to_documents
+        }
+        for match_summary in SupervisedTopicTrainingUtils.get_match_summaries(matches):
+            document_labels_to_match_summaries[match_summary[0]].append(match_summary)
+        return (
+            document_labels_to_match_summaries,
+            " ".join(
+                (
+                    "Matched",
+                    str(len(training_document_labels_to_documents)),
+                    "training documents against phraselets",
+                )
+            ),
+        )
 
     def get_topic_matches(
         self,
@@ -1216,9 +2181,22 @@ class Worker:
         number_of_results,
         document_label_filter,
         use_frequency_factor,
+        score_floor,
+        query_number,
+        worker_index,
+        single_word_matching_frequency_threshold,
+        deadline,
     ):
         if len(state["document_labels_to_documents"]) == 0:
-            return [], "No stored documents to match against"
+            return ([], False, worker_index), "No stored documents to match against"
+        if deadline is not None:
+            deadline = Deadline(deadline)
+        if deadline is not None and deadline.passed():
+            # The query waited behind others for longer than its time budget
+            return (
+                ([], True, worker_index),
+                "Deadline passed before topic matching started",
+            )
         for search_phrase in phraselet_labels_to_search_phrases.values():
             search_phrase.unpack(state["vocab"])
         topic_matcher = TopicMatcher(
@@ -1249,12 +2227,138 @@ class Worker:
             document_label_filter=document_label_filter,
             use_frequency_factor=use_frequency_factor,
             entity_label_to_vector_dict=state["entity_label_to_vector_dict"],
+            score_floor=score_floor,
+            single_word_matching_frequency_threshold=single_word_matching_frequency_threshold,
+            deadline=deadline,
         )
+        topic_match_summaries = topic_matcher.get_topic_match_summaries()
+        topic_matcher.report_score_floor(topic_match_summaries)
+        if len(topic_match_summaries) > 0:
+            # Retain the topic matcher until the manager has decided which of its topic matches
+            # are among the overall results
+            state["query_numbers_to_topic_matchers"][query_number] = topic_matcher
+        return (
+            (
+                [
+                    topic_match_summary[:4] + (worker_index,) + topic_match_summary[4:]
+                    for topic_match_summary in topic_match_summaries
+                ],
+                topic_matcher.partial,
+                worker_index,
+            ),
+            "Returned topic match summaries",
+        )
+
+    def get_topic_match_dictionaries(self, state, query_number, topic_match_indexes):
+        topic_matcher = state["query_numbers_to_topic_matchers"].pop(query_number, None)
+        if topic_matcher is None or len(topic_match_indexes) == 0:
+            return [], "Released topic matches"
         return (
-            topic_matcher.get_topic_match_dictionaries(),
+            topic_matcher.get_topic_match_dictionaries(topic_match_indexes),
             "Returned topic match dictionaries",
         )
 
+    def register_supervised_topic_classifier(
+        self,
+        state,
+        model,
+        phraselet_labels_to_search_phrases,
+        ontology_reverse_derivational_dict,
+        overall_similarity_threshold,
+    ):
+        if phraselet_labels_to_search_phrases is None:
+            phraselet_labels_to_search_phrases = (
+                model.packed_phraselet_labels_to_search_phrases
+            )
+        for search_phrase in phraselet_labels_to_search_phrases.values():
+            search_phrase.unpack(state["vocab"])
+        structural_matcher = state["structural_matcher"]
+        semantic_matching_helper = structural_matcher.semantic_matching_helper
+        # Documents are matched using the ontology the model was trained with, as is the case
+        # within SupervisedTopicClassifier
+        if model.structural_matching_ontology is not None:
+            ontology_word_matching_strategies = [
+                OntologyWordMatchingStrategy(
+                    semantic_matching_helper,
+                    perform_coreference_resolution=structural_matcher.perform_coreference_resolution,
+                    ontology=model.structural_matching_ontology,
+                    analyze_derivational_morphology=model.analyze_derivational_morphology,
+                    ontology_reverse_derivational_dict=ontology_reverse_derivational_dict,
+                )
+            ]
+        else:
+            ontology_word_matching_strategies = (
+                semantic_matching_helper.ontology_word_matching_strategies
+            )
+        utils = SupervisedTopicTrainingUtils(model.overlap_memory_size, model.one_hot)
+        thinc_model = utils.get_thinc_model(
+            hidden_layer_sizes=model.hidden_layer_sizes,
+            input_width=len(model.sorted_label_dict),
+            output_width=len(model.classifications),
+            sparse_input=model.version != "1.0",
+        )
+        thinc_model.from_dict(model.serialized_thinc_model)
+        state["supervised_topic_classifier"] = {
+            "model": model,
+            "utils": utils,
+            "thinc_model": thinc_model,
+            "phraselet_labels_to_search_phrases": phraselet_labels_to_search_phrases,
+            "word_matching_strategies": semantic_matching_helper.main_word_matching_strategies
+            + ontology_word_matching_strategies
+            + semantic_matching_helper.embedding_word_matching_strategies,
+            "overall_similarity_threshold": overall_similarity_threshold,
+        }
+        return None, "Registered supervised topic classifier"
+
+    def classify_documents(self, state, document_labels):
+        classifier = state["supervised_topic_classifier"]
+        document_labels = sorted(
+            label
+            for label in document_labels
+            if label in state["document_labels_to_documents"]
+        )
+        if len(document_labels) == 0:
+            return {}, "No stored documents to classify"
+        # Reuse the index of the stored documents rather than rebuilding it
+        document_label_set = set(document_labels)
+        reverse_dict = {}
+        for word, cwps in state["reverse_dict"].items():
+            document_cwps = [
+                cwp for cwp in cwps if cwp.document_label in document_label_set
+            ]
+            if len(document_cwps) > 0:
+                reverse_dict[word] = document_cwps
+        structural_matcher = state["structural_matcher"]
+        utils = classifier["utils"]
+        occurrence_dicts = utils.get_occurrence_dicts(
+            phraselet_labels_to_search_phrases=classifier[
+                "phraselet_labels_to_search_phrases"
+            ],
+            semantic_matching_helper=structural_matcher.semantic_matching_helper,
+            structural_matcher=structural_matcher,
+            sorted_label_dict=classifier["model"].sorted_label_dict,
+            overall_similarity_threshold=classifier["overall_similarity_threshold"],
+            training_document_labels_to_documents={
+                label: state["document_labels_to_documents"][label]
+                for label in document_labels
+            },
+            reverse_dict=reverse_dict,
+            word_matching_strategies=classifier["word_matching_strategies"],
+        )
+        return (
+            dict(
+                zip(
+                    document_labels,
+                    utils.get_classification_dicts(
+                        thinc_model=classifier["thinc_model"],
+                        occurrence_dicts=occurrence_dicts,
+                        classifications=classifier["model"].classifications,
+                    ),
+                )
+            ),
+            " ".join(("Classified", str(len(document_labels)), "documents")),
+        )
+
 
 @Language.factory("holmes")
 class HolmesBroker:
@@ -1264,9 +2368,11 @@ class HolmesBroker:
         self.semantic_analyzer = get_semantic_analyzer(nlp)
         self.set_extensions()
 
-    def __call__(self, doc: Doc) -> Doc:
+    def __call__(
+        self, doc: Doc, parse_profile: ParseProfile = DEFAULT_PARSE_PROFILE
+    ) -> Doc:
         try:
-            self.semantic_analyzer.holmes_parse(doc)
+            self.semantic_analyzer.holmes_parse(doc, parse_profile)
         except:
             print("Unexpected error annotating document, skipping ....")
             exception_info_parts = sys.exc_info()
@@ -1,10 +1,26 @@
-from typing import List, Dict, Optional, Tuple, Generator, cast, Set, Union
+from typing import (
+    List,
+    Dict,
+    Optional,
+    Tuple,
+    Generator,
+    cast,
+    Set,
+    Union,
+    Sequence,
+    Callable,
+    Iterable,
+    Iterator,
+)
 import math
 import pickle
 import importlib
 from abc import ABC, abstractmethod
 from copy import copy
+from collections import OrderedDict
 from functools import total_ordering
+from threading import Lock
+from time import perf_counter
 import srsly
 import pkg_resources
 from spacy.language import Language
@@ -20,9 +36,15 @@ from .errors import (
     SearchPhraseWithoutMatchableWordsError,
     SearchPhraseContainsMultipleClausesError,
     SearchPhraseContainsCoreferringPronounError,
+    WrongModelDeserializationError,
 )
 
-SERIALIZED_DOCUMENT_VERSION = "4.0"
+SERIALIZED_DOCUMENT_VERSION = "4.1"
+
+# Earlier serialized document versions that can still be loaded. Documents serialized with
+# version 4.0 store a vector with each token and subword and are upgraded with
+# *VectorSource.attach_to_document()* when they are loaded.
+UPGRADABLE_SERIALIZED_DOCUMENT_VERSIONS = ("4.0",)
 
 
 class SemanticDependency:
@@ -125,6 +147,72 @@ class Mention:
         return "".join(("[", str(self.root_index), "; ", str(self.indexes), "]"))
 
 
+class VectorSource:
+    """Retrieves vectors for tokens and subwords from the vocabulary of the model used to
+    obtain vectors for documents parsed with a given model. Tokens and subwords hold a reference
+    to the single *VectorSource* instance for their model and a key, so that vectors are only
+    looked up when they are required for embedding-based matching and are neither stored with
+    serialized documents nor retained in memory for each token. Only the model name is
+    serialized; the vocabulary must be registered with *set_vocab()* within each process.
+    """
+
+    _models_to_instances: Dict[str, "VectorSource"] = {}
+
+    _instances_lock = Lock()
+
+    # The maximum number of vectors retained for reuse
+    maximum_cache_size = 10000
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self.vocab: Optional[Vocab] = None
+        self._cache: Dict[str, Optional[Floats1d]] = {}
+
+    @classmethod
+    def for_model(cls, model: str) -> "VectorSource":
+        """Returns the shared instance for *model*."""
+        with cls._instances_lock:
+            if model not in cls._models_to_instances:
+                cls._models_to_instances[model] = cls(model)
+            return cls._models_to_instances[model]
+
+    def set_vocab(self, vocab: Vocab) -> None:
+        if self.vocab is not vocab:
+            self.vocab = vocab
+            self._cache = {}
+
+    def get_vector(self, key: str) -> Optional[Floats1d]:
+        """Returns the vector for *key*, or *None* if none is available."""
+        if key in self._cache:
+            return self._cache[key]
+        if self.vocab is None:
+            return None
+        lexeme = self.vocab[key]
+        vector = lexeme.vector if lexeme.has_vector and lexeme.vector_norm > 0 else None
+        if len(self._cache) >= self.maximum_cache_size:
+            self._cache = {}
+        self._cache[key] = vector
+        return vector
+
+    def attach_to_document(self, doc: Doc) -> None:
+        """Makes the tokens and subwords of a document serialized with an earlier version that
+        stored their vectors retrieve their vectors from this source instead, discarding the
+        stored vectors."""
+        for token in doc:
+            holmes = token._.holmes
+            holmes.vector_key = (
+                token.lemma_ if len(holmes.lemma.split()) > 1 else holmes.lemma
+            )
+            holmes.vector_source = self
+            holmes.__dict__.pop("vector", None)
+            for subword in holmes.subwords:
+                subword.vector_source = self
+                subword.__dict__.pop("vector", None)
+
+    def __reduce__(self):
+        return (VectorSource.for_model, (self.model,))
+
+
 class Subword:
     """A semantically atomic part of a word. Currently only used for German.
 
@@ -134,7 +222,8 @@ class Subword:
     lemma -- the model-normalized representation of the subword string.
     derived_lemma -- where relevant, another lemma with which *lemma* is derivationally related
     and which can also be useful for matching in some usecases; otherwise *None*
-    vector -- the vector representation of *lemma*, or *None* if there is none available.
+    vector_source -- the *VectorSource* from which the vector representation of *lemma* is
+        retrieved.
     char_start_index -- the character index of the subword within the containing word.
     dependent_index -- the index of a subword that is dependent on this subword, or *None*
         if there is no such subword.
@@ -153,7 +242,7 @@ class Subword:
         text: str,
         lemma: str,
         derived_lemma: str,
-        vector: Floats1d,
+        vector_source: VectorSource,
         char_start_index: int,
         dependent_index: Optional[int],
         dependency_label: Optional[str],
@@ -172,13 +261,18 @@ class Subword:
             self.derivation_matching_reprs: Optional[List[str]] = [derived_lemma]
         else:
             self.derivation_matching_reprs = None
-        self.vector = vector
+        self.vector_source = vector_source
         self.char_start_index = char_start_index
         self.dependent_index = dependent_index
         self.dependency_label = dependency_label
         self.governor_index = governor_index
         self.governing_dependency_label = governing_dependency_label
 
+    @property
+    def vector(self) -> Optional[Floats1d]:
+        """The vector representation of *lemma*, or *None* if there is none available."""
+        return self.vector_source.get_vector(self.lemma)
+
     @property
     def is_head(self) -> bool:
         return self.governor_index is None
@@ -191,6 +285,102 @@ class Subword:
         return "/".join((self.text, lemma_string))
 
 
+class SubwordCache:
+    """A bounded, thread-safe least-recently-used cache from word texts to the subwords
+    found within them. The cache is owned by a *SemanticAnalyzer* and therefore shared
+    between all documents parsed with the same model within a process. Entries are stored
+    without the index of the containing token so that they are small and can be persisted
+    to disk.
+
+    maximum_size -- the maximum number of words for which entries are retained.
+    """
+
+    def __init__(self, maximum_size: int) -> None:
+        self.maximum_size = maximum_size
+        self._entries: "OrderedDict[str, Tuple[Tuple, ...]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> Optional[Tuple[Tuple, ...]]:
+        """Returns the cached entry for *text*, or *None* if there is none. Each entry is a
+        tuple of subword tuples as returned by *subword_to_entry()*."""
+        with self._lock:
+            entry = self._entries.get(text)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(text)
+            self.hits += 1
+            return entry
+
+    def put(self, text: str, subwords: List[Subword]) -> None:
+        entry = tuple(self.subword_to_entry(subword) for subword in subwords)
+        with self._lock:
+            self._entries[text] = entry
+            self._entries.move_to_end(text)
+            while len(self._entries) > self.maximum_size:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def subword_to_entry(subword: Subword) -> Tuple:
+        return (
+            subword.index,
+            subword.text,
+            subword.lemma,
+            subword.derived_lemma,
+            subword.char_start_index,
+            subword.dependent_index,
+            subword.dependency_label,
+            subword.governor_index,
+            subword.governing_dependency_label,
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        """The proportion of lookups since the cache was created or last cleared that were
+        answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get_statistics(self) -> Dict[str, Union[int, float]]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maximum_size": self.maximum_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hit_rate,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def to_bytes(self, model: str) -> bytes:
+        with self._lock:
+            return pickle.dumps((model, list(self._entries.items())))
+
+    def from_bytes(self, serialized_cache: bytes, model: str) -> None:
+        """Adds the entries from a serialized cache, which must have been created using the
+        same model. Existing entries are retained but are treated as less recently used than
+        the added entries."""
+        serialized_model, entries = pickle.loads(serialized_cache)
+        if serialized_model != model:
+            raise WrongModelDeserializationError("; ".join((model, serialized_model)))
+        with self._lock:
+            for text, entry in entries:
+                self._entries[text] = entry
+                self._entries.move_to_end(text)
+            while len(self._entries) > self.maximum_size:
+                self._entries.popitem(last=False)
+
+
 @total_ordering
 class Index:
     """The position of a multiword, word or subword within a document."""
@@ -311,9 +501,13 @@ class MatchImplication:
 
 
 class HolmesDocumentInfo:
-    def __init__(self, semantic_analyzer: "SemanticAnalyzer"):
-        self.model = semantic_analyzer.get_model_name()
-        self.serialized_document_version = SERIALIZED_DOCUMENT_VERSION
+    def __init__(
+        self,
+        model: str,
+        serialized_document_version: str = SERIALIZED_DOCUMENT_VERSION,
+    ):
+        self.model = model
+        self.serialized_document_version = serialized_document_version
 
     @srsly.msgpack_encoders("holmes_document_info_holder")
     def serialize_obj(obj, chain=None):
@@ -346,9 +540,9 @@ class HolmesDictionary:
         that can be used for derivation matching, consisting of *derived_lema*, *token.text*
         and optionally a hyphen-normalized version of *token.text* and *token.lemma_* if these
         are different from *token.text*; otherwise *None*.
-    vector -- the vector representation of *lemma*, unless *lemma* is a multiword, in which case
-        the vector representation of *token.lemma_* is used instead. *None* where there is no
-        vector for the lexeme.
+    vector_key -- the key under which the vector representation of the token is retrieved:
+        *lemma*, unless *lemma* is a multiword, in which case *token.lemma_* is used instead.
+    vector_source -- the *VectorSource* from which the vector representation is retrieved.
     multiword_spans -- where relevant, a list of multiword spans, otherwise *None*. Set after initialization.
     """
 
@@ -360,7 +554,8 @@ class HolmesDictionary:
         derived_lemma: str,
         direct_matching_reprs: List[str],
         derivation_matching_reprs: Optional[List[str]],
-        vector: Floats1d,
+        vector_key: str,
+        vector_source: VectorSource,
     ):
         self.index = index
         self.lemma = lemma
@@ -369,7 +564,8 @@ class HolmesDictionary:
         self.direct_matching_reprs = direct_matching_reprs
         self.derivation_matching_reprs = derivation_matching_reprs
         self.multiword_spans: List[MultiwordSpan] = []
-        self.vector = vector
+        self.vector_key = vector_key
+        self.vector_source = vector_source
         self.children: List[
             SemanticDependency
         ] = []  # list of *SemanticDependency* objects where this token is the parent.
@@ -406,6 +602,12 @@ class HolmesDictionary:
         self.mentions: List[int] = []
         self.subwords: List[int] = []
 
+    @property
+    def vector(self) -> Optional[Floats1d]:
+        """The vector representation of the token, or *None* where there is no vector for the
+        lexeme. Vectors are retrieved on demand rather than being stored with the token."""
+        return self.vector_source.get_vector(self.vector_key)
+
     @property
     def is_uncertain(self) -> bool:
         """if *True*, a match involving this token will itself be uncertain."""
@@ -810,6 +1012,36 @@ class SearchPhrase:
         self.serialized_doc = None
 
 
+class ParseProfile:
+    """Determines which optional stages are performed when Holmes information is added to
+    documents. Switching off stages that a use case does not need saves parse time, but note
+    that matching will not take the missing information into account.
+
+    subwords -- *True* if words should be analysed for subwords (only relevant for German).
+    coreference -- *True* if coreference information should be added. If *False*, the
+        *coreferee* pipeline component is also not run on documents parsed by the *Manager*.
+    question_words -- *True* if initial question words should be marked.
+    collect_timings -- *True* if the time spent in each stage should be recorded and made
+        available via *SemanticAnalyzer.get_stage_timings()*.
+    """
+
+    def __init__(
+        self,
+        *,
+        subwords: bool = True,
+        coreference: bool = True,
+        question_words: bool = True,
+        collect_timings: bool = False
+    ) -> None:
+        self.subwords = subwords
+        self.coreference = coreference
+        self.question_words = question_words
+        self.collect_timings = collect_timings
+
+
+DEFAULT_PARSE_PROFILE = ParseProfile()
+
+
 class SemanticAnalyzerFactory:
     """Returns the correct *SemanticAnalyzer* for the model language.
     This class must be added to if additional implementations are added for new languages.
@@ -893,10 +1125,11 @@ class SemanticAnalyzer(ABC):
 
     whose_lemma: str = NotImplemented
 
+    # The maximum number of words whose subwords are retained in the process-wide subword cache
+    subword_cache_maximum_size: int = 100000
+
     @abstractmethod
-    def add_subwords(
-        self, token: Token, subword_cache: Dict[str, List[Subword]]
-    ) -> None:
+    def add_subwords(self, token: Token, subword_cache: SubwordCache) -> None:
         pass
 
     @abstractmethod
@@ -934,6 +1167,11 @@ class SemanticAnalyzer(ABC):
         self.model = "_".join((self.nlp.meta["lang"], self.nlp.meta["name"]))
         self.derivational_dictionary = self.load_derivational_dictionary()
         self.serialized_document_version = SERIALIZED_DOCUMENT_VERSION
+        self.subword_cache = SubwordCache(self.subword_cache_maximum_size)
+        self.vector_source = VectorSource.for_model(self.get_model_name())
+        self.vector_source.set_vocab(self.vectors_nlp.vocab)
+        self.stage_timings: Dict[str, float] = {}
+        self.stage_timings_lock = Lock()
 
     def load_derivational_dictionary(self) -> Dict[str, str]:
         in_package_filename = "".join(
@@ -966,81 +1204,165 @@ class SemanticAnalyzer(ABC):
     def parse(self, text: str) -> Doc:
         return self.nlp(text)
 
+    def parse_batch(
+        self, texts: Iterable[str], batch_size: int, n_process: int
+    ) -> Iterator[Doc]:
+        """Parses texts using spaCy's batched pipeline, yielding the documents in order."""
+        return self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+
     def get_vector(self, lemma: str) -> Floats1d:
         """Returns a vector representation of *lemma*, or *None* if none is available."""
-        lexeme = self.vectors_nlp.vocab[lemma]
-        return lexeme.vector if lexeme.has_vector and lexeme.vector_norm > 0 else None
+        return self.vector_source.get_vector(lemma)
 
-    def holmes_parse(self, spacy_doc: Doc) -> Doc:
-        """Adds the Holmes-specific information to each token within a spaCy document."""
-        spacy_doc._.set("holmes_document_info", HolmesDocumentInfo(self))
-        for token in spacy_doc:
-            lemma = self.holmes_lemma(token)
-            derived_lemma = self.derived_holmes_lemma(token, lemma)
-            direct_matching_reprs = [lemma]
-            hyphen_normalized_lemma = self.normalize_hyphens(lemma)
-            if lemma != hyphen_normalized_lemma:
-                direct_matching_reprs.append(hyphen_normalized_lemma)
-            if token.text.lower() != lemma:
-                direct_matching_reprs.append(token.text.lower())
-            if derived_lemma != lemma:
-                derivation_matching_reprs = [derived_lemma]
-            else:
-                derivation_matching_reprs = None
-            lexeme = self.vectors_nlp.vocab[
-                token.lemma_ if len(lemma.split()) > 1 else lemma
-            ]
-            vector = (
-                lexeme.vector if lexeme.has_vector and lexeme.vector_norm > 0 else None
-            )
-            token._.set(
-                "holmes",
-                HolmesDictionary(
-                    token.i,
-                    lemma,
-                    hyphen_normalized_lemma,
-                    derived_lemma,
-                    direct_matching_reprs,
-                    derivation_matching_reprs,
-                    vector,
-                ),
+    def holmes_parse(
+        self, spacy_doc: Doc, parse_profile: ParseProfile = DEFAULT_PARSE_PROFILE
+    ) -> Doc:
+        """Adds the Holmes-specific information to each token within a spaCy document.
+
+        Stages that only read information set by earlier passes and only write information
+        about the token being processed are fused into shared passes over the document;
+        stages that restructure dependencies between tokens retain their own passes.
+        """
+        timings: Optional[Dict[str, float]] = (
+            {} if parse_profile.collect_timings else None
+        )
+        spacy_doc._.set(
+            "holmes_document_info", HolmesDocumentInfo(self.get_model_name())
+        )
+        self._perform_pass(
+            spacy_doc,
+            (
+                ("holmes_dictionary", self.initialize_holmes_dictionary),
+                ("semantic_dependencies", self.initialize_semantic_dependencies),
+            ),
+            timings,
+        )
+        self._perform_pass(
+            spacy_doc,
+            (
+                ("negation", self.set_negation),
+                ("righthand_siblings", self.mark_if_righthand_sibling),
+                ("lefthand_siblings", self.set_token_or_lefthand_sibling_index),
+            ),
+            timings,
+        )
+        if parse_profile.question_words:
+            start_time = perf_counter()
+            self.set_initial_question_words(spacy_doc)
+            if timings is not None:
+                timings["question_words"] = perf_counter() - start_time
+        stages: List[Tuple[str, Callable[[Token], None]]] = [
+            ("sibling_info", self.copy_any_sibling_info)
+        ]
+        if parse_profile.subwords:
+            stages.append(
+                (
+                    "subwords",
+                    lambda token: self.add_subwords(token, self.subword_cache),
+                )
             )
-        for token in spacy_doc:
-            self.set_negation(token)
-        for token in spacy_doc:
-            self.initialize_semantic_dependencies(token)
-        self.set_initial_question_words(spacy_doc)
-        for token in spacy_doc:
-            self.mark_if_righthand_sibling(token)
-            token._.holmes.token_or_lefthand_sibling_index = (
-                self._lefthand_sibling_recursively(token)
+        if parse_profile.coreference:
+            stages.append(("coreference", self.set_coreference_information))
+        else:
+            stages.append(
+                ("coreference", self.set_coreference_information_without_chains)
             )
-        for token in spacy_doc:
-            self.copy_any_sibling_info(token)
-        subword_cache: Dict[str, List[Subword]] = {}
-        for token in spacy_doc:
-            self.add_subwords(token, subword_cache)
-        for token in spacy_doc:
-            self.set_coreference_information(token)
-        for token in spacy_doc:
-            self.set_matchability(token)
-            token._.holmes.multiword_spans = self.multiword_spans_with_head_token(token)
-        for token in spacy_doc:
-            self.correct_auxiliaries_and_passives(token)
-        for token in spacy_doc:
-            self.copy_any_sibling_info(token)
-        for token in spacy_doc:
-            self.handle_relative_constructions(token)
-        for token in spacy_doc:
-            self.normalize_predicative_adjectives(token)
-        for token in spacy_doc:
-            self.create_additional_preposition_phrase_semantic_dependencies(token)
-        for token in spacy_doc:
-            self.perform_language_specific_tasks(token)
-        for token in spacy_doc:
-            self.create_convenience_dependencies(token)
+        stages.append(("matchability", self.set_matchability_and_multiword_spans))
+        self._perform_pass(spacy_doc, stages, timings)
+        for stage_name, stage in (
+            ("auxiliaries_and_passives", self.correct_auxiliaries_and_passives),
+            ("sibling_info_after_restructuring", self.copy_any_sibling_info),
+            ("relative_constructions", self.handle_relative_constructions),
+            ("predicative_adjectives", self.normalize_predicative_adjectives),
+            (
+                "preposition_phrases",
+                self.create_additional_preposition_phrase_semantic_dependencies,
+            ),
+            ("language_specific_tasks", self.perform_language_specific_tasks),
+            ("convenience_dependencies", self.create_convenience_dependencies),
+        ):
+            self._perform_pass(spacy_doc, ((stage_name, stage),), timings)
+        if timings is not None:
+            with self.stage_timings_lock:
+                for stage_name, duration in timings.items():
+                    self.stage_timings[stage_name] = (
+                        self.stage_timings.get(stage_name, 0.0) + duration
+                    )
         return spacy_doc
 
+    def _perform_pass(
+        self,
+        spacy_doc: Doc,
+        stages: Sequence[Tuple[str, Callable[[Token], None]]],
+        timings: Optional[Dict[str, float]],
+    ) -> None:
+        """Performs one pass over *spacy_doc* calling each stage in *stages* on each token
+        in turn. If *timings* is not *None*, the time spent in each stage is added to it.
+        """
+        if timings is None:
+            if len(stages) == 1:
+                stage = stages[0][1]
+                for token in spacy_doc:
+                    stage(token)
+            else:
+                for token in spacy_doc:
+                    for _, stage in stages:
+                        stage(token)
+            return
+        for stage_name, _ in stages:
+            timings.setdefault(stage_name, 0.0)
+        for token in spacy_doc:
+            for stage_name, stage in stages:
+                start_time = perf_counter()
+                stage(token)
+                timings[stage_name] += perf_counter() - start_time
+
+    def get_stage_timings(self) -> Dict[str, float]:
+        """Returns the total number of seconds spent in each stage of *holmes_parse()* for
+        documents parsed with a *ParseProfile* that has *collect_timings=True*."""
+        with self.stage_timings_lock:
+            return dict(self.stage_timings)
+
+    def reset_stage_timings(self) -> None:
+        with self.stage_timings_lock:
+            self.stage_timings.clear()
+
+    def initialize_holmes_dictionary(self, token: Token) -> None:
+        lemma = self.holmes_lemma(token)
+        derived_lemma = self.derived_holmes_lemma(token, lemma)
+        direct_matching_reprs = [lemma]
+        hyphen_normalized_lemma = self.normalize_hyphens(lemma)
+        if lemma != hyphen_normalized_lemma:
+            direct_matching_reprs.append(hyphen_normalized_lemma)
+        if token.text.lower() != lemma:
+            direct_matching_reprs.append(token.text.lower())
+        if derived_lemma != lemma:
+            derivation_matching_reprs = [derived_lemma]
+        else:
+            derivation_matching_reprs = None
+        token._.set(
+            "holmes",
+            HolmesDictionary(
+                token.i,
+                lemma,
+                hyphen_normalized_lemma,
+                derived_lemma,
+                direct_matching_reprs,
+                derivation_matching_reprs,
+                token.lemma_ if len(lemma.split()) > 1 else lemma,
+                self.vector_source,
+            ),
+        )
+
+    def set_token_or_lefthand_sibling_index(self, token: Token) -> None:
+        token._.holmes.token_or_lefthand_sibling_index = (
+            self._lefthand_sibling_recursively(token)
+        )
+
+    def set_matchability_and_multiword_spans(self, token: Token) -> None:
+        self.set_matchability(token)
+        token._.holmes.multiword_spans = self.multiword_spans_with_head_token(token)
+
     def _lefthand_sibling_recursively(self, token: Token) -> int:
         """If *token* is a righthand sibling, return the index of the token that has a sibling
         reference to it, otherwise return the index of *token* itself.
@@ -1093,6 +1415,10 @@ class SemanticAnalyzer(ABC):
                 coreference_string,
             )
 
+    def set_coreference_information_without_chains(self, token: Token) -> None:
+        token._.holmes.token_and_coreference_chain_indexes = [token.i]
+        token._.holmes.most_specific_coreferring_term_index = None
+
     def set_coreference_information(self, token: Token) -> None:
         token._.holmes.token_and_coreference_chain_indexes = [token.i]
         token._.holmes.most_specific_coreferring_term_index = None
@@ -2322,92 +2648,74 @@ class LinguisticObjectFactory:
         def create_search_phrase_from_phraselet(
             phraselet_info: PhraseletInfo,
         ) -> SearchPhrase:
-            for (
-                phraselet_template
-            ) in self.semantic_matching_helper.local_phraselet_templates:
-                if phraselet_info.template_label == phraselet_template.label:
-                    phraselet_doc = phraselet_template.template_doc.copy()
-                    phraselet_doc[
-                        phraselet_template.parent_index
-                    ]._.holmes.lemma = phraselet_info.parent_lemma
-                    phraselet_doc[
-                        phraselet_template.parent_index
-                    ]._.holmes.direct_matching_reprs = (
-                        phraselet_info.parent_direct_matching_reprs
-                    )
-                    phraselet_doc[
-                        phraselet_template.parent_index
-                    ]._.holmes.derived_lemma = phraselet_info.parent_derived_lemma
-                    phraselet_doc[
-                        phraselet_template.parent_index
-                    ]._.holmes.derivation_matching_reprs = (
-                        phraselet_info.parent_derivation_matching_reprs
-                    )
-                    phraselet_doc[
-                        phraselet_template.parent_index
-                    ]._.holmes.ent_type = phraselet_info.parent_ent_type
-                    phraselet_doc[
-                        phraselet_template.parent_index
-                    ]._.holmes.is_initial_question_word = (
-                        phraselet_info.parent_is_initial_question_word
-                    )
-                    phraselet_doc[
-                        phraselet_template.parent_index
-                    ]._.holmes.has_initial_question_word_in_phrase = (
-                        phraselet_info.parent_has_initial_question_word_in_phrase
-                    )
-                    if phraselet_info.child_lemma is not None:
-                        phraselet_doc[
-                            phraselet_template.child_index
-                        ]._.holmes.lemma = phraselet_info.child_lemma
-                        phraselet_doc[
-                            phraselet_template.child_index
-                        ]._.holmes.direct_matching_reprs = (
-                            phraselet_info.child_direct_matching_reprs
-                        )
-                        phraselet_doc[
-                            phraselet_template.child_index
-                        ]._.holmes.derived_lemma = phraselet_info.child_derived_lemma
-                        phraselet_doc[
-                            phraselet_template.child_index
-                        ]._.holmes.derivation_matching_reprs = (
-                            phraselet_info.child_derivation_matching_reprs
-                        )
-                        phraselet_doc[
-                            phraselet_template.child_index
-                        ]._.holmes.ent_type = phraselet_info.child_ent_type
-                        phraselet_doc[
-                            phraselet_template.child_index
-                        ]._.holmes.is_initial_question_word = (
-                            phraselet_info.child_is_initial_question_word
-                        )
-                        phraselet_doc[
-                            phraselet_template.child_index
-                        ]._.holmes.has_initial_question_word_in_phrase = (
-                            phraselet_info.child_has_initial_question_word_in_phrase
-                        )
-                    return self.create_search_phrase(
-                        "topic match phraselet",
-                        phraselet_doc,
-                        phraselet_info.label,
-                        phraselet_template,
-                        phraselet_info.created_without_matching_tags,
+            phraselet_template = (
+                self.semantic_matching_helper.labels_to_local_phraselet_templates.get(
+                    phraselet_info.template_label
+                )
+            )
+            if phraselet_template is None:
+                raise RuntimeError(
+                    "".join(
                         (
-                            reverse_matching_frequency_threshold is not None
-                            and cast(float, phraselet_info.parent_frequency_factor)
-                            < reverse_matching_frequency_threshold
-                            and phraselet_info.child_lemma is not None
-                            and not phraselet_template.question
+                            "Phraselet template",
+                            phraselet_info.template_label,
+                            "not found.",
                         )
-                        or phraselet_info.parent_lemma == "ENTITYNOUN",
-                        phraselet_info.reverse_only_parent_lemma,
-                        True,
-                        root_token_index=phraselet_template.parent_index,
                     )
-            raise RuntimeError(
-                "".join(
-                    ("Phraselet template", phraselet_info.template_label, "not found.")
                 )
+            # The template documents are lean documents without a tensor or non-Holmes
+            # extension data, so that copying them is cheap
+            phraselet_doc = phraselet_template.template_doc.copy()
+            parent_holmes = phraselet_doc[phraselet_template.parent_index]._.holmes
+            parent_holmes.lemma = phraselet_info.parent_lemma
+            parent_holmes.direct_matching_reprs = (
+                phraselet_info.parent_direct_matching_reprs
+            )
+            parent_holmes.derived_lemma = phraselet_info.parent_derived_lemma
+            parent_holmes.derivation_matching_reprs = (
+                phraselet_info.parent_derivation_matching_reprs
+            )
+            parent_holmes.ent_type = phraselet_info.parent_ent_type
+            parent_holmes.is_initial_question_word = (
+                phraselet_info.parent_is_initial_question_word
+            )
+            parent_holmes.has_initial_question_word_in_phrase = (
+                phraselet_info.parent_has_initial_question_word_in_phrase
+            )
+            if phraselet_info.child_lemma is not None:
+                child_holmes = phraselet_doc[phraselet_template.child_index]._.holmes
+                child_holmes.lemma = phraselet_info.child_lemma
+                child_holmes.direct_matching_reprs = (
+                    phraselet_info.child_direct_matching_reprs
+                )
+                child_holmes.derived_lemma = phraselet_info.child_derived_lemma
+                child_holmes.derivation_matching_reprs = (
+                    phraselet_info.child_derivation_matching_reprs
+                )
+                child_holmes.ent_type = phraselet_info.child_ent_type
+                child_holmes.is_initial_question_word = (
+                    phraselet_info.child_is_initial_question_word
+                )
+                child_holmes.has_initial_question_word_in_phrase = (
+                    phraselet_info.child_has_initial_question_word_in_phrase
+                )
+            return self.create_search_phrase(
+                "topic match phraselet",
+                phraselet_doc,
+                phraselet_info.label,
+                phraselet_template,
+                phraselet_info.created_without_matching_tags,
+                (
+                    reverse_matching_frequency_threshold is not None
+                    and cast(float, phraselet_info.parent_frequency_factor)
+                    < reverse_matching_frequency_threshold
+                    and phraselet_info.child_lemma is not None
+                    and not phraselet_template.question
+                )
+                or phraselet_info.parent_lemma == "ENTITYNOUN",
+                phraselet_info.reverse_only_parent_lemma,
+                True,
+                root_token_index=phraselet_template.parent_index,
             )
 
         return {
@@ -2704,6 +3012,10 @@ class SemanticMatchingHelper(ABC):
 
     def __init__(self) -> None:
         self.local_phraselet_templates = [copy(t) for t in self.phraselet_templates]
+        self.labels_to_local_phraselet_templates = {
+            phraselet_template.label: phraselet_template
+            for phraselet_template in self.local_phraselet_templates
+        }
         for key, match_implication in self.match_implication_dict.items():
             assert key == match_implication.search_phrase_dependency
             assert key not in match_implication.document_dependencies
@@ -0,0 +1,455 @@
+from typing import List, Dict, Optional, Any, Tuple
+import srsly
+from spacy.tokens import Doc
+from spacy.vocab import Vocab
+from .errors import WrongVersionDeserializationError
+from .parsing import (
+    HolmesDocumentInfo,
+    HolmesDictionary,
+    SemanticDependency,
+    Mention,
+    Subword,
+    MultiwordSpan,
+    VectorSource,
+    SERIALIZED_DOCUMENT_VERSION,
+)
+
+# Prefix that distinguishes compact Holmes documents from documents serialized with
+# *Doc.to_bytes()*, which always start with a msgpack map marker.
+COMPACT_DOCUMENT_PREFIX = b"HOLMES-COMPACT\x00"
+
+
+class _StringTable:
+    """Maps strings to integer identifiers so that each string is only stored once."""
+
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self.string_to_id: Dict[str, int] = {}
+
+    def add(self, string: Optional[str]) -> int:
+        """Returns the identifier for *string*, or *-1* if *string* is *None*."""
+        if string is None:
+            return -1
+        if string not in self.string_to_id:
+            self.string_to_id[string] = len(self.strings)
+            self.strings.append(string)
+        return self.string_to_id[string]
+
+
+class CompactDocumentSerializer:
+    """Serializes and deserializes Holmes documents in a compact format as an alternative to
+    *Doc.to_bytes()*, which pickles each *token._.holmes* dictionary individually and
+    includes a copy of the vector of every token and subword.
+
+    The compact format consists of *COMPACT_DOCUMENT_PREFIX* followed by a msgpack map
+    containing the spaCy document without extension data or tensor, a table of the strings
+    used within the Holmes information, and the Holmes information itself stored in
+    columnar lists with one entry per token, dependency, subword etc. Variable-length
+    information is stored as a list of lengths together with a flat list of values; a
+    length of *-1* represents *None*. Vectors are not stored but looked up in the
+    vocabulary when the document is loaded. The *coref_chains* extensions set by
+    *coreferee* are not retained; the coreference information Holmes uses is held within
+    *token._.holmes*.
+    """
+
+    @staticmethod
+    def is_compact(serialized_document: bytes) -> bool:
+        return serialized_document.startswith(COMPACT_DOCUMENT_PREFIX)
+
+    def serialize(self, doc: Doc) -> bytes:
+        strings = _StringTable()
+
+        def add_optional_list(
+            lengths: List[int], values: List[Any], list_to_add: Optional[List[Any]]
+        ) -> None:
+            if list_to_add is None:
+                lengths.append(-1)
+            else:
+                lengths.append(len(list_to_add))
+                values.extend(list_to_add)
+
+        def add_dependencies(
+            columns: Dict[str, List[Any]], dependencies: List[SemanticDependency]
+        ) -> None:
+            columns["lengths"].append(len(dependencies))
+            for dependency in dependencies:
+                columns["parent_index"].append(dependency.parent_index)
+                columns["child_index"].append(dependency.child_index)
+                columns["label"].append(strings.add(dependency.label))
+                columns["is_uncertain"].append(dependency.is_uncertain)
+
+        def add_linked_dependencies(
+            columns: Dict[str, List[Any]], linked_dependencies: List[Tuple[int, str]]
+        ) -> None:
+            columns["lengths"].append(len(linked_dependencies))
+            for index, label in linked_dependencies:
+                columns["index"].append(index)
+                columns["label"].append(strings.add(label))
+
+        tokens: Dict[str, List[Any]] = {
+            key: []
+            for key in (
+                "lemma",
+                "hyphen_normalized_lemma",
+                "derived_lemma",
+                "direct_matching_reprs_lengths",
+                "direct_matching_reprs",
+                "derivation_matching_reprs_lengths",
+                "derivation_matching_reprs",
+                "righthand_siblings_lengths",
+                "righthand_siblings",
+                "token_or_lefthand_sibling_index",
+                "is_involved_in_or_conjunction",
+                "is_negated",
+                "is_matchable",
+                "is_initial_question_word",
+                "has_initial_question_word_in_phrase",
+                "most_specific_coreferring_term_index",
+                "token_and_coreference_chain_indexes_lengths",
+                "token_and_coreference_chain_indexes",
+            )
+        }
+        children: Dict[str, List[Any]] = {
+            key: []
+            for key in (
+                "lengths",
+                "parent_index",
+                "child_index",
+                "label",
+                "is_uncertain",
+            )
+        }
+        parents: Dict[str, List[Any]] = {key: [] for key in children}
+        linked_children: Dict[str, List[Any]] = {
+            key: [] for key in ("lengths", "index", "label")
+        }
+        linked_parents: Dict[str, List[Any]] = {key: [] for key in linked_children}
+        mentions: Dict[str, List[Any]] = {
+            key: [] for key in ("lengths", "root_index", "indexes_lengths", "indexes")
+        }
+        subwords: Dict[str, List[Any]] = {
+            key: []
+            for key in (
+                "lengths",
+                "containing_token_index",
+                "index",
+                "text",
+                "lemma",
+                "derived_lemma",
+                "char_start_index",
+                "dependent_index",
+                "dependency_label",
+                "governor_index",
+                "governing_dependency_label",
+            )
+        }
+        multiword_spans: Dict[str, List[Any]] = {
+            key: []
+            for key in (
+                "lengths",
+                "text",
+                "lemma",
+                "derived_lemma",
+                "direct_matching_reprs_lengths",
+                "direct_matching_reprs",
+                "token_indexes_lengths",
+                "token_indexes",
+            )
+        }
+        for token in doc:
+            holmes = token._.holmes
+            tokens["lemma"].append(strings.add(holmes.lemma))
+            tokens["hyphen_normalized_lemma"].append(
+                strings.add(holmes.hyphen_normalized_lemma)
+            )
+            tokens["derived_lemma"].append(strings.add(holmes.derived_lemma))
+            add_optional_list(
+                tokens["direct_matching_reprs_lengths"],
+                tokens["direct_matching_reprs"],
+                [
+                    strings.add(representation)
+                    for representation in holmes.direct_matching_reprs
+                ],
+            )
+            add_optional_list(
+                tokens["derivation_matching_reprs_lengths"],
+                tokens["derivation_matching_reprs"],
+                (
+                    None
+                    if holmes.derivation_matching_reprs is None
+                    else [
+                        strings.add(representation)
+                        for representation in holmes.derivation_matching_reprs
+                    ]
+                ),
+            )
+            add_optional_list(
+                tokens["righthand_siblings_lengths"],
+                tokens["righthand_siblings"],
+                holmes.righthand_siblings,
+            )
+            tokens["token_or_lefthand_sibling_index"].append(
+                holmes.token_or_lefthand_sibling_index
+            )
+            tokens["is_involved_in_or_conjunction"].append(
+                holmes.is_involved_in_or_conjunction
+            )
+            tokens["is_negated"].append(holmes.is_negated)
+            tokens["is_matchable"].append(holmes.is_matchable)
+            tokens["is_initial_question_word"].append(holmes.is_initial_question_word)
+            tokens["has_initial_question_word_in_phrase"].append(
+                holmes.has_initial_question_word_in_phrase
+            )
+            tokens["most_specific_coreferring_term_index"].append(
+                getattr(holmes, "most_specific_coreferring_term_index", None)
+            )
+            add_optional_list(
+                tokens["token_and_coreference_chain_indexes_lengths"],
+                tokens["token_and_coreference_chain_indexes"],
+                holmes.token_and_coreference_chain_indexes,
+            )
+            add_dependencies(children, holmes.children)
+            add_dependencies(parents, holmes.parents)
+            add_linked_dependencies(
+                linked_children, holmes.coreference_linked_child_dependencies
+            )
+            add_linked_dependencies(
+                linked_parents, holmes.coreference_linked_parent_dependencies
+            )
+            mentions["lengths"].append(len(holmes.mentions))
+            for mention in holmes.mentions:
+                mentions["root_index"].append(mention.root_index)
+                add_optional_list(
+                    mentions["indexes_lengths"], mentions["indexes"], mention.indexes
+                )
+            subwords["lengths"].append(len(holmes.subwords))
+            for subword in holmes.subwords:
+                subwords["containing_token_index"].append(
+                    subword.containing_token_index
+                )
+                subwords["index"].append(subword.index)
+                subwords["text"].append(strings.add(subword.text))
+                subwords["lemma"].append(strings.add(subword.lemma))
+                subwords["derived_lemma"].append(strings.add(subword.derived_lemma))
+                subwords["char_start_index"].append(subword.char_start_index)
+                subwords["dependent_index"].append(subword.dependent_index)
+                subwords["dependency_label"].append(
+                    strings.add(subword.dependency_label)
+                )
+                subwords["governor_index"].append(subword.governor_index)
+                subwords["governing_dependency_label"].append(
+                    strings.add(subword.governing_dependency_label)
+                )
+            if holmes.multiword_spans is None:
+                multiword_spans["lengths"].append(-1)
+            else:
+                multiword_spans["lengths"].append(len(holmes.multiword_spans))
+                for multiword_span in holmes.multiword_spans:
+                    multiword_spans["text"].append(strings.add(multiword_span.text))
+                    multiword_spans["lemma"].append(strings.add(multiword_span.lemma))
+                    multiword_spans["derived_lemma"].append(
+                        strings.add(multiword_span.derived_lemma)
+                    )
+                    add_optional_list(
+                        multiword_spans["direct_matching_reprs_lengths"],
+                        multiword_spans["direct_matching_reprs"],
+                        [
+                            strings.add(representation)
+                            for representation in multiword_span.direct_matching_reprs
+                        ],
+                    )
+                    add_optional_list(
+                        multiword_spans["token_indexes_lengths"],
+                        multiword_spans["token_indexes"],
+                        multiword_span.token_indexes,
+                    )
+        document_info = doc._.holmes_document_info
+        return COMPACT_DOCUMENT_PREFIX + srsly.msgpack_dumps(
+            {
+                "model": document_info.model,
+                "serialized_document_version": document_info.serialized_document_version,
+                "doc": doc.to_bytes(exclude=["user_data", "tensor"]),
+                "strings": strings.strings,
+                "tokens": tokens,
+                "children": children,
+                "parents": parents,
+                "linked_children": linked_children,
+                "linked_parents": linked_parents,
+                "mentions": mentions,
+                "subwords": subwords,
+                "multiword_spans": multiword_spans,
+            }
+        )
+
+    def deserialize(self, serialized_document: bytes, vocab: Vocab) -> Doc:
+        """Recreates a document serialized with *serialize()*.
+
+        Args:
+
+        serialized_document -- the serialized document.
+        vocab -- the vocabulary of the model used to parse the document.
+
+        Token and subword vectors are not stored but retrieved on demand from the
+        *VectorSource* for the model used to parse the document.
+        """
+        contents = srsly.msgpack_loads(
+            serialized_document[len(COMPACT_DOCUMENT_PREFIX) :]
+        )
+        if contents["serialized_document_version"] != SERIALIZED_DOCUMENT_VERSION:
+            # The column layout may differ between versions
+            raise WrongVersionDeserializationError(
+                "; ".join(
+                    (
+                        SERIALIZED_DOCUMENT_VERSION,
+                        str(contents["serialized_document_version"]),
+                    )
+                )
+            )
+        strings = contents["strings"]
+        doc = Doc(vocab).from_bytes(contents["doc"])
+        doc._.set(
+            "holmes_document_info",
+            HolmesDocumentInfo(
+                contents["model"], contents["serialized_document_version"]
+            ),
+        )
+
+        def get_string(string_id: int) -> Optional[str]:
+            return None if string_id == -1 else strings[string_id]
+
+        class ColumnReader:
+            """Reads successive entries from a set of columns."""
+
+            def __init__(self, columns: Dict[str, List[Any]]) -> None:
+                self.columns = columns
+                self.positions = {key: 0 for key in columns}
+
+            def next(self, key: str) -> Any:
+                value = self.columns[key][self.positions[key]]
+                self.positions[key] += 1
+                return value
+
+            def next_list(self, key: str) -> Optional[List[Any]]:
+                length = self.next("_".join((key, "lengths")))
+                if length == -1:
+                    return None
+                start = self.positions[key]
+                self.positions[key] += length
+                return self.columns[key][start : start + length]
+
+        vector_source = VectorSource.for_model(contents["model"])
+
+        def read_dependencies(reader: ColumnReader) -> List[SemanticDependency]:
+            return [
+                SemanticDependency(
+                    reader.next("parent_index"),
+                    reader.next("child_index"),
+                    get_string(reader.next("label")),
+                    reader.next("is_uncertain"),
+                )
+                for _ in range(reader.next("lengths"))
+            ]
+
+        def read_linked_dependencies(reader: ColumnReader) -> List[List[Any]]:
+            return [
+                [reader.next("index"), get_string(reader.next("label"))]
+                for _ in range(reader.next("lengths"))
+            ]
+
+        tokens = ColumnReader(contents["tokens"])
+        children = ColumnReader(contents["children"])
+        parents = ColumnReader(contents["parents"])
+        linked_children = ColumnReader(contents["linked_children"])
+        linked_parents = ColumnReader(contents["linked_parents"])
+        mentions = ColumnReader(contents["mentions"])
+        subwords = ColumnReader(contents["subwords"])
+        multiword_spans = ColumnReader(contents["multiword_spans"])
+        for token in doc:
+            lemma = get_string(tokens.next("lemma"))
+            holmes = HolmesDictionary(
+                token.i,
+                lemma,
+                get_string(tokens.next("hyphen_normalized_lemma")),
+                get_string(tokens.next("derived_lemma")),
+                [
+                    get_string(string_id)
+                    for string_id in tokens.next_list("direct_matching_reprs")
+                ],
+                None,
+                token.lemma_ if len(lemma.split()) > 1 else lemma,
+                vector_source,
+            )
+            derivation_matching_reprs = tokens.next_list("derivation_matching_reprs")
+            if derivation_matching_reprs is not None:
+                holmes.derivation_matching_reprs = [
+                    get_string(string_id) for string_id in derivation_matching_reprs
+                ]
+            holmes.righthand_siblings = tokens.next_list("righthand_siblings")
+            holmes.token_or_lefthand_sibling_index = tokens.next(
+                "token_or_lefthand_sibling_index"
+            )
+            holmes.is_involved_in_or_conjunction = tokens.next(
+                "is_involved_in_or_conjunction"
+            )
+            holmes.is_negated = tokens.next("is_negated")
+            holmes.is_matchable = tokens.next("is_matchable")
+            holmes.is_initial_question_word = tokens.next("is_initial_question_word")
+            holmes.has_initial_question_word_in_phrase = tokens.next(
+                "has_initial_question_word_in_phrase"
+            )
+            holmes.most_specific_coreferring_term_index = tokens.next(
+                "most_specific_coreferring_term_index"
+            )
+            holmes.token_and_coreference_chain_indexes = tokens.next_list(
+                "token_and_coreference_chain_indexes"
+            )
+            holmes.children = read_dependencies(children)
+            holmes.parents = read_dependencies(parents)
+            holmes.coreference_linked_child_dependencies = read_linked_dependencies(
+                linked_children
+            )
+            holmes.coreference_linked_parent_dependencies = read_linked_dependencies(
+                linked_parents
+            )
+            holmes.mentions = [
+                Mention(mentions.next("root_index"), mentions.next_list("indexes"))
+                for _ in range(mentions.next("lengths"))
+            ]
+            for _ in range(subwords.next("lengths")):
+                subword_lemma = get_string(subwords.next("lemma"))
+                holmes.subwords.append(
+                    Subword(
+                        subwords.next("containing_token_index"),
+                        subwords.next("index"),
+                        get_string(subwords.next("text")),
+                        subword_lemma,
+                        get_string(subwords.next("derived_lemma")),
+                        vector_source,
+                        subwords.next("char_start_index"),
+                        subwords.next("dependent_index"),
+                        get_string(subwords.next("dependency_label")),
+                        subwords.next("governor_index"),
+                        get_string(subwords.next("governing_dependency_label")),
+                    )
+                )
+            number_of_multiword_spans = multiword_spans.next("lengths")
+            if number_of_multiword_spans == -1:
+                holmes.multiword_spans = None
+            for _ in range(max(number_of_multiword_spans, 0)):
+                multiword_span = MultiwordSpan(
+                    get_string(multiword_spans.next("text")),
+                    None,
+                    get_string(multiword_spans.next("lemma")),
+                    get_string(multiword_spans.next("derived_lemma")),
+                    [],
+                )
+                multiword_span.direct_matching_reprs = [
+                    get_string(string_id)
+                    for string_id in multiword_spans.next_list("direct_matching_reprs")
+                ]
+                multiword_span.token_indexes = multiword_spans.next_list(
+                    "token_indexes"
+                )
+                holmes.multiword_spans.append(multiword_span)
+            token._.set("holmes", holmes)
+        return doc
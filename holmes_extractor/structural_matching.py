@@ -1,5 +1,6 @@
 from typing import List, Dict, Set, Sequence, Optional, Any, ValuesView, Union
 import sys
+from time import time
 from spacy.tokens import Doc, Token
 from .parsing import (
     CorpusWordPosition,
@@ -30,8 +31,30 @@ class Match:
         strategy was not involved in the match.
     index_within_document -- the index of the document token that matched the search phrase
         root token.
+    topic_score -- the score of the match, set during topic matching.
+    original_index_within_list -- the position of the match within the list of matches for its
+        document, set during topic matching.
+    is_overlapping_relation -- *True* if the match is a relation match that shares a document
+        word with another relation match, set during topic matching.
     """
 
+    __slots__ = (
+        "word_matches",
+        "is_negated",
+        "is_uncertain",
+        "search_phrase_label",
+        "search_phrase_text",
+        "document_label",
+        "from_single_word_phraselet",
+        "from_topic_match_phraselet_created_without_matching_tags",
+        "from_reverse_only_topic_match_phraselet",
+        "index_within_document",
+        "overall_similarity_measure",
+        "topic_score",
+        "original_index_within_list",
+        "is_overlapping_relation",
+    )
+
     def __init__(
         self,
         search_phrase_label: str,
@@ -56,6 +79,9 @@ class Match:
         )
         self.index_within_document: int = -1
         self.overall_similarity_measure = 1.0
+        self.topic_score = 0.0
+        self.original_index_within_list = -1
+        self.is_overlapping_relation = False
 
     @property
     def involves_coreference(self) -> bool:
@@ -83,8 +109,9 @@ class Match:
     def get_subword_index(self) -> Optional[int]:
         """Returns the subword index of the root token."""
         for word_match in self.word_matches:
-            if word_match.search_phrase_token.dep_ == "ROOT" or (
-                hasattr(word_match, "temp_is_parent") and word_match.temp_is_parent
+            if (
+                word_match.search_phrase_token.dep_ == "ROOT"
+                or word_match.temp_is_parent
             ):
                 if word_match.document_subword is None:
                     return None
@@ -99,6 +126,95 @@ class Match:
         return subword_index if subword_index is not None else -1
 
 
+class Deadline:
+    """A time after which matching should stop, which records whether matching was
+    interrupted because it passed. A new object is used for each query so that the outcome
+    is not shared between the callers of a matcher.
+
+    end_time -- a time as returned by *time.time()*. *time()* is used rather than
+        *perf_counter()* because deadlines are set in the manager process and checked in the
+        worker processes.
+    """
+
+    def __init__(self, end_time: float):
+        self.end_time = end_time
+        # Set to *True* by a matcher that stopped with work remaining because the time passed
+        self.interrupted = False
+
+    def passed(self) -> bool:
+        return time() >= self.end_time
+
+
+class SearchPhraseIndex:
+    """An index from the words and entity labels that can match the root tokens of a set of
+    search phrases to those search phrases. When a single short document is matched against
+    many search phrases, as in a chatbot, the index allows matching to start from the words
+    in the document and to consider only those search phrases whose root tokens could match
+    one of them.
+
+    Parameters:
+
+    search_phrases -- the search phrases to index.
+    semantic_matching_helper -- the semantic matching helper for the model.
+    """
+
+    def __init__(
+        self,
+        search_phrases: List[SearchPhrase],
+        semantic_matching_helper: SemanticMatchingHelper,
+    ) -> None:
+        self.search_phrases = search_phrases
+        self.words_to_search_phrase_positions: Dict[str, List[int]] = {}
+        # Search phrases with ENTITYNOUN root tokens are matched against every noun
+        self.unconditional_search_phrase_positions: List[int] = []
+        # Search phrases whose root tokens may match any word using embeddings
+        self.embedding_search_phrase_positions: List[int] = []
+        for search_phrase_position, search_phrase in enumerate(search_phrases):
+            entity_label = semantic_matching_helper.get_entity_placeholder(
+                search_phrase.root_token
+            )
+            if entity_label == "ENTITYNOUN":
+                self.unconditional_search_phrase_positions.append(
+                    search_phrase_position
+                )
+                continue
+            if entity_label is not None:
+                words = [entity_label]
+            else:
+                words = search_phrase.words_matching_root_token
+                self.embedding_search_phrase_positions.append(search_phrase_position)
+            for word in words:
+                if word not in self.words_to_search_phrase_positions:
+                    self.words_to_search_phrase_positions[word] = []
+                self.words_to_search_phrase_positions[word].append(
+                    search_phrase_position
+                )
+
+    def get_candidate_search_phrases(
+        self,
+        reverse_dict: Dict[str, List[CorpusWordPosition]],
+        compare_embeddings_on_root_words: bool,
+    ) -> List[SearchPhrase]:
+        """Returns the search phrases whose root tokens could match words indexed in
+        *reverse_dict* in the order in which they were indexed."""
+        candidate_search_phrase_positions = set(
+            self.unconditional_search_phrase_positions
+        )
+        if compare_embeddings_on_root_words and len(reverse_dict) > 0:
+            candidate_search_phrase_positions.update(
+                self.embedding_search_phrase_positions
+            )
+        for word in reverse_dict:
+            if word in self.words_to_search_phrase_positions:
+                candidate_search_phrase_positions.update(
+                    self.words_to_search_phrase_positions[word]
+                )
+        return [
+            self.search_phrases[search_phrase_position]
+            for search_phrase_position in sorted(candidate_search_phrase_positions)
+        ]
+
+
 class StructuralMatcher:
     """The class responsible for matching search phrases with documents."""
 
@@ -146,7 +262,9 @@ class StructuralMatcher:
         process_initial_question_words: bool,
         overall_similarity_threshold: float,
         initial_question_word_overall_similarity_threshold: float,
-        document_label_filter: Optional[str] = None
+        document_label_filter: Optional[str] = None,
+        search_phrase_index: Optional[SearchPhraseIndex] = None,
+        deadline: Optional[Deadline] = None
     ) -> List[Match]:
         """Finds and returns matches between search phrases and documents.
         match_depending_on_single_words -- 'True' to match only single word search phrases,
@@ -167,6 +285,13 @@ class StructuralMatcher:
             word.
         document_label_filter -- a string with which the label of a document must begin for that
             document to be considered for matching, or 'None' if no filter is in use.
+        search_phrase_index -- an index of *search_phrases* used to restrict matching to the
+            search phrases whose root tokens could match words in *reverse_dict*, or 'None' if
+            every search phrase should be considered.
+        deadline -- the deadline after which no further matches should be sought, or 'None' if
+            matching should not be time-limited. The matches found up to the deadline are
+            returned and *deadline.interrupted* is set to 'True' if any search phrases or corpus
+            word positions remained unprocessed.
         """
 
         if (
@@ -175,6 +300,10 @@ class StructuralMatcher:
         ):
             compare_embeddings_on_root_words = False
             compare_embeddings_on_non_root_words = False
+        if search_phrase_index is not None:
+            search_phrases = search_phrase_index.get_candidate_search_phrases(
+                reverse_dict, compare_embeddings_on_root_words
+            )
         match_specific_indexes = (
             reverse_matching_cwps is not None
             or embedding_reverse_matching_cwps is not None
@@ -206,6 +335,9 @@ class StructuralMatcher:
                 or search_phrase.treat_as_reverse_only_during_initial_relation_matching
             ):
                 continue
+            if deadline is not None and deadline.passed():
+                deadline.interrupted = True
+                break
             if (
                 self.semantic_matching_helper.get_entity_placeholder(
                     search_phrase.root_token
@@ -348,6 +480,9 @@ class StructuralMatcher:
                         root_token_lemma_to_use
                     ] = working_cwps_to_match_for_cache
             for corpus_word_position in matched_cwps:
+                if deadline is not None and deadline.passed():
+                    deadline.interrupted = True
+                    break
                 if (
                     document_label_filter is not None
                     and corpus_word_position.document_label is not None
@@ -1,10 +1,13 @@
 from typing import List, Set, Dict, Union, Any, Tuple, Optional, cast
+from bisect import bisect_left, bisect_right
+import heapq
+import numpy
 from spacy.compat import Literal
 from spacy.tokens import Doc
 from thinc.types import Floats1d
 
 from .word_matching.general import WordMatch
-from .structural_matching import Match, StructuralMatcher
+from .structural_matching import Match, StructuralMatcher, Deadline
 from .word_matching.embedding import EmbeddingWordMatchingStrategy
 from .word_matching.entity_embedding import EntityEmbeddingWordMatchingStrategy
 from .word_matching.question import QuestionWordMatchingStrategy
@@ -65,6 +68,36 @@ class TopicMatch:
         return self.end_index - self.sentences_start_index
 
 
+class CoveredIndexRanges:
+    """Records token index ranges within each document, e.g. the ranges covered by the topic
+    matches generated so far, merging ranges that overlap, so that whether a token index lies
+    within a recorded range can be determined in logarithmic time.
+    """
+
+    def __init__(self) -> None:
+        self.document_labels_to_ranges: Dict[str, Tuple[List[int], List[int]]] = {}
+
+    def add(self, document_label: str, start_index: int, end_index: int) -> None:
+        if document_label not in self.document_labels_to_ranges:
+            self.document_labels_to_ranges[document_label] = ([], [])
+        starts, ends = self.document_labels_to_ranges[document_label]
+        # ranges from *first* up to but not including *last* overlap the new range
+        first = bisect_left(ends, start_index)
+        last = bisect_right(starts, end_index)
+        if first < last:
+            start_index = min(start_index, starts[first])
+            end_index = max(end_index, ends[last - 1])
+        starts[first:last] = [start_index]
+        ends[first:last] = [end_index]
+
+    def contains(self, document_label: str, index: int) -> bool:
+        if document_label not in self.document_labels_to_ranges:
+            return False
+        starts, ends = self.document_labels_to_ranges[document_label]
+        position = bisect_right(starts, index) - 1
+        return position >= 0 and ends[position] >= index
+
+
 class PhraseletActivationTracker:
     """Tracks the activation for a specific phraselet - the most recent score
     and the position within the document at which that score was calculated.
@@ -75,6 +108,143 @@ class PhraseletActivationTracker:
         self.score = score
 
 
+class PhraseletActivations:
+    """Tracks the activations of the phraselets matched while reading through a document.
+
+    Parameters:
+
+    maximum_activation_distance -- the number of words it takes for a previous phraselet
+        activation to reduce to zero.
+    """
+
+    def __init__(self, maximum_activation_distance: int) -> None:
+        self.maximum_activation_distance = maximum_activation_distance
+        self.phraselet_labels_to_phraselet_activation_trackers: Dict[
+            str, PhraseletActivationTracker
+        ] = {}
+
+    def get_activation(self, position: int, score: float, current_index: int) -> float:
+        """Returns the activation at *current_index* of a phraselet that had *score* at
+        *position*."""
+        distance_to_last_match = current_index - position
+        tailoff_quotient = distance_to_last_match / self.maximum_activation_distance
+        tailoff_quotient = min(tailoff_quotient, 1.0)
+        return (1 - tailoff_quotient) * score
+
+    def update(self, phraselet_label: str, current_index: int, score: float) -> None:
+        """Registers a match with *score* for a phraselet at *current_index*, which
+        replaces the current activation of the phraselet if it is higher."""
+        if phraselet_label in self.phraselet_labels_to_phraselet_activation_trackers:
+            phraselet_activation_tracker = (
+                self.phraselet_labels_to_phraselet_activation_trackers[phraselet_label]
+            )
+            current_score = self.get_activation(
+                phraselet_activation_tracker.position,
+                phraselet_activation_tracker.score,
+                current_index,
+            )
+            if score > current_score:
+                phraselet_activation_tracker.score = score
+            else:
+                phraselet_activation_tracker.score = current_score
+            phraselet_activation_tracker.position = current_index
+        else:
+            self.phraselet_labels_to_phraselet_activation_trackers[
+                phraselet_label
+            ] = PhraseletActivationTracker(current_index, score)
+
+    def get_total_activation(self, current_index: int) -> float:
+        """Returns the sum of the activations of all phraselets at *current_index*,
+        ceasing to track phraselets whose activation has reduced to zero."""
+        total_activation = 0
+        for phraselet_label in list(
+            self.phraselet_labels_to_phraselet_activation_trackers
+        ):
+            phraselet_activation_tracker = (
+                self.phraselet_labels_to_phraselet_activation_trackers[phraselet_label]
+            )
+            current_activation = self.get_activation(
+                phraselet_activation_tracker.position,
+                phraselet_activation_tracker.score,
+                current_index,
+            )
+            if current_activation <= 0:
+                del self.phraselet_labels_to_phraselet_activation_trackers[
+                    phraselet_label
+                ]
+            else:
+                total_activation += current_activation
+        return total_activation
+
+
+class VectorisedPhraseletActivations(PhraseletActivations):
+    """Tracks the activations of the phraselets matched while reading through a document,
+    holding the positions and scores in arrays so that the activations of all phraselets at
+    a position are calculated together. Used for long texts to match with many phraselets.
+
+    The arrays hold the phraselets in the order in which they became active, and the
+    activations are added up one after another in that order, so that the total activations
+    are identical to those calculated by *PhraseletActivations*.
+    """
+
+    initial_capacity = 64
+
+    def __init__(self, maximum_activation_distance: int) -> None:
+        super().__init__(maximum_activation_distance)
+        self.phraselet_labels: List[str] = []
+        self.phraselet_labels_to_slots: Dict[str, int] = {}
+        self.positions = numpy.empty(self.initial_capacity, dtype=numpy.int64)
+        self.scores = numpy.empty(self.initial_capacity, dtype=numpy.float64)
+
+    def update(self, phraselet_label: str, current_index: int, score: float) -> None:
+        if phraselet_label in self.phraselet_labels_to_slots:
+            slot = self.phraselet_labels_to_slots[phraselet_label]
+            current_score = self.get_activation(
+                int(self.positions[slot]), float(self.scores[slot]), current_index
+            )
+            self.scores[slot] = score if score > current_score else current_score
+            self.positions[slot] = current_index
+        else:
+            slot = len(self.phraselet_labels)
+            if slot == len(self.positions):
+                self.positions = numpy.resize(self.positions, 2 * slot)
+                self.scores = numpy.resize(self.scores, 2 * slot)
+            self.phraselet_labels.append(phraselet_label)
+            self.phraselet_labels_to_slots[phraselet_label] = slot
+            self.positions[slot] = current_index
+            self.scores[slot] = score
+
+    def get_total_activation(self, current_index: int) -> float:
+        number_of_slots = len(self.phraselet_labels)
+        if number_of_slots == 0:
+            return 0
+        tailoff_quotients = numpy.minimum(
+            (current_index - self.positions[:number_of_slots])
+            / self.maximum_activation_distance,
+            1.0,
+        )
+        activations = (1 - tailoff_quotients) * self.scores[:number_of_slots]
+        are_active = activations > 0
+        if not are_active.all():
+            active_slots = numpy.flatnonzero(are_active)
+            self.phraselet_labels = [
+                self.phraselet_labels[slot] for slot in active_slots
+            ]
+            self.phraselet_labels_to_slots = {
+                phraselet_label: slot
+                for slot, phraselet_label in enumerate(self.phraselet_labels)
+            }
+            number_of_slots = len(active_slots)
+            self.positions[:number_of_slots] = self.positions[active_slots]
+            self.scores[:number_of_slots] = self.scores[active_slots]
+            activations = activations[active_slots]
+            if number_of_slots == 0:
+                return 0
+        # numpy.cumsum() adds the activations sequentially, whereas numpy.sum() uses
+        # pairwise summation, which could lead to different rounding
+        return float(numpy.cumsum(activations)[-1])
+
+
 class PhraseletWordMatchInfo:
     def __init__(self):
         self.single_word_match_corpus_words: Set[CorpusWordPosition] = set()
@@ -92,22 +262,76 @@ class PhraseletWordMatchInfo:
         # Dictionary from phraselets with this word as the child to indexes where the
         # phraselet was matched.
 
-        self.parent_match_corpus_words_to_matches: Dict[
-            CorpusWordPosition, List[Match]
+
+class PositionalMatchIndex:
+    """Records the relation matches made during a single topic matching query by the document
+    position of each of their two poles, so that the matches sharing a position can be
+    retrieved without scanning all matches. Matches are added incrementally as each matching
+    pass completes.
+    """
+
+    def __init__(self):
+        self.parent_positions_to_words_to_matches: Dict[
+            Tuple[str, int, Optional[int]], Dict[str, List[Match]]
         ] = {}
-        # Dictionary from indexes where phraselets with this word as the parent were matched
-        # to the match objects.
+        # Dictionary from (document label, token index, subword index) positions at which
+        # the parent poles of relation phraselets were matched to dictionaries from the
+        # parent words of the phraselets to the match objects.
 
-        self.child_match_corpus_words_to_matches: Dict[
-            CorpusWordPosition, List[Match]
+        self.child_positions_to_words_to_matches: Dict[
+            Tuple[str, int, Optional[int]], Dict[str, List[Match]]
         ] = {}
-        # Dictionary from indexes where phraselets with this word as the child were matched
-        # to the match objects.
+        # Dictionary from (document label, token index, subword index) positions at which
+        # the child poles of relation phraselets were matched to dictionaries from the
+        # child words of the phraselets to the match objects.
+
+    def add(
+        self,
+        corpus_word_position: CorpusWordPosition,
+        word: str,
+        match: Match,
+        parent: bool,
+    ) -> None:
+        if parent:
+            positions_to_words_to_matches = self.parent_positions_to_words_to_matches
+        else:
+            positions_to_words_to_matches = self.child_positions_to_words_to_matches
+        position = (
+            corpus_word_position.document_label,
+            corpus_word_position.index.token_index,
+            corpus_word_position.index.subword_index,
+        )
+        if position not in positions_to_words_to_matches:
+            positions_to_words_to_matches[position] = {}
+        words_to_matches = positions_to_words_to_matches[position]
+        if word in words_to_matches:
+            words_to_matches[word].append(match)
+        else:
+            words_to_matches[word] = [match]
+
+    def get_matches(
+        self, corpus_word_position: CorpusWordPosition, word: str, parent: bool
+    ) -> List[Match]:
+        """Returns the matches whose parent (*parent==True*) or child (*parent==False*)
+        search phrase word is *word* and whose pole matched at *corpus_word_position*."""
+        if parent:
+            positions_to_words_to_matches = self.parent_positions_to_words_to_matches
+        else:
+            positions_to_words_to_matches = self.child_positions_to_words_to_matches
+        position = (
+            corpus_word_position.document_label,
+            corpus_word_position.index.token_index,
+            corpus_word_position.index.subword_index,
+        )
+        return positions_to_words_to_matches.get(position, {}).get(word, [])
 
 
 class TopicMatcher:
     """A topic matcher object. See manager.py for details of the properties."""
 
+    # The number of phraselets from which activations are calculated using arrays
+    vectorised_activation_minimum_phraselets = 20
+
     def __init__(
         self,
         *,
@@ -137,7 +361,10 @@ class TopicMatcher:
         number_of_results: int,
         document_label_filter: str,
         use_frequency_factor: bool,
-        entity_label_to_vector_dict: Dict[str, Floats1d]
+        entity_label_to_vector_dict: Dict[str, Floats1d],
+        score_floor: Optional[Any] = None,
+        single_word_matching_frequency_threshold: float = 0.0,
+        deadline: Optional[Deadline] = None
     ) -> None:
         self.structural_matcher = structural_matcher
         self.semantic_matching_helper = structural_matcher.semantic_matching_helper
@@ -170,12 +397,18 @@ class TopicMatcher:
         self.embedding_matching_frequency_threshold = (
             embedding_matching_frequency_threshold
         )
+        self.single_word_matching_frequency_threshold = (
+            single_word_matching_frequency_threshold
+        )
         self.sideways_match_extent = sideways_match_extent
         self.only_one_result_per_document = only_one_result_per_document
         self.number_of_results = number_of_results
         self.document_label_filter = document_label_filter
         self.use_frequency_factor = use_frequency_factor
+        self.score_floor = score_floor
+        self.deadline = deadline
         self.words_to_phraselet_word_match_infos: Dict[str, PhraseletWordMatchInfo] = {}
+        self.positional_match_index = PositionalMatchIndex()
 
         process_initial_question_words = initial_question_word_behaviour in (
             "process",
@@ -221,12 +454,32 @@ class TopicMatcher:
                 )
             )
 
+        # Single-word phraselets for very frequent words are only matched within the activation
+        # distance of matches of the remaining phraselets
+        frequent_single_word_search_phrases = [
+            phraselet_labels_to_search_phrases[phraselet_info.label]
+            for phraselet_info in phraselet_labels_to_phraselet_infos.values()
+            if phraselet_info.child_lemma is None
+            and phraselet_info.frequency_factor is not None
+            and phraselet_info.frequency_factor
+            < single_word_matching_frequency_threshold
+            and not phraselet_info.parent_is_initial_question_word
+            and not phraselet_info.parent_has_initial_question_word_in_phrase
+        ]
+        frequent_single_word_phraselet_labels = {
+            search_phrase.label for search_phrase in frequent_single_word_search_phrases
+        }
+
         # First get single-word matches
         structural_matches = self.structural_matcher.match(
             word_matching_strategies=word_matching_strategies,
             document_labels_to_documents=self.document_labels_to_documents,
             reverse_dict=self.reverse_dict,
-            search_phrases=phraselet_labels_to_search_phrases.values(),
+            search_phrases=[
+                search_phrase
+                for search_phrase in phraselet_labels_to_search_phrases.values()
+                if search_phrase.label not in frequent_single_word_phraselet_labels
+            ],
             match_depending_on_single_words=True,
             compare_embeddings_on_root_words=False,
             compare_embeddings_on_non_root_words=False,
@@ -236,6 +489,7 @@ class TopicMatcher:
             overall_similarity_threshold=overall_similarity_threshold,
             initial_question_word_overall_similarity_threshold=initial_question_word_overall_similarity_threshold,
             document_label_filter=self.document_label_filter,
+            deadline=self.deadline,
         )
 
         # Now get normally matched relations
@@ -254,19 +508,45 @@ class TopicMatcher:
                 overall_similarity_threshold=overall_similarity_threshold,
                 initial_question_word_overall_similarity_threshold=initial_question_word_overall_similarity_threshold,
                 document_label_filter=self.document_label_filter,
+                deadline=self.deadline,
             )
         )
 
-        self.rebuild_document_info_dict(
+        if len(frequent_single_word_search_phrases) > 0:
+            activated_corpus_word_positions = self.get_activated_corpus_word_positions(
+                frequent_single_word_search_phrases, structural_matches
+            )
+            if len(activated_corpus_word_positions) > 0 and not self.deadline_passed():
+                structural_matches.extend(
+                    self.structural_matcher.match(
+                        word_matching_strategies=word_matching_strategies,
+                        document_labels_to_documents=self.document_labels_to_documents,
+                        reverse_dict=self.reverse_dict,
+                        search_phrases=frequent_single_word_search_phrases,
+                        match_depending_on_single_words=True,
+                        compare_embeddings_on_root_words=False,
+                        compare_embeddings_on_non_root_words=False,
+                        reverse_matching_cwps=activated_corpus_word_positions,
+                        embedding_reverse_matching_cwps=None,
+                        process_initial_question_words=process_initial_question_words,
+                        overall_similarity_threshold=overall_similarity_threshold,
+                        initial_question_word_overall_similarity_threshold=initial_question_word_overall_similarity_threshold,
+                        document_label_filter=self.document_label_filter,
+                        deadline=self.deadline,
+                    )
+                )
+
+        self.add_to_document_info_dict(
             structural_matches, phraselet_labels_to_phraselet_infos
         )
+        number_of_indexed_matches = len(structural_matches)
         parent_direct_retry_corpus_word_positions: Set[CorpusWordPosition] = set()
         parent_embedding_retry_corpus_word_positions: Set[CorpusWordPosition] = set()
         child_embedding_retry_corpus_word_positions: Set[CorpusWordPosition] = set()
         for phraselet in (
             phraselet_labels_to_search_phrases[phraselet_info.label]
             for phraselet_info in phraselet_labels_to_phraselet_infos.values()
-            if phraselet_info.child_lemma is not None
+            if phraselet_info.child_lemma is not None and not self.deadline_passed()
         ):
             self.add_indexes_for_reverse_matching(
                 phraselet=phraselet,
@@ -278,7 +558,7 @@ class TopicMatcher:
         if (
             len(parent_embedding_retry_corpus_word_positions) > 0
             or len(parent_direct_retry_corpus_word_positions) > 0
-        ):
+        ) and not self.deadline_passed():
             # Perform reverse matching at selected indexes
             structural_matches.extend(
                 self.structural_matcher.match(
@@ -295,10 +575,14 @@ class TopicMatcher:
                     overall_similarity_threshold=overall_similarity_threshold,
                     initial_question_word_overall_similarity_threshold=initial_question_word_overall_similarity_threshold,
                     document_label_filter=self.document_label_filter,
+                    deadline=self.deadline,
                 )
             )
 
-        if len(child_embedding_retry_corpus_word_positions) > 0:
+        if (
+            len(child_embedding_retry_corpus_word_positions) > 0
+            and not self.deadline_passed()
+        ):
             # Retry normal matching at selected indexes with embedding-based matching on children
             structural_matches.extend(
                 self.structural_matcher.match(
@@ -315,16 +599,14 @@ class TopicMatcher:
                     overall_similarity_threshold=overall_similarity_threshold,
                     initial_question_word_overall_similarity_threshold=initial_question_word_overall_similarity_threshold,
                     document_label_filter=self.document_label_filter,
+                    deadline=self.deadline,
                 )
             )
-        if (
-            len(parent_direct_retry_corpus_word_positions) > 0
-            or len(parent_embedding_retry_corpus_word_positions) > 0
-            or len(child_embedding_retry_corpus_word_positions) > 0
-        ):
-            self.rebuild_document_info_dict(
-                structural_matches, phraselet_labels_to_phraselet_infos
-            )
+        # Only the matches found by the retry passes still need to be indexed
+        self.add_to_document_info_dict(
+            structural_matches[number_of_indexed_matches:],
+            phraselet_labels_to_phraselet_infos,
+        )
         structural_matches = list(
             filter(self.filter_superfluous_matches, structural_matches)
         )
@@ -332,40 +614,116 @@ class TopicMatcher:
             info.label: info.frequency_factor
             for info in phraselet_labels_to_phraselet_infos.values()
         }
-        position_sorted_structural_matches = sorted(
-            structural_matches,
-            key=lambda match: (
-                match.document_label,
-                match.index_within_document,
-                match.get_subword_index_for_sorting(),
-                len(
-                    [
-                        1
-                        for wm in match.word_matches
-                        if wm.search_phrase_token._.holmes.is_initial_question_word
-                    ]
-                )
-                == 0,
-                match.from_single_word_phraselet,
-            ),
+        document_labels_to_structural_matches: Dict[str, List[Match]] = {}
+        for match in structural_matches:
+            self.add_to_dict_list(
+                document_labels_to_structural_matches, match.document_label, match
+            )
+        del structural_matches
+        self.topic_matches = self.score_documents_and_generate_topic_matches(
+            document_labels_to_structural_matches,
+            cast(Dict[str, float], phraselet_labels_to_frequency_factors),
         )
-        position_sorted_structural_matches = self.remove_duplicates(
-            position_sorted_structural_matches
+
+    def score_documents_and_generate_topic_matches(
+        self,
+        document_labels_to_structural_matches: Dict[str, List[Match]],
+        phraselet_labels_to_frequency_factors: Dict[str, float],
+    ) -> List[TopicMatch]:
+        """Performs activation scoring and generates topic matches one document at a time,
+        retaining only the topic matches that can still be among the results in a bounded
+        heap. The structural matches for each document are released once the document has
+        been processed, so that the memory required for scoring depends on the size of the
+        largest document rather than on the size of the corpus.
+
+        The results are the same as would be obtained by scoring all documents and then
+        generating topic matches from all structural matches in order of score: documents
+        are processed in label order, and where scores are tied, topic matches from earlier
+        documents and from earlier positions within documents are preferred.
+
+        If the deadline passes, the remaining documents are not scored. At least one document
+        is always scored so that results can be returned.
+        """
+        maximum_topic_matches_per_document = (
+            1 if self.only_one_result_per_document else self.number_of_results
         )
-        position_sorted_structural_matches = (
-            self.remove_single_word_matches_made_superfluous_by_multiword_matches(
+        # Entries are (score, -document number, -number within document, topic match),
+        # so that the entry at the top of the heap is the one that would be dropped first
+        topic_match_heap: List[Tuple[float, int, int, TopicMatch]] = []
+        for document_number, document_label in enumerate(
+            sorted(document_labels_to_structural_matches)
+        ):
+            if document_number > 0 and self.deadline_passed():
+                break
+            position_sorted_structural_matches = sorted(
+                document_labels_to_structural_matches.pop(document_label),
+                key=lambda match: (
+                    match.index_within_document,
+                    match.get_subword_index_for_sorting(),
+                    len(
+                        [
+                            1
+                            for wm in match.word_matches
+                            if wm.search_phrase_token._.holmes.is_initial_question_word
+                        ]
+                    )
+                    == 0,
+                    match.from_single_word_phraselet,
+                ),
+            )
+            position_sorted_structural_matches = self.remove_duplicates(
                 position_sorted_structural_matches
             )
-        )
+            position_sorted_structural_matches = (
+                self.remove_single_word_matches_made_superfluous_by_multiword_matches(
+                    position_sorted_structural_matches
+                )
+            )
 
-        # Read through the documents measuring the activation based on where
-        # in the document structural matches were found
-        score_sorted_structural_matches = self.perform_activation_scoring(
-            position_sorted_structural_matches,
-            cast(Dict[str, float], phraselet_labels_to_frequency_factors),
-        )
-        self.topic_matches = self.generate_topic_matches(
-            score_sorted_structural_matches, position_sorted_structural_matches
+            # Read through the document measuring the activation based on where
+            # in the document structural matches were found
+            self.perform_activation_scoring(
+                position_sorted_structural_matches,
+                phraselet_labels_to_frequency_factors,
+            )
+            for number_within_document, topic_match in enumerate(
+                self.generate_topic_matches(
+                    position_sorted_structural_matches,
+                    maximum_topic_matches_per_document,
+                    topic_match_heap[0][0]
+                    if len(topic_match_heap) >= self.number_of_results
+                    else None,
+                )
+            ):
+                entry = (
+                    topic_match.score,
+                    0 - document_number,
+                    0 - number_within_document,
+                    topic_match,
+                )
+                if len(topic_match_heap) < self.number_of_results:
+                    heapq.heappush(topic_match_heap, entry)
+                elif entry[:3] > topic_match_heap[0][:3]:
+                    heapq.heapreplace(topic_match_heap, entry)
+                else:
+                    # Later topic matches from this document have lower scores
+                    break
+        # Restore the order in which the topic matches would have been generated from all
+        # documents together so that the following sort treats ties in the same way
+        topic_matches = [
+            entry[3]
+            for entry in sorted(
+                topic_match_heap,
+                key=lambda entry: (0 - entry[0], 0 - entry[1], 0 - entry[2]),
+            )
+        ]
+        # If two matches have the same score, order them by length
+        return sorted(
+            topic_matches,
+            key=lambda topic_match: (
+                0 - topic_match.score,
+                topic_match.start_index - topic_match.end_index,
+            ),
         )
 
     def get_phraselet_word_match_info(self, word: str) -> PhraseletWordMatchInfo:
@@ -548,7 +906,43 @@ class TopicMatcher:
                         )
                         set_to_add_to.add(working_cwp)
 
-    def rebuild_document_info_dict(
+    def get_activated_corpus_word_positions(
+        self, search_phrases: List[SearchPhrase], matches: List[Match]
+    ) -> Set[CorpusWordPosition]:
+        """Returns the corpus word positions at which the root words of *search_phrases*
+        could match that lie within *maximum_activation_distance* words of a document word
+        matched by *matches*."""
+        activated_index_ranges = CoveredIndexRanges()
+        for match in matches:
+            for word_match in match.word_matches:
+                token_index = word_match.document_token.i
+                activated_index_ranges.add(
+                    match.document_label,
+                    token_index - self.maximum_activation_distance,
+                    token_index + self.maximum_activation_distance,
+                )
+        activated_corpus_word_positions = set()
+        for search_phrase in search_phrases:
+            words = list(search_phrase.words_matching_root_token)
+            entity_placeholder = self.semantic_matching_helper.get_entity_placeholder(
+                search_phrase.root_token
+            )
+            if entity_placeholder is not None:
+                words.append(entity_placeholder)
+            for word in words:
+                if word not in self.reverse_dict:
+                    continue
+                activated_corpus_word_positions.update(
+                    corpus_word_position
+                    for corpus_word_position in self.reverse_dict[word]
+                    if activated_index_ranges.contains(
+                        corpus_word_position.document_label,
+                        corpus_word_position.index.token_index,
+                    )
+                )
+        return activated_corpus_word_positions
+
+    def add_to_document_info_dict(
         self,
         matches: List[Match],
         phraselet_labels_to_phraselet_infos: Dict[str, PhraseletInfo],
@@ -562,30 +956,20 @@ class TopicMatcher:
             corpus_word_position = CorpusWordPosition(
                 match.document_label, word_match.get_document_index()
             )
+            self.positional_match_index.add(corpus_word_position, word, match, parent)
             if parent:
-                self.add_to_dict_list(
-                    phraselet_word_match_info.parent_match_corpus_words_to_matches,
-                    corpus_word_position,
-                    match,
-                )
                 self.add_to_dict_list(
                     phraselet_word_match_info.phraselet_labels_to_parent_match_corpus_words,
                     match.search_phrase_label,
                     corpus_word_position,
                 )
             else:
-                self.add_to_dict_list(
-                    phraselet_word_match_info.child_match_corpus_words_to_matches,
-                    corpus_word_position,
-                    match,
-                )
                 self.add_to_dict_list(
                     phraselet_word_match_info.phraselet_labels_to_child_match_corpus_words,
                     match.search_phrase_label,
                     corpus_word_position,
                 )
 
-        self.words_to_phraselet_word_match_infos = {}
         for match in matches:
             if match.from_single_word_phraselet:
                 phraselet_info = phraselet_labels_to_phraselet_infos[
@@ -609,19 +993,12 @@ class TopicMatcher:
         ) -> List[Match]:  # 'True' -> parent, 'False' -> child
             word_match = self.get_word_match_from_match(match, parent)
             word = word_match.search_phrase_token._.holmes.derived_lemma
-            phraselet_word_match_info = self.get_phraselet_word_match_info(word)
             corpus_word_position = CorpusWordPosition(
                 match.document_label, word_match.get_document_index()
             )
-            if parent:
-                match_dict = (
-                    phraselet_word_match_info.parent_match_corpus_words_to_matches
-                )
-            else:
-                match_dict = (
-                    phraselet_word_match_info.child_match_corpus_words_to_matches
-                )
-            return match_dict[corpus_word_position]
+            return self.positional_match_index.get_matches(
+                corpus_word_position, word, parent
+            )
 
         def check_for_sibling_match_with_higher_similarity(
             match: Match,
@@ -868,14 +1245,20 @@ class TopicMatcher:
         self,
         position_sorted_structural_matches: List[Match],
         phraselet_labels_to_frequency_factors: Dict[str, float],
-    ) -> List[Match]:
+    ) -> None:
         """
-        Read through the documents measuring the activation based on where
+        Read through a document measuring the activation based on where
         in the document structural matches were found.
+
+        Parameters:
+
+        position_sorted_structural_matches -- the structural matches within a single document.
+        phraselet_labels_to_frequency_factors -- a dictionary from phraselet labels to frequency
+            factors.
         """
 
         def get_set_from_dict(
-            dictionary: Dict[CorpusWordPosition, Set[str]], key: CorpusWordPosition
+            dictionary: Dict[Index, Set[str]], key: Index
         ) -> Set[str]:
             if key in dictionary:
                 return dictionary[key]
@@ -891,62 +1274,36 @@ class TopicMatcher:
                 and len({wm.document_token.i for wm in match.word_matches}) == 1
             )
 
-        def get_current_activation_for_phraselet(
-            phraselet_activation_tracker: PhraseletActivationTracker, current_index: int
-        ) -> float:
-            distance_to_last_match = (
-                current_index - phraselet_activation_tracker.position
-            )
-            tailoff_quotient = distance_to_last_match / self.maximum_activation_distance
-            tailoff_quotient = min(tailoff_quotient, 1.0)
-            return (1 - tailoff_quotient) * phraselet_activation_tracker.score
-
-        document_labels_to_indexes_to_phraselet_labels: Dict[
-            str, Dict[CorpusWordPosition, Set[str]]
-        ] = {}
+        indexes_to_phraselet_labels: Dict[Index, Set[str]] = {}
         for match in (
             match
             for match in position_sorted_structural_matches
             if not match.from_single_word_phraselet
             and not is_intcompound_match_within_same_document_word(match)
         ):
-            if match.document_label in document_labels_to_indexes_to_phraselet_labels:
-                inner_dict = document_labels_to_indexes_to_phraselet_labels[
-                    match.document_label
-                ]
-            else:
-                inner_dict = {}
-                document_labels_to_indexes_to_phraselet_labels[
-                    match.document_label
-                ] = inner_dict
             parent_word_match = self.get_word_match_from_match(match, True)
             self.add_to_dict_set(
-                inner_dict,
+                indexes_to_phraselet_labels,
                 parent_word_match.get_document_index(),
                 match.search_phrase_label,
             )
             child_word_match = self.get_word_match_from_match(match, False)
             self.add_to_dict_set(
-                inner_dict,
+                indexes_to_phraselet_labels,
                 child_word_match.get_document_index(),
                 match.search_phrase_label,
             )
-        current_document_label = None
+        phraselet_activations = (
+            VectorisedPhraseletActivations(self.maximum_activation_distance)
+            if len(phraselet_labels_to_frequency_factors)
+            >= self.vectorised_activation_minimum_phraselets
+            else PhraseletActivations(self.maximum_activation_distance)
+        )
         for pssm_index, match in enumerate(position_sorted_structural_matches):
-            match.original_index_within_list = (  # type:ignore[attr-defined]
+            match.original_index_within_list = (
                 pssm_index  # store for later use after resorting
             )
-            if match.document_label != current_document_label or pssm_index == 0:
-                current_document_label = match.document_label
-                phraselet_labels_to_phraselet_activation_trackers: Dict[
-                    str, PhraseletActivationTracker
-                ] = {}
-                indexes_to_phraselet_labels = (
-                    document_labels_to_indexes_to_phraselet_labels.get(
-                        current_document_label, {}
-                    )
-                )
-            match.is_overlapping_relation = False  # type:ignore[attr-defined]
+            match.is_overlapping_relation = False
             if (
                 match.from_single_word_phraselet
                 or is_intcompound_match_within_same_document_word(match)
@@ -962,14 +1319,7 @@ class TopicMatcher:
                 else:
                     this_match_score = self.relation_score
                 for word_match in match.word_matches:
-                    if (
-                        word_match.search_phrase_token._.holmes.is_initial_question_word
-                        or word_match.search_phrase_token._.holmes.has_initial_question_word_in_phrase
-                    ) and not (
-                        word_match.document_token._.holmes.is_initial_question_word
-                        or word_match.document_token.tag_
-                        in self.semantic_matching_helper.interrogative_pronoun_tags
-                    ):
+                    if self.is_answering_word_match(word_match):
                         this_match_score = self.initial_question_word_answer_score
                 this_match_parent_word_match = self.get_word_match_from_match(
                     match, True
@@ -990,7 +1340,7 @@ class TopicMatcher:
                 )
                 other_relevant_phraselet_labels.remove(match.search_phrase_label)
                 if len(other_relevant_phraselet_labels) > 0:
-                    match.is_overlapping_relation = True  # type:ignore[attr-defined]
+                    match.is_overlapping_relation = True
                     this_match_score *= self.overlapping_relation_multiplier
 
             if self.use_frequency_factor:
@@ -1009,70 +1359,74 @@ class TopicMatcher:
             ):
                 this_match_score *= self.ontology_penalty ** (abs(word_match.depth) + 1)
 
-            if (
-                match.search_phrase_label
-                in phraselet_labels_to_phraselet_activation_trackers
-            ):
-                phraselet_activation_tracker = (
-                    phraselet_labels_to_phraselet_activation_trackers[
-                        match.search_phrase_label
-                    ]
-                )
-                current_score = get_current_activation_for_phraselet(
-                    phraselet_activation_tracker, match.index_within_document
-                )
-                if this_match_score > current_score:
-                    phraselet_activation_tracker.score = this_match_score
-                else:
-                    phraselet_activation_tracker.score = current_score
-                phraselet_activation_tracker.position = match.index_within_document
-            else:
-                phraselet_labels_to_phraselet_activation_trackers[
-                    match.search_phrase_label
-                ] = PhraseletActivationTracker(
-                    match.index_within_document, this_match_score
-                )
-            match.topic_score = 0  # type:ignore[attr-defined]
-            for phraselet_label in list(
-                phraselet_labels_to_phraselet_activation_trackers
-            ):
-                phraselet_activation_tracker = (
-                    phraselet_labels_to_phraselet_activation_trackers[phraselet_label]
-                )
-                current_activation = get_current_activation_for_phraselet(
-                    phraselet_activation_tracker, match.index_within_document
-                )
-                if current_activation <= 0:
-                    del phraselet_labels_to_phraselet_activation_trackers[
-                        phraselet_label
-                    ]
-                else:
-                    match.topic_score += current_activation  # type:ignore[attr-defined]
-        return sorted(
-            position_sorted_structural_matches,
-            key=lambda match: 0 - match.topic_score,  # type:ignore[attr-defined]
+            phraselet_activations.update(
+                match.search_phrase_label,
+                match.index_within_document,
+                this_match_score,
+            )
+            match.topic_score = phraselet_activations.get_total_activation(
+                match.index_within_document
+            )
+
+    @property
+    def partial(self) -> bool:
+        """*True* if matching or scoring was interrupted because the deadline passed."""
+        return self.deadline is not None and self.deadline.interrupted
+
+    def deadline_passed(self) -> bool:
+        """Returns *True*, recording that the results are partial, if the deadline has
+        passed. Only called before work that is then skipped."""
+        if self.deadline is not None and self.deadline.passed():
+            self.deadline.interrupted = True
+        return self.partial
+
+    def get_score_floor(self) -> float:
+        """Returns the lowest score a topic match can have and still be among the overall
+        results, as reported by workers that have already completed their search."""
+        return self.score_floor.value if self.score_floor is not None else 0.0
+
+    def report_score_floor(
+        self, topic_match_summaries: List[Tuple[float, int, str, int, int]]
+    ) -> None:
+        """Reports the lowest score among this worker's results to the other workers if this
+        worker has found the full number of results, as no other result with a lower score can
+        then be among the overall results."""
+        if (
+            self.score_floor is None
+            or len(topic_match_summaries) < self.number_of_results
+        ):
+            return
+        lowest_score = min(
+            topic_match_summary[0] for topic_match_summary in topic_match_summaries
         )
+        # Any value written is a valid floor, so simultaneous updates are harmless
+        if lowest_score > self.score_floor.value:
+            self.score_floor.value = lowest_score
 
     def generate_topic_matches(
         self,
-        score_sorted_structural_matches: List[Match],
         position_sorted_structural_matches: List[Match],
+        maximum_number_of_topic_matches: int,
+        score_to_exceed: Optional[float],
     ) -> List[TopicMatch]:
-        """Resort the matches starting with the highest (most active) and
+        """Visit the matches within a document starting with the highest (most active) and
         create topic match objects with information about the surrounding sentences.
+        The matches are retrieved from a heap so that only the matches visited before
+        the required number of topic matches has been found need to be put in order.
+
+        Parameters:
+
+        position_sorted_structural_matches -- the structural matches within a single document.
+        maximum_number_of_topic_matches -- the maximum number of topic matches to generate.
+        score_to_exceed -- the score topic matches have to exceed to be generated, or *None*.
         """
 
         def match_contained_within_existing_topic_match(
-            topic_matches: List[TopicMatch], match: Match
+            covered_index_ranges: CoveredIndexRanges, match: Match
         ) -> bool:
-            for topic_match in topic_matches:
-                if (
-                    match.document_label == topic_match.document_label
-                    and match.index_within_document >= topic_match.start_index
-                    and match.index_within_document <= topic_match.end_index
-                ):
-                    return True
-            return False
+            return covered_index_ranges.contains(
+                match.document_label, match.index_within_document
+            )
 
         def alter_start_and_end_indexes_for_match(
             start_index: int, end_index: int, match: Match
@@ -1094,20 +1448,30 @@ class TopicMatcher:
                     end_index = word_match.document_subword.containing_token_index
             return start_index, end_index
 
-        if self.only_one_result_per_document:
-            existing_document_labels = []
         topic_matches: List[TopicMatch] = []
+        covered_index_ranges = CoveredIndexRanges()
+        score_floor = self.get_score_floor()
+        # The original list index breaks ties in the same way as a stable sort by score
+        score_heap = [
+            (0 - match.topic_score, index)
+            for index, match in enumerate(position_sorted_structural_matches)
+        ]
+        heapq.heapify(score_heap)
         counter = 0
-        for score_sorted_match in score_sorted_structural_matches:
-            if counter >= self.number_of_results:
+        while len(score_heap) > 0:
+            if counter >= maximum_number_of_topic_matches:
                 break
-            if match_contained_within_existing_topic_match(
-                topic_matches, score_sorted_match
+            score_sorted_match = position_sorted_structural_matches[
+                heapq.heappop(score_heap)[1]
+            ]
+            topic_score = score_sorted_match.topic_score
+            if topic_score < score_floor or (
+                score_to_exceed is not None and topic_score <= score_to_exceed
             ):
-                continue
-            if (
-                self.only_one_result_per_document
-                and score_sorted_match.document_label in existing_document_labels
+                # No remaining match can yield a topic match within the overall results
+                break
+            if match_contained_within_existing_topic_match(
+                covered_index_ranges, score_sorted_match
             ):
                 continue
             start_index, end_index = alter_start_and_end_indexes_for_match(
@@ -1115,9 +1479,7 @@ class TopicMatcher:
                 score_sorted_match.index_within_document,
                 score_sorted_match,
             )
-            previous_index_within_list = (
-                score_sorted_match.original_index_within_list  # type:ignore[attr-defined]
-            )
+            previous_index_within_list = score_sorted_match.original_index_within_list
             while (
                 previous_index_within_list > 0
                 and position_sorted_structural_matches[
@@ -1133,7 +1495,7 @@ class TopicMatcher:
                 # when a complex structure is matched, it will often begin with a single noun
                 # that should be included within the topic match indexes
                 if match_contained_within_existing_topic_match(
-                    topic_matches,
+                    covered_index_ranges,
                     position_sorted_structural_matches[previous_index_within_list - 1],
                 ):
                     break
@@ -1151,11 +1513,9 @@ class TopicMatcher:
                     end_index,
                     position_sorted_structural_matches[previous_index_within_list],
                 )
-            next_index_within_list = (
-                score_sorted_match.original_index_within_list  # type:ignore[attr-defined]
-            )
+            next_index_within_list = score_sorted_match.original_index_within_list
             while (
-                next_index_within_list + 1 < len(score_sorted_structural_matches)
+                next_index_within_list + 1 < len(position_sorted_structural_matches)
                 and position_sorted_structural_matches[
                     next_index_within_list + 1
                 ].document_label
@@ -1166,7 +1526,7 @@ class TopicMatcher:
                 >= self.different_match_cutoff_score
             ):
                 if match_contained_within_existing_topic_match(
-                    topic_matches,
+                    covered_index_ranges,
                     position_sorted_structural_matches[next_index_within_list + 1],
                 ):
                     break
@@ -1204,26 +1564,114 @@ class TopicMatcher:
                     end_index,
                     sentences_start_index,
                     sentences_end_index - 1,
-                    score_sorted_match.topic_score,  # type:ignore[attr-defined]
+                    score_sorted_match.topic_score,
                     text,
                     position_sorted_structural_matches[
                         previous_index_within_list : next_index_within_list + 1
                     ],
                 )
             )
-            if self.only_one_result_per_document:
-                existing_document_labels.append(score_sorted_match.document_label)
+            covered_index_ranges.add(
+                score_sorted_match.document_label, start_index, end_index
+            )
             counter += 1
-        # If two matches have the same score, order them by length
-        return sorted(
-            topic_matches,
-            key=lambda topic_match: (
-                0 - topic_match.score,
-                topic_match.start_index - topic_match.end_index,
-            ),
+        return topic_matches
+
+    def get_relative_character_span(
+        self,
+        doc: Doc,
+        word_match: WordMatch,
+        sentences_character_start_index_in_document: int,
+    ) -> Tuple[int, int]:
+        """Returns the character start and end indexes of the document word or subword matched
+        by *word_match* relative to the start of the sentences containing the topic match."""
+        if word_match.document_subword is not None:
+            subword = word_match.document_subword
+            relative_start_index = (
+                doc[subword.containing_token_index].idx
+                + subword.char_start_index
+                - sentences_character_start_index_in_document
+            )
+            relative_end_index = relative_start_index + len(subword.text)
+        else:
+            relative_start_index = (
+                word_match.first_document_token.idx
+                - sentences_character_start_index_in_document
+            )
+            relative_end_index = (
+                word_match.last_document_token.idx
+                + len(word_match.last_document_token.text)
+                - sentences_character_start_index_in_document
+            )
+        return relative_start_index, relative_end_index
+
+    def is_answering_word_match(self, word_match: WordMatch) -> bool:
+        """Returns *True* if the document word matched by *word_match* answers an initial
+        question word in the text to match."""
+        return (
+            word_match.search_phrase_token._.holmes.is_initial_question_word
+            or word_match.search_phrase_token._.holmes.has_initial_question_word_in_phrase
+        ) and not (
+            word_match.document_token._.holmes.is_initial_question_word
+            or word_match.document_token.tag_
+            in self.semantic_matching_helper.interrogative_pronoun_tags
         )
 
-    def get_topic_match_dictionaries(self):
+    def get_topic_match_summaries(self) -> List[Tuple[float, int, str, int, int]]:
+        """Returns a tuple for each topic match for which *get_topic_match_dictionaries()*
+        would return a dictionary, consisting of the score, the number of words in the text,
+        the document label, the relative character start index of the first word info and the
+        index of the topic match. The first four values are the values by which
+        *TopicMatchDictionaryOrderer* sorts the dictionaries, so that the overall results can
+        be selected before any dictionaries are built."""
+        topic_match_summaries = []
+        score_floor = self.get_score_floor()
+        for topic_match_index, topic_match in enumerate(self.topic_matches):
+            if topic_match.score < score_floor:
+                # The topic matches are sorted by score, so none of the following topic
+                # matches can be among the overall results either
+                break
+            if self.initial_question_word_behaviour == "exclusive" and not any(
+                self.is_answering_word_match(word_match)
+                for match in topic_match.structural_matches
+                for word_match in match.word_matches
+            ):
+                continue
+            doc = self.document_labels_to_documents[topic_match.document_label]
+            sentences_character_start_index_in_document = doc[
+                topic_match.sentences_start_index
+            ].idx
+            # The word info that is not contained within any other word info and starts first
+            # always starts with the word match that starts first
+            first_word_info_relative_start_index = min(
+                self.get_relative_character_span(
+                    doc, word_match, sentences_character_start_index_in_document
+                )[0]
+                for match in topic_match.structural_matches
+                for word_match in match.word_matches
+            )
+            topic_match_summaries.append(
+                (
+                    topic_match.score,
+                    len(topic_match.text.split()),
+                    topic_match.document_label,
+                    first_word_info_relative_start_index,
+                    topic_match_index,
+                )
+            )
+        return topic_match_summaries
+
+    def get_topic_match_dictionaries(
+        self, topic_match_indexes: Optional[List[int]] = None
+    ) -> List[Dict]:
+        """Returns dictionaries representing topic matches.
+
+        Parameters:
+
+        topic_match_indexes -- the indexes of the topic matches to return, as returned
+            by *get_topic_match_summaries()*, or *None* if all topic matches that can be
+            among the overall results should be returned.
+        """
         class WordInfo:
             def __init__(
                 self,
@@ -1276,8 +1724,30 @@ class TopicMatcher:
                     return other_word_info
             return None
 
+        def get_uncontained_spans(
+            spans: List[Tuple[int, int]]
+        ) -> List[Tuple[int, int]]:
+            # Returns the (start, end) spans that are not contained within any other span,
+            # sorted by start and end index. Because the spans are sorted by ascending start
+            # index and descending end index, a span is contained within another span
+            # exactly when a preceding span extends at least as far as it does. The spans
+            # must be distinct.
+            uncontained_spans = []
+            maximum_end_index = None
+            for span in sorted(spans, key=lambda span: (span[0], 0 - span[1])):
+                if maximum_end_index is None or span[1] > maximum_end_index:
+                    uncontained_spans.append(span)
+                    maximum_end_index = span[1]
+            return uncontained_spans
+
+        if topic_match_indexes is None:
+            topic_match_indexes = [
+                topic_match_summary[4]
+                for topic_match_summary in self.get_topic_match_summaries()
+            ]
         topic_match_dicts = []
-        for topic_match_counter, topic_match in enumerate(self.topic_matches):
+        for topic_match_index in topic_match_indexes:
+            topic_match = self.topic_matches[topic_match_index]
             doc = self.document_labels_to_documents[topic_match.document_label]
             sentences_character_start_index_in_document = doc[
                 topic_match.sentences_start_index
@@ -1289,24 +1759,12 @@ class TopicMatcher:
             answers_set = set()
             for match in topic_match.structural_matches:
                 for word_match in match.word_matches:
-                    if word_match.document_subword is not None:
-                        subword = word_match.document_subword
-                        relative_start_index = (
-                            doc[subword.containing_token_index].idx
-                            + subword.char_start_index
-                            - sentences_character_start_index_in_document
-                        )
-                        relative_end_index = relative_start_index + len(subword.text)
-                    else:
-                        relative_start_index = (
-                            word_match.first_document_token.idx
-                            - sentences_character_start_index_in_document
-                        )
-                        relative_end_index = (
-                            word_match.last_document_token.idx
-                            + len(word_match.last_document_token.text)
-                            - sentences_character_start_index_in_document
-                        )
+                    (
+                        relative_start_index,
+                        relative_end_index,
+                    ) = self.get_relative_character_span(
+                        doc, word_match, sentences_character_start_index_in_document
+                    )
                     if match.is_overlapping_relation:
                         word_info = WordInfo(
                             relative_start_index,
@@ -1328,14 +1786,7 @@ class TopicMatcher:
                             "relation",
                             word_match.explanation,
                         )
-                    if (
-                        word_match.search_phrase_token._.holmes.is_initial_question_word
-                        or word_match.search_phrase_token._.holmes.has_initial_question_word_in_phrase
-                    ) and not (
-                        word_match.document_token._.holmes.is_initial_question_word
-                        or word_match.document_token.tag_
-                        in self.semantic_matching_helper.interrogative_pronoun_tags
-                    ):
+                    if self.is_answering_word_match(word_match):
                         if word_match.document_subword is not None:
                             answer_relative_start_index = (
                                 word_match.document_token.idx
@@ -1372,12 +1823,20 @@ class TopicMatcher:
                                 existing_word_info.phraselet_match_type = "relation"
                     else:
                         word_infos_to_word_infos[word_info] = word_info
-            for word_info in list(word_infos_to_word_infos.keys()):
-                if (
-                    get_containing_word_info_key(word_infos_to_word_infos, word_info)
-                    is not None
-                ):
-                    del word_infos_to_word_infos[word_info]
+            uncontained_spans = set(
+                get_uncontained_spans(
+                    [
+                        (word_info.relative_start_index, word_info.relative_end_index)
+                        for word_info in word_infos_to_word_infos
+                    ]
+                )
+            )
+            word_infos_to_word_infos = {
+                word_info: word_info
+                for word_info in word_infos_to_word_infos
+                if (word_info.relative_start_index, word_info.relative_end_index)
+                in uncontained_spans
+            }
             if (
                 self.initial_question_word_behaviour != "exclusive"
                 or len(answers_set) > 0
@@ -1425,38 +1884,12 @@ class TopicMatcher:
                         word_info.relative_end_index,
                     ),
                 )
-                answers = list(answers_set)
-                answers.sort(key=lambda answer: (answer[0], answer[1]))
-                for answer in answers.copy():
-                    if (
-                        len(
-                            [
-                                1
-                                for other_answer in answers
-                                if other_answer[0] < answer[0]
-                                and other_answer[1] >= answer[1]
-                            ]
-                        )
-                        > 0
-                    ):
-                        answers.remove(answer)
-                    elif (
-                        len(
-                            [
-                                1
-                                for other_answer in answers
-                                if other_answer[0] == answer[0]
-                                and other_answer[1] > answer[1]
-                            ]
-                        )
-                        > 0
-                    ):
-                        answers.remove(answer)
+                answers = get_uncontained_spans(list(answers_set))
                 topic_match_dict = {
                     "document_label": topic_match.document_label,
                     "text": topic_match.text,
                     "text_to_match": self.text_to_match,
-                    "rank": str(topic_match_counter + 1),  # ties are corrected by
+                    "rank": str(topic_match_index + 1),  # ties are corrected by
                     # TopicMatchDictionaryOrderer
                     "index_within_document": topic_match.index_within_document,
                     "subword_index": topic_match.subword_index,
@@ -1488,6 +1921,24 @@ class TopicMatcher:
 class TopicMatchDictionaryOrderer:
     # in its own class as it is called from the main process rather than from the workers
 
+    def select(
+        self,
+        topic_match_summaries: List[Tuple[float, int, str, int, int, int]],
+        number_of_results: int,
+    ) -> List[Tuple[float, int, str, int, int, int]]:
+        """Returns the summaries of the topic matches whose dictionaries will be among the
+        first *number_of_results* dictionaries returned by *order()*. The first four values
+        of each summary correspond to the values *order()* sorts by."""
+        return sorted(
+            topic_match_summaries,
+            key=lambda summary: (
+                0 - summary[0],
+                0 - summary[1],
+                summary[2],
+                summary[3],
+            ),
+        )[0:number_of_results]
+
     def order(
         self,
         topic_match_dicts: List[Dict],
@@ -126,8 +126,29 @@ class WordMatch:
         otherwise 1.0.
     involves_coreference -- *True* if *document_token* and *structurally_matched_document_token*
         are different.
+    temp_is_parent -- *True* if *search_phrase_token* is the parent word of a topic matching
+        phraselet.
     """
 
+    __slots__ = (
+        "search_phrase_token",
+        "search_phrase_word",
+        "document_token",
+        "first_document_token",
+        "last_document_token",
+        "document_subword",
+        "document_word",
+        "word_match_type",
+        "is_negated",
+        "is_uncertain",
+        "structurally_matched_document_token",
+        "extracted_word",
+        "depth",
+        "similarity_measure",
+        "explanation",
+        "temp_is_parent",
+    )
+
     def __init__(
         self,
         *,
@@ -163,6 +184,7 @@ class WordMatch:
         self.depth = depth
         self.similarity_measure = 1.0
         self.explanation = explanation
+        self.temp_is_parent = False  # will be set by StructuralMatcher
 
     @property
     def involves_coreference(self) -> bool:
@@ -127,6 +127,10 @@ class ErrorsTest(unittest.TestCase):
             nocoref_holmes_manager.remove_all_documents()
             nocoref_holmes_manager.topic_match_documents_against(text_to_match="Try this")
 
+    def test_no_supervised_topic_classifier_error(self):
+        with self.assertRaises(NoSupervisedTopicClassifierError) as context:
+            german_holmes_manager.classify_documents()
+
     def test_wrong_model_deserialization_error_documents(self):
         with self.assertRaises(WrongModelDeserializationError) as context:
             nocoref_holmes_manager.remove_all_documents()
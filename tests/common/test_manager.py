@@ -1,6 +1,13 @@
 import unittest
+from unittest.mock import patch
+import os
+import pickle
+from time import time
+import tempfile
 import holmes_extractor as holmes
-from holmes_extractor.errors import NoDocumentError
+from holmes_extractor.manager import DEADLINE_GRACE_SECONDS
+from holmes_extractor.errors import NoDocumentError, DuplicateDocumentError, \
+    WrongModelDeserializationError, WrongVersionDeserializationError
 
 holmes_manager = holmes.Manager(
     'en_core_web_trf', perform_coreference_resolution=False, number_of_workers=2)
@@ -130,3 +137,193 @@ class ManagerTest(unittest.TestCase):
         docs = lg_holmes_manager.nlp.pipe(['document1', 'document2'], n_process=2)
         self.assertEqual(str(next(docs)), 'document1')
         self.assertEqual(str(next(docs)), 'document2')
+
+    def test_parse_profile_with_timings(self):
+        profiled_holmes_manager = holmes.Manager(
+            'en_core_web_lg', number_of_workers=1,
+            parse_profile=holmes.ParseProfile(collect_timings=True))
+        profiled_holmes_manager.get_parse_stage_timings(reset=True)
+        profiled_holmes_manager.parse_and_register_document(
+            "A dog chases a cat. It is tired.", 'pets')
+        stage_timings = profiled_holmes_manager.get_parse_stage_timings(reset=True)
+        self.assertIn('subwords', stage_timings)
+        self.assertIn('coreference', stage_timings)
+        self.assertIn('convenience_dependencies', stage_timings)
+        self.assertEqual(profiled_holmes_manager.get_parse_stage_timings(), {})
+        profiled_holmes_manager.register_search_phrase("A dog chases a cat")
+        self.assertEqual(len(profiled_holmes_manager.match()), 1)
+        profiled_holmes_manager.close()
+
+    def test_parse_profile_without_coreference_and_question_words(self):
+        profiled_holmes_manager = holmes.Manager(
+            'en_core_web_lg', number_of_workers=1,
+            parse_profile=holmes.ParseProfile(coreference=False, question_words=False))
+        profiled_holmes_manager.parse_and_register_document(
+            "Who chased the cat? A dog chased it.", 'pets')
+        doc = profiled_holmes_manager.get_document('pets')
+        self.assertFalse(doc[0]._.holmes.is_initial_question_word)
+        self.assertEqual(doc[8]._.holmes.token_and_coreference_chain_indexes, [8])
+        self.assertEqual(doc[8]._.holmes.mentions, [])
+        profiled_holmes_manager.register_search_phrase("A dog chases a cat")
+        self.assertEqual(len(profiled_holmes_manager.match()), 0)
+        profiled_holmes_manager.close()
+
+    def test_corpus_store(self):
+        self._register_multiple_documents_and_search_phrases()
+        topic_matches = holmes_manager.topic_match_documents_against("A lion eats a gnu")
+        # Documents matched without being registered must not end up in the corpus store
+        self.assertEqual(len(holmes_manager.match(document_text="A dog chases a cat")), 1)
+        with tempfile.TemporaryDirectory() as directory:
+            holmes_manager.save_corpus_store(directory)
+            holmes_manager.remove_all_documents()
+            holmes_manager.load_corpus_store(directory)
+            self.assertEqual(holmes_manager.list_document_labels(), ['pets', 'safari'])
+            self.assertEqual(len(holmes_manager.match()), 2)
+            self.assertEqual(
+                holmes_manager.topic_match_documents_against("A lion eats a gnu"),
+                topic_matches)
+            holmes_manager.parse_and_register_document(
+                document_text="A dog chased a cat.", label='pets2')
+            holmes_manager.save_corpus_store(directory)
+            self.assertEqual(len([filename for filename in os.listdir(directory)
+                if filename.startswith('shard-1')]), 0)
+            holmes_manager.remove_all_documents()
+            holmes_manager.load_corpus_store(directory)
+            self.assertEqual(holmes_manager.list_document_labels(),
+                ['pets', 'pets2', 'safari'])
+            self.assertEqual(len(holmes_manager.match()), 3)
+            with self.assertRaises(DuplicateDocumentError):
+                holmes_manager.load_corpus_store(directory)
+
+    def test_register_search_phrases(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_document(
+            document_text="All the time I am testing here, dogs keep on chasing cats.", label='pets')
+        holmes_manager.parse_and_register_document(
+            document_text="Everything I know suggests that lions enjoy eating gnu", label='safari')
+        search_phrases = holmes_manager.register_search_phrases(
+            {"A dog chases a cat": "test", "A lion eats a gnu": "test", "irrelevancy": "alpha"})
+        self.assertEqual([search_phrase.label for search_phrase in search_phrases],
+                         ['test', 'test', 'alpha'])
+        self.assertEqual(holmes_manager.list_search_phrase_labels(), ['alpha', 'test'])
+        self.assertEqual(len(holmes_manager.match()), 2)
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.register_search_phrases(["A dog chases a cat", "A lion eats a gnu"])
+        self.assertEqual(holmes_manager.list_search_phrase_labels(),
+                         ['A dog chases a cat', 'A lion eats a gnu'])
+        self.assertEqual(len(holmes_manager.match()), 2)
+
+    def test_serialized_search_phrases(self):
+        self._register_multiple_documents_and_search_phrases()
+        serialized_search_phrases = holmes_manager.serialize_search_phrases()
+        holmes_manager.remove_all_search_phrases()
+        self.assertEqual(len(holmes_manager.match()), 0)
+        search_phrases = holmes_manager.register_serialized_search_phrases(
+            serialized_search_phrases)
+        self.assertEqual([search_phrase.label for search_phrase in search_phrases],
+                         ['test', 'test', 'alpha'])
+        self.assertEqual(holmes_manager.list_search_phrase_labels(), ['alpha', 'test'])
+        self.assertEqual(len(holmes_manager.match()), 2)
+        with self.assertRaises(WrongModelDeserializationError):
+            lg_holmes_manager.register_serialized_search_phrases(serialized_search_phrases)
+        contents = pickle.loads(serialized_search_phrases)
+        contents['serialized_search_phrases_version'] = '0.9'
+        with self.assertRaises(WrongVersionDeserializationError) as context:
+            holmes_manager.register_serialized_search_phrases(pickle.dumps(contents))
+        self.assertIn('0.9', str(context.exception))
+
+    def test_serialized_search_phrases_with_different_index_signature(self):
+        self._register_multiple_documents_and_search_phrases()
+        serialized_search_phrases = holmes_manager.serialize_search_phrases()
+        holmes_manager.remove_all_search_phrases()
+        index_signature = holmes_manager.index_signature
+        holmes_manager.index_signature = 'different'
+        try:
+            search_phrases = holmes_manager.register_serialized_search_phrases(
+                serialized_search_phrases)
+        finally:
+            holmes_manager.index_signature = index_signature
+        self.assertEqual([search_phrase.label for search_phrase in search_phrases],
+                         ['test', 'test', 'alpha'])
+        self.assertEqual([search_phrase.doc_text for search_phrase in search_phrases],
+                         ['A dog chases a cat', 'A lion eats a gnu', 'irrelevancy'])
+        self.assertEqual(len(holmes_manager.match()), 2)
+
+    def test_match_texts(self):
+        self._register_multiple_documents_and_search_phrases()
+        match_dicts_lists = holmes_manager.match_texts(
+            ["A dog chased a cat", "Nothing relevant", "A lion ate a gnu", "A big dog chased a cat"])
+        self.assertEqual([len(match_dicts) for match_dicts in match_dicts_lists], [1, 0, 1, 1])
+        self.assertEqual(match_dicts_lists[2][0]['search_phrase_text'], 'A lion eats a gnu')
+        self.assertEqual(len(holmes_manager.match()), 2)
+        self.assertEqual(match_dicts_lists[0],
+                         holmes_manager.match(document_text="A dog chased a cat"))
+        # With a batch size of one, each worker receives a separate message for each text
+        self.assertEqual(holmes_manager.match_texts(
+            ["A dog chased a cat", "Nothing relevant", "A lion ate a gnu", "A big dog chased a cat"],
+            batch_size=1), match_dicts_lists)
+
+    def test_time_budget(self):
+        self._register_multiple_documents_and_search_phrases()
+        topic_matches = holmes_manager.topic_match_documents_against("A lion eats a gnu")
+        self.assertEqual(
+            holmes_manager.topic_match_documents_against("A lion eats a gnu", time_budget=60),
+            topic_matches)
+        self.assertFalse(any('partial' in topic_match for topic_match in topic_matches))
+        self.assertEqual(
+            holmes_manager.topic_match_documents_against("A lion eats a gnu", time_budget=0), [])
+        matches = holmes_manager.match(time_budget=60)
+        self.assertEqual(len(matches), 2)
+        self.assertFalse(any('partial' in match for match in matches))
+        self.assertEqual(holmes_manager.match(time_budget=0), [])
+
+    def _handle_response_dropping_first_reply(self):
+        # Simulates a worker that fails or is not waited for in the first call
+        handle_response = holmes_manager._handle_response
+        calls = []
+
+        def wrapper(reply_queue, number_of_messages, method_name, deadline=None):
+            return_values = handle_response(
+                reply_queue, number_of_messages, method_name, deadline)
+            calls.append(method_name)
+            return return_values[1:] if len(calls) == 1 else return_values
+        return patch.object(holmes_manager, '_handle_response', new=wrapper)
+
+    def test_topic_matching_with_missing_worker_reply(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_document("A lion eats a gnu", 'safari1')
+        holmes_manager.parse_and_register_document("A lion eats a gnu", 'safari2')
+        self.assertEqual(len(set(holmes_manager.document_labels_to_worker_queues.values())), 2)
+        with self._handle_response_dropping_first_reply():
+            topic_matches = holmes_manager.topic_match_documents_against("A lion eats a gnu")
+        self.assertEqual(len(topic_matches), 1)
+        self.assertTrue(all(topic_match['partial'] for topic_match in topic_matches))
+        # The worker whose reply was missing has released its topic matcher, so later queries
+        # are unaffected
+        topic_matches = holmes_manager.topic_match_documents_against("A lion eats a gnu")
+        self.assertEqual(len(topic_matches), 2)
+        self.assertFalse(any('partial' in topic_match for topic_match in topic_matches))
+
+    def test_match_with_missing_worker_reply(self):
+        holmes_manager.remove_all_search_phrases()
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_document("A lion eats a gnu", 'safari1')
+        holmes_manager.parse_and_register_document("A lion eats a gnu", 'safari2')
+        holmes_manager.register_search_phrase("A lion eats a gnu")
+        self.assertEqual(len(set(holmes_manager.document_labels_to_worker_queues.values())), 2)
+        with self._handle_response_dropping_first_reply():
+            matches = holmes_manager.match(time_budget=60)
+        self.assertEqual(len(matches), 1)
+        self.assertTrue(all(match['partial'] for match in matches))
+
+    def test_late_worker_reply_not_waited_for(self):
+        reply_queue = holmes_manager.multiprocessing_manager.Queue()
+        reply_queue.put(('Worker 0', 'value', 'info'))
+        start_time = time()
+        # The second worker never replies: the manager stops waiting after the deadline plus
+        # the grace period and returns the value it has
+        self.assertEqual(
+            holmes_manager._handle_response(reply_queue, 2, 'match', start_time), ['value'])
+        self.assertLess(time() - start_time, DEADLINE_GRACE_SECONDS + 10)
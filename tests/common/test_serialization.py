@@ -118,3 +118,83 @@ class SerializationTest(unittest.TestCase):
             'information2')
         self.assertEqual(old_doc[3]._.holmes.derived_lemma, 'inform')
         self.assertEqual(new_doc[3]._.holmes.derived_lemma, 'inform')
+
+    def test_compact_serialization_with_coreference(self):
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_document(
+            "I saw a cat. It was chased by the dog", 'pets')
+        serialized_doc = holmes_manager.serialize_document('pets', compact=True)
+        self.assertLess(len(serialized_doc), len(holmes_manager.serialize_document('pets')))
+        holmes_manager.remove_all_documents()
+        holmes_manager.register_serialized_document(
+            serialized_doc, 'pets')
+        self.assertEqual(len(holmes_manager.match()), 1)
+
+    def test_compact_and_standard_serialization_together(self):
+        holmes_manager.remove_all_documents()
+        doc = holmes_manager.nlp("The cat was chased by the dog")
+        holmes_manager.register_serialized_documents({
+            'pets': doc.to_bytes(), 'pets2': holmes_manager.to_compact_bytes(doc)})
+        self.assertEqual(len(holmes_manager.match()), 2)
+        old_doc = holmes_manager.get_document('pets')
+        new_doc = holmes_manager.get_document('pets2')
+        for old_token, new_token in zip(old_doc, new_doc):
+            self.assertEqual(old_token._.holmes.string_representation_of_children(),
+                             new_token._.holmes.string_representation_of_children())
+            self.assertEqual(old_token._.holmes.string_representation_of_parents(),
+                             new_token._.holmes.string_representation_of_parents())
+            self.assertEqual(old_token._.holmes.direct_matching_reprs,
+                             new_token._.holmes.direct_matching_reprs)
+            self.assertEqual(old_token._.holmes.is_matchable, new_token._.holmes.is_matchable)
+            self.assertEqual(old_token._.holmes.is_negated, new_token._.holmes.is_negated)
+            self.assertEqual(old_token._.holmes.righthand_siblings,
+                             new_token._.holmes.righthand_siblings)
+
+    def test_compact_serialization_subwords(self):
+        german_holmes_manager.remove_all_documents()
+        german_holmes_manager.parse_and_register_document(
+            "Bundesoberbehörde.", 'bo')
+        serialized_doc = german_holmes_manager.serialize_document('bo', compact=True)
+        german_holmes_manager.register_serialized_document(
+            serialized_doc, 'bo2')
+        new_doc = german_holmes_manager.get_document('bo2')
+        self.assertEqual(new_doc[0]._.holmes.subwords[0].text, 'bundes')
+        self.assertEqual(new_doc[0]._.holmes.subwords[0].lemma, 'bund')
+        self.assertEqual(new_doc[0]._.holmes.subwords[0].governor_index, 1)
+        self.assertEqual(new_doc[0]._.holmes.subwords[1].text, 'oberbehörde')
+        self.assertEqual(new_doc[0]._.holmes.subwords[1].lemma, 'oberbehörde')
+        self.assertEqual(new_doc[0]._.holmes.subwords[1].dependent_index, 0)
+
+    def test_vectors_retrieved_after_serialization(self):
+        holmes_manager.remove_all_documents()
+        holmes_manager.parse_and_register_document(
+            "The cat was chased by the dog", 'pets')
+        serialized_doc = holmes_manager.serialize_document('pets')
+        holmes_manager.remove_all_documents()
+        holmes_manager.register_serialized_document(
+            serialized_doc, 'pets')
+        new_doc = holmes_manager.get_document('pets')
+        self.assertNotIn('vector', vars(new_doc[1]._.holmes))
+        self.assertEqual(new_doc[1]._.holmes.vector_key, 'cat')
+        self.assertTrue((new_doc[1]._.holmes.vector ==
+            holmes_manager.semantic_analyzer.vectors_nlp.vocab['cat'].vector).all())
+
+    def test_version_4_0_document_with_stored_vectors(self):
+        holmes_manager.remove_all_documents()
+        doc = holmes_manager.nlp("The cat was chased by the dog")
+        # Documents serialized with version 4.0 stored a vector with each token
+        for token in doc:
+            vector = token._.holmes.vector
+            del vars(token._.holmes)['vector_key']
+            del vars(token._.holmes)['vector_source']
+            vars(token._.holmes)['vector'] = vector
+        doc._.holmes_document_info.serialized_document_version = '4.0'
+        holmes_manager.register_serialized_document(doc.to_bytes(), 'pets')
+        self.assertEqual(len(holmes_manager.match()), 1)
+        new_doc = holmes_manager.get_document('pets')
+        self.assertEqual(new_doc._.holmes_document_info.serialized_document_version,
+            holmes.manager.SERIALIZED_DOCUMENT_VERSION)
+        self.assertNotIn('vector', vars(new_doc[1]._.holmes))
+        self.assertEqual(new_doc[1]._.holmes.vector_key, 'cat')
+        self.assertTrue((new_doc[1]._.holmes.vector ==
+            holmes_manager.semantic_analyzer.vectors_nlp.vocab['cat'].vector).all())
@@ -868,6 +868,30 @@ class GermanSemanticAnalyzerTest(unittest.TestCase):
         self.assertOneEqual(doc[3]._.holmes.subwords[1].containing_token_index, 3)
         self.assertOneEqual(doc[3]._.holmes.subwords[1].char_start_index, 9)
 
+    def test_subwords_word_in_two_documents(self):
+        nlp("Die Kündigungsbestätigung war interessant")
+        hits_before = m.get_subword_cache_statistics()['hits']
+        doc = nlp("Eine Kündigungsbestätigung kam")
+        self.assertEqual(m.get_subword_cache_statistics()['hits'], hits_before + 1)
+        self.assertEqual(len(doc[1]._.holmes.subwords), 2)
+        self.assertEqual(doc[1]._.holmes.subwords[0].lemma, 'kündigung')
+        self.assertEqual(doc[1]._.holmes.subwords[0].containing_token_index, 1)
+        self.assertEqual(doc[1]._.holmes.subwords[0].governor_index, 1)
+        self.assertEqual(doc[1]._.holmes.subwords[1].lemma, 'bestätigung')
+        self.assertEqual(doc[1]._.holmes.subwords[1].containing_token_index, 1)
+        self.assertEqual(doc[1]._.holmes.subwords[1].dependent_index, 0)
+        self.assertIsNotNone(doc[1]._.holmes.subwords[1].vector)
+
+    def test_subword_cache_serialization(self):
+        nlp("Die Kündigungsbestätigung war interessant")
+        serialized_subword_cache = m.serialize_subword_cache()
+        m.semantic_analyzer.subword_cache.clear()
+        m.register_serialized_subword_cache(serialized_subword_cache)
+        doc = nlp("Eine Kündigungsbestätigung kam")
+        self.assertEqual(m.get_subword_cache_statistics()['hits'], 1)
+        self.assertEqual(len(doc[1]._.holmes.subwords), 2)
+        self.assertEqual(doc[1]._.holmes.subwords[1].lemma, 'bestätigung')
+
     def test_three_subwords_with_non_whitelisted_fugen_s(self):
 
         doc = nlp("Inhaltsverzeichnisanlage")
@@ -779,3 +779,17 @@ class EnglishPhraseletProductionTest(unittest.TestCase):
                                                           process_initial_question_words=False)
         self.assertEqual(phraselet_labels_to_phraselet_infos['predicate-patient: start-discuss'].child_lemma, 'discussion')
         
+
+    def test_phraselet_template_docs_are_compact(self):
+        helper = ontology_holmes_manager.semantic_matching_helper
+        self.assertEqual(len(helper.local_phraselet_templates),
+                         len(helper.labels_to_local_phraselet_templates))
+        for phraselet_template in helper.local_phraselet_templates:
+            self.assertIs(helper.labels_to_local_phraselet_templates[phraselet_template.label],
+                          phraselet_template)
+            template_doc = phraselet_template.template_doc
+            self.assertEqual(template_doc.tensor.size, 0)
+            self.assertTrue(all(key[1].startswith('holmes') for key in template_doc.user_data))
+            self.assertEqual(template_doc[phraselet_template.parent_index]._.holmes.lemma,
+                             phraselet_template.template_doc.copy()[
+                                 phraselet_template.parent_index]._.holmes.lemma)
@@ -1,6 +1,10 @@
 import unittest
 import holmes_extractor as holmes
+from holmes_extractor.structural_matching import SearchPhraseIndex, Deadline
 import os
+from itertools import count
+from time import time
+from unittest.mock import patch
 
 script_directory = os.path.dirname(os.path.realpath(__file__))
 ontology = holmes.Ontology(
@@ -1080,3 +1084,82 @@ class EnglishStructuralMatchingTest(unittest.TestCase):
             nocoref_holmes_manager, "The cat creature meowed."
         )
         self.assertEqual(len(matches), 1)
+
+    def test_search_phrase_index(self):
+        search_phrases = [
+            nocoref_holmes_manager._create_search_phrase(text, text)
+            for text in (
+                "A dog chases a cat",
+                "An ENTITYPERSON opens an account",
+                "Serendipity",
+            )
+        ]
+        search_phrase_index = SearchPhraseIndex(
+            search_phrases, nocoref_holmes_manager.semantic_matching_helper
+        )
+        reverse_dict = {}
+        nocoref_holmes_manager.semantic_matching_helper.add_to_reverse_dict(
+            reverse_dict,
+            nocoref_holmes_manager.semantic_analyzer.parse("The hound chased a cat"),
+            "",
+        )
+        self.assertEqual(
+            [
+                search_phrase.label
+                for search_phrase in search_phrase_index.get_candidate_search_phrases(
+                    reverse_dict, False
+                )
+            ],
+            ["A dog chases a cat"],
+        )
+        self.assertEqual(
+            len(search_phrase_index.get_candidate_search_phrases(reverse_dict, True)),
+            3,
+        )
+        self.assertEqual(
+            len(search_phrase_index.get_candidate_search_phrases({}, False)), 0
+        )
+
+    def test_match_interrupted_by_deadline(self):
+        search_phrases = [
+            nocoref_holmes_manager._create_search_phrase(text, text)
+            for text in ("A dog chases a cat", "A cat chases a dog")
+        ]
+        doc = nocoref_holmes_manager.semantic_analyzer.parse("The dog chased a cat")
+        reverse_dict = {}
+        nocoref_holmes_manager.semantic_matching_helper.add_to_reverse_dict(
+            reverse_dict, doc, ""
+        )
+        structural_matcher = nocoref_holmes_manager.structural_matcher
+
+        def match(deadline):
+            return structural_matcher.match(
+                word_matching_strategies=nocoref_holmes_manager.semantic_matching_helper.main_word_matching_strategies,
+                document_labels_to_documents={"": doc},
+                reverse_dict=reverse_dict,
+                search_phrases=search_phrases,
+                match_depending_on_single_words=None,
+                compare_embeddings_on_root_words=False,
+                compare_embeddings_on_non_root_words=False,
+                reverse_matching_cwps=None,
+                embedding_reverse_matching_cwps=None,
+                process_initial_question_words=False,
+                overall_similarity_threshold=1.0,
+                initial_question_word_overall_similarity_threshold=1.0,
+                deadline=deadline,
+            )
+
+        deadline = Deadline(0.0)
+        self.assertEqual(len(match(deadline)), 0)
+        self.assertTrue(deadline.interrupted)
+        deadline = Deadline(time() + 60)
+        self.assertEqual(len(match(deadline)), 1)
+        self.assertFalse(deadline.interrupted)
+        self.assertEqual(len(match(None)), 1)
+        # A clock that advances by one second each time it is read: the deadline passes when
+        # the second search phrase is reached, so the match of the first is still returned
+        clock = count()
+        with patch("holmes_extractor.structural_matching.time", new=lambda: next(clock)):
+            deadline = Deadline(2)
+            self.assertEqual(len(match(deadline)), 1)
+        self.assertTrue(deadline.interrupted)
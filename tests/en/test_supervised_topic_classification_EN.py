@@ -1,6 +1,8 @@
 import unittest
+import pickle
 from collections import OrderedDict
 import holmes_extractor as holmes
+from holmes_extractor.classification import SupervisedTopicTrainingUtils
 import os
 
 script_directory = os.path.dirname(os.path.realpath(__file__))
@@ -27,6 +29,16 @@ def get_first_key_in_dict(dictionary: OrderedDict) -> str:
     return list(dictionary.keys())[0]
 
 
+def get_animals_and_computers_classifier():
+    sttb = no_ontology_holmes_manager.get_supervised_topic_training_basis()
+    sttb.parse_and_register_training_document("A dog chases a cat", "animals")
+    sttb.parse_and_register_training_document("A cat chases a dog", "animals")
+    sttb.parse_and_register_training_document("A computer", "computers")
+    sttb.parse_and_register_training_document("A robot", "computers")
+    sttb.prepare()
+    return sttb.train(minimum_occurrences=0, cv_threshold=0).classifier()
+
+
 class EnglishSupervisedTopicClassificationTest(unittest.TestCase):
     def test_get_labels_to_classification_frequencies_direct_matching(self):
         sttb = holmes_manager.get_supervised_topic_training_basis(one_hot=False)
@@ -515,3 +527,201 @@ class EnglishSupervisedTopicClassificationTest(unittest.TestCase):
             set(map(lambda phr: phr.label, trainer2.phraselet_infos)),
             {"predicate-actor: chasing-animal", "predicate-patient: chasing-animal"},
         )
+
+    def test_occurrence_dicts_from_prepare_matches_match_rematching(self):
+        sttb = holmes_manager.get_supervised_topic_training_basis(one_hot=False)
+        sttb.parse_and_register_training_document(
+            "A dog chases a cat. A dog chases a cat", "animals"
+        )
+        sttb.parse_and_register_training_document("A cat chases a dog", "animals")
+        sttb.parse_and_register_training_document("A cat chases a horse", "animals")
+        sttb.parse_and_register_training_document("A gymnast jumps over a horse", "gym")
+        sttb.parse_and_register_training_document(
+            "A gymnast jumps over a wastage horse", "gym"
+        )
+        sttb.prepare()
+        for minimum_occurrences in (0, 2, 4):
+            trainer = sttb.train(
+                minimum_occurrences=minimum_occurrences, cv_threshold=0
+            )
+            self.assertEqual(len(trainer.occurrence_dicts), 5)
+            self.assertEqual(
+                trainer.occurrence_dicts,
+                trainer.utils.get_occurrence_dicts(
+                    phraselet_labels_to_search_phrases=holmes_manager.linguistic_object_factory.create_search_phrases_from_phraselet_infos(
+                        trainer.phraselet_infos
+                    ),
+                    semantic_matching_helper=holmes_manager.semantic_matching_helper,
+                    structural_matcher=holmes_manager.structural_matcher,
+                    sorted_label_dict=trainer.sorted_label_dict,
+                    overall_similarity_threshold=1.0,
+                    training_document_labels_to_documents=sttb.training_document_labels_to_documents,
+                ),
+            )
+
+    def test_match_summaries_from_workers_match_match_summaries_in_process(self):
+        def get_prepared_training_basis(use_workers):
+            sttb = holmes_manager.get_supervised_topic_training_basis(one_hot=False)
+            if not use_workers:
+                sttb.worker_match_summaries_getter = None
+            sttb.parse_and_register_training_document(
+                "A dog chases a cat. A dog chases a cat", "animals"
+            )
+            sttb.parse_and_register_training_document("A cat chases a dog", "animals")
+            sttb.parse_and_register_training_document("A cat chases a horse", "animals")
+            sttb.parse_and_register_training_document(
+                "A gymnast jumps over a horse", "gym"
+            )
+            sttb.parse_and_register_training_document(
+                "A gymnast jumps over a wastage horse", "gym"
+            )
+            sttb.prepare()
+            return sttb
+
+        original_batch_size = holmes.manager.TRAINING_MATCHING_BATCH_SIZE
+        holmes.manager.TRAINING_MATCHING_BATCH_SIZE = 2
+        try:
+            worker_sttb = get_prepared_training_basis(True)
+        finally:
+            holmes.manager.TRAINING_MATCHING_BATCH_SIZE = original_batch_size
+        in_process_sttb = get_prepared_training_basis(False)
+        self.assertEqual(
+            worker_sttb.training_document_labels_to_match_summaries,
+            in_process_sttb.training_document_labels_to_match_summaries,
+        )
+        self.assertEqual(
+            worker_sttb.labels_to_classification_frequencies,
+            in_process_sttb.labels_to_classification_frequencies,
+        )
+        worker_match_summaries = worker_sttb.training_document_labels_to_match_summaries
+        for match_summaries in worker_match_summaries.values():
+            for match_summary in match_summaries:
+                self.assertIsInstance(match_summary, tuple)
+        self.assertEqual(
+            worker_sttb.train(minimum_occurrences=0, cv_threshold=0).occurrence_dicts,
+            in_process_sttb.train(
+                minimum_occurrences=0, cv_threshold=0
+            ).occurrence_dicts,
+        )
+
+    def test_sparse_input_layer_matches_dense_input_layer(self):
+        utils = SupervisedTopicTrainingUtils(10, False)
+        occurrence_dicts = [{0: 1, 3: 2}, {}, {1: 1, 2: 1, 4: 3}, {3: 1}]
+        sparse_model = utils.get_thinc_model(
+            hidden_layer_sizes=[4, 3], input_width=5, output_width=2
+        )
+        dense_model = utils.get_thinc_model(
+            hidden_layer_sizes=[4, 3], input_width=5, output_width=2, sparse_input=False
+        )
+        sparse_model.initialize(X=occurrence_dicts)
+        dense_model.initialize(X=occurrence_dicts)
+        self.assertEqual(sparse_model.layers[0].name, "sparse_relu")
+        sparse_nodes = [node for node in sparse_model.walk() if node.param_names]
+        dense_nodes = [node for node in dense_model.walk() if node.param_names]
+        self.assertEqual(len(sparse_nodes), len(dense_nodes))
+        for sparse_node, dense_node in zip(sparse_nodes, dense_nodes):
+            for param_name in sparse_node.param_names:
+                dense_node.set_param(param_name, sparse_node.get_param(param_name))
+        self.assertTrue(
+            sparse_model.ops.xp.allclose(
+                sparse_model.predict(occurrence_dicts),
+                dense_model.predict(occurrence_dicts),
+                atol=1e-6,
+            )
+        )
+
+    def test_classify_batch(self):
+        stc = get_animals_and_computers_classifier()
+        texts = [
+            "A robot chases a computer.",
+            "Nothing relevant here.",
+            "A cat.",
+            "A dog and a robot.",
+            "Nothing relevant here either.",
+        ]
+        self.assertEqual(stc.classify_batch([]), [])
+        for batch_size in (1, 2, 5):
+            results = stc.parse_and_classify_batch(texts, batch_size=batch_size)
+            self.assertEqual(len(results), len(texts))
+            for text, result in zip(texts, results):
+                single_result = stc.parse_and_classify(text)
+                if single_result is None:
+                    self.assertIsNone(result)
+                    continue
+                self.assertEqual(set(result.keys()), set(single_result.keys()))
+                for classification, probability in single_result.items():
+                    self.assertAlmostEqual(result[classification], probability, 5)
+        self.assertIsNone(results[1])
+        self.assertIsNotNone(results[2])
+
+    def test_classify_documents_on_workers(self):
+        stc = get_animals_and_computers_classifier()
+        no_ontology_holmes_manager.register_supervised_topic_classifier(stc)
+        texts = {
+            "classify 1": "A robot chases a computer.",
+            "classify 2": "Nothing relevant here.",
+            "classify 3": "A cat.",
+            "other": "A dog.",
+        }
+        for label, text in texts.items():
+            no_ontology_holmes_manager.parse_and_register_document(text, label)
+        try:
+            results = no_ontology_holmes_manager.classify_documents("classify")
+            self.assertEqual(
+                set(results.keys()), {"classify 1", "classify 2", "classify 3"}
+            )
+            self.assertIsNone(results["classify 2"])
+            for label in ("classify 1", "classify 3"):
+                single_result = stc.parse_and_classify(texts[label])
+                self.assertEqual(set(results[label].keys()), set(single_result.keys()))
+                for classification, probability in single_result.items():
+                    self.assertAlmostEqual(
+                        results[label][classification], probability, 5
+                    )
+            self.assertEqual(
+                set(no_ontology_holmes_manager.classify_documents().keys()),
+                set(texts.keys()),
+            )
+        finally:
+            no_ontology_holmes_manager.remove_all_documents()
+
+    def test_serialized_model_contains_search_phrases(self):
+        stc = get_animals_and_computers_classifier()
+        serialized_model = stc.serialize_model()
+        model = pickle.loads(serialized_model)
+        self.assertEqual(model.version, "1.2")
+        self.assertEqual(
+            set(model.packed_phraselet_labels_to_search_phrases.keys()),
+            {phraselet_info.label for phraselet_info in model.phraselet_infos},
+        )
+        for search_phrase in model.packed_phraselet_labels_to_search_phrases.values():
+            self.assertIsNone(search_phrase.doc)
+        stc2 = no_ontology_holmes_manager.deserialize_supervised_topic_classifier(
+            serialized_model
+        )
+        model.version = "1.1"
+        del model.packed_phraselet_labels_to_search_phrases
+        stc3 = no_ontology_holmes_manager.deserialize_supervised_topic_classifier(
+            pickle.dumps(model)
+        )
+        for classifier in (stc2, stc3):
+            self.assertEqual(
+                {
+                    label: search_phrase.words_matching_root_token
+                    for label, search_phrase in classifier.phraselet_labels_to_search_phrases.items()
+                },
+                {
+                    label: search_phrase.words_matching_root_token
+                    for label, search_phrase in stc.phraselet_labels_to_search_phrases.items()
+                },
+            )
+            self.assertEqual(
+                classifier.parse_and_classify("A robot chases a cat."),
+                stc.parse_and_classify("A robot chases a cat."),
+            )
+        # the packed search phrases are retained so that the model can be serialized again
+        reserialized_model = pickle.loads(stc2.serialize_model())
+        for (
+            search_phrase
+        ) in reserialized_model.packed_phraselet_labels_to_search_phrases.values():
+            self.assertIsNone(search_phrase.doc)
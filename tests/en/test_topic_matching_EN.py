@@ -1,7 +1,10 @@
 import unittest
 import holmes_extractor as holmes
-from holmes_extractor.topic_matching import TopicMatcher
+from holmes_extractor.topic_matching import TopicMatcher, CoveredIndexRanges, \
+    PhraseletActivations, VectorisedPhraseletActivations
 import os
+import gc
+import tracemalloc
 
 script_directory = os.path.dirname(os.path.realpath(__file__))
 ontology = holmes.Ontology(os.sep.join((script_directory, 'test_ontology.owl')),
@@ -1270,3 +1273,117 @@ class EnglishTopicMatchingTest(unittest.TestCase):
                 "A dog")
         self.assertEqual(len(topic_match_dictionaries), 1)
         m.close()
+
+    def test_covered_index_ranges(self):
+        covered_index_ranges = CoveredIndexRanges()
+        covered_index_ranges.add('a', 5, 8)
+        covered_index_ranges.add('a', 12, 14)
+        covered_index_ranges.add('b', 0, 2)
+        self.assertTrue(covered_index_ranges.contains('a', 5))
+        self.assertTrue(covered_index_ranges.contains('a', 8))
+        self.assertFalse(covered_index_ranges.contains('a', 9))
+        self.assertFalse(covered_index_ranges.contains('a', 4))
+        self.assertFalse(covered_index_ranges.contains('c', 5))
+        covered_index_ranges.add('a', 7, 12)
+        self.assertTrue(covered_index_ranges.contains('a', 10))
+        self.assertEqual(covered_index_ranges.document_labels_to_ranges['a'], ([5], [14]))
+        covered_index_ranges.add('a', 1, 2)
+        self.assertEqual(covered_index_ranges.document_labels_to_ranges['a'],
+            ([1, 5], [2, 14]))
+        self.assertFalse(covered_index_ranges.contains('a', 3))
+        self.assertTrue(covered_index_ranges.contains('b', 1))
+
+    def test_vectorised_phraselet_activations_identical(self):
+        phraselet_activations = PhraseletActivations(75)
+        vectorised_phraselet_activations = VectorisedPhraseletActivations(75)
+        position = 0
+        for counter in range(2000):
+            position += counter % 7 // 3
+            phraselet_label = ''.join(('phraselet', str(counter * 31 % 97)))
+            score = (counter * 17 % 23) / 3
+            phraselet_activations.update(phraselet_label, position, score)
+            vectorised_phraselet_activations.update(phraselet_label, position, score)
+            self.assertEqual(phraselet_activations.get_total_activation(position),
+                vectorised_phraselet_activations.get_total_activation(position))
+
+    def test_long_multi_sentence_topic_match(self):
+        holmes_manager_coref.remove_all_documents()
+        holmes_manager_coref.parse_and_register_document(' '.join(
+            'The big dog chased the small cat into the old house.' for counter in range(60)))
+        topic_matches = holmes_manager_coref.topic_match_documents_against(
+            'A big dog chased a small cat into a house', maximum_activation_distance=2000,
+            sideways_match_extent=2000, number_of_results=1)
+        self.assertEqual(len(topic_matches), 1)
+        word_infos = topic_matches[0]['word_infos']
+        self.assertGreater(len(word_infos), 50)
+        for counter in range(1, len(word_infos)):
+            self.assertLess(word_infos[counter - 1][0], word_infos[counter][0])
+            self.assertLess(word_infos[counter - 1][1], word_infos[counter][1])
+
+    def test_single_word_matching_frequency_threshold(self):
+        holmes_manager_coref.remove_all_documents()
+        holmes_manager_coref.parse_and_register_document('A dog chased a cat.', 'a')
+        holmes_manager_coref.parse_and_register_document('The dog slept.', 'b')
+        holmes_manager_coref.parse_and_register_document('The dog barked.', 'c')
+        topic_matches = holmes_manager_coref.topic_match_documents_against('dog chased',
+            single_word_matching_frequency_threshold=0.0)
+        self.assertIn('b', [topic_match['document_label'] for topic_match in topic_matches])
+        restricted_topic_matches = holmes_manager_coref.topic_match_documents_against(
+            'dog chased', single_word_matching_frequency_threshold=1.0)
+        self.assertEqual([topic_match['document_label'] for topic_match in
+            restricted_topic_matches], ['a'])
+        self.assertEqual(topic_matches[0], restricted_topic_matches[0])
+        with self.assertRaises(ValueError):
+            holmes_manager_coref.topic_match_documents_against('dog chased',
+                single_word_matching_frequency_threshold=1.1)
+
+    def _match_dogs_chasing_cats(self, number_of_sentences):
+        doc = holmes_manager_coref.semantic_analyzer.parse(' '.join(
+            'The big dog chased the small cat into the old house.' for counter in
+            range(number_of_sentences)))
+        reverse_dict = {}
+        holmes_manager_coref.semantic_matching_helper.add_to_reverse_dict(
+            reverse_dict, doc, '')
+        return lambda: holmes_manager_coref.structural_matcher.match(
+            word_matching_strategies=
+            holmes_manager_coref.semantic_matching_helper.main_word_matching_strategies,
+            document_labels_to_documents={'': doc},
+            reverse_dict=reverse_dict,
+            search_phrases=[holmes_manager_coref._create_search_phrase(
+                'A dog chases a cat', 'label')],
+            match_depending_on_single_words=None,
+            compare_embeddings_on_root_words=False,
+            compare_embeddings_on_non_root_words=False,
+            reverse_matching_cwps=None,
+            embedding_reverse_matching_cwps=None,
+            process_initial_question_words=False,
+            overall_similarity_threshold=1.0,
+            initial_question_word_overall_similarity_threshold=1.0)
+
+    def test_structural_matches_have_no_instance_dictionaries(self):
+        matches = self._match_dogs_chasing_cats(20)()
+        # Coreference resolution may add matches to the twenty within the sentences
+        self.assertGreaterEqual(len(matches), 20)
+        # Instances with slots do not carry a per-instance dictionary of attributes
+        for match in matches:
+            self.assertFalse(hasattr(match, '__dict__'))
+            self.assertFalse(any(hasattr(word_match, '__dict__') for word_match in
+                match.word_matches))
+
+    def test_bytes_per_structural_match(self):
+        match = self._match_dogs_chasing_cats(200)
+        # Warm up so that caches filled by the first call are not measured
+        match()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            memory_before = tracemalloc.get_traced_memory()[0]
+            matches = match()
+            gc.collect()
+            bytes_per_match = (tracemalloc.get_traced_memory()[0] - memory_before) / len(matches)
+        finally:
+            tracemalloc.stop()
+        self.assertGreaterEqual(len(matches), 200)
+        # Each match holds three word matches; the bound catches matches that retain more
+        # than their slots and the token objects they refer to
+        self.assertLess(bytes_per_match, 4000)